@@ -7,32 +7,29 @@ import threading
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
-from openai import AzureOpenAI
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as Ec
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import NoSuchElementException
 import pyautogui
 try:
     import tkinter as tk
 except Exception:  # pragma: no cover - tkinter optional
     tk = None
 import json
+import os
 from time import sleep, time
 
-from config import (
-    CHAT_SESSION_URL,
-    AZURE_API_KEY,
-    AZURE_ENDPOINT,
-    AZURE_API_VERSION,
-    LLM_DEPLOYMENT,
-    FLOW_CONTROL,
-)
+import config
+import azure_clients
+import rate_limiter
+from download_manager import DownloadManager
+from page_locator import PageLocator, WebDriverCommandCounter
+from task_store import STEP_STATUS_COLUMNS, TASK_FIELDNAMES, TaskStore
+from wait_policy import WaitPolicy
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -41,7 +38,10 @@ PROMPT_DIR = ALIEN_ROOT / "Prompt"
 PROMPT_ARCHIVE_DIR = ALIEN_ROOT / "Prompts"
 TODO_DIR = ALIEN_ROOT / "ToDo"
 LOG_DIR = ALIEN_ROOT / "Logs"
+DOWNLOAD_DIR = ALIEN_ROOT / "Downloads"
+DOWNLOAD_RUN_DIR = DOWNLOAD_DIR / ".runs"
 TODO_CSV_PATH = TODO_DIR / "todo.csv"
+TODO_DB_PATH = TODO_DIR / "todo.sqlite3"
 LEGACY_TODO_CSV_PATH = BASE_DIR / "todo.csv"
 PROMPT_FILE_MAP = {
     "1": PROMPT_DIR / "Prompt1.md",
@@ -60,30 +60,106 @@ WEBPAGE_JSON_CANDIDATES = [
     BASE_DIR / "aliens_school_webpages.json",
 ]
 LOG_FILE_PATH = LOG_DIR / "GptBot.log"
-TASK_FIELDNAMES = [
-    "id",
-    "page_name",
-    "planning",
-    "code_generate",
-    "code_download",
-    "docs_generate",
-    "docs_download",
-    "complete_status",
-    "url",
-]
-STEP_STATUS_COLUMNS = [
-    "planning",
-    "code_generate",
-    "code_download",
-    "docs_generate",
-    "docs_download",
-]
+WAIT_REPORT_PATH = LOG_DIR / "wait_report.json"
+
+PROMPT_EDITOR_XPATH = '//*[@id="prompt-textarea"]'
 
 DOWNLOAD_LINK_XPATHS = (
     '//a[contains(normalize-space(.), "Download")]',
     '//a[starts-with(normalize-space(.), "sandbox:/mnt/data/")]'
 )
 
+# Prompt editor me poora text ek call me daalta hai. `#prompt-textarea` contenteditable (ProseMirror) hai, isliye
+# "script" execCommand("insertText") aur "paste" synthetic paste event use karta hai; asli <textarea> par native
+# value setter + input event. "clear" editor khali karta hai taaki agli strategy saaf editor par chale.
+INJECT_TEXT_SCRIPT = """
+const [el, text, mode] = arguments;
+el.focus();
+const isField = el.tagName === "TEXTAREA" || el.tagName === "INPUT";
+if (isField) {
+    if (mode === "paste") {
+        el.select();
+    } else {
+        const proto = el.tagName === "TEXTAREA" ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, "value").set.call(el, mode === "clear" ? "" : text);
+        el.dispatchEvent(new Event("input", {bubbles: true}));
+        el.dispatchEvent(new Event("change", {bubbles: true}));
+        return {handled: true};
+    }
+} else {
+    const range = document.createRange();
+    range.selectNodeContents(el);
+    const selection = window.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+    if (mode === "clear") return {handled: document.execCommand("delete", false)};
+    if (mode === "script") return {handled: document.execCommand("insertText", false, text)};
+}
+const data = new DataTransfer();
+data.setData("text/plain", text);
+const event = new ClipboardEvent("paste", {clipboardData: data, bubbles: true, cancelable: true});
+el.dispatchEvent(event);
+return {handled: event.defaultPrevented};
+"""
+
+# Editor ka text (whitespace normalize karke) expected se match karta hai; ProseMirror paragraphs ke beech
+# newlines alag ho sakti hain, isliye sirf whitespace ka fark ignore hota hai.
+EDITOR_TEXT_SCRIPT = """
+const [el, expected] = arguments;
+const actual = (el.tagName === "TEXTAREA" || el.tagName === "INPUT") ? el.value : el.innerText;
+const norm = (value) => (value || "").replace(/\\s+/g, " ").trim();
+return {ok: norm(actual) === norm(expected), expected_chars: norm(expected).length, actual_chars: norm(actual).length};
+"""
+
+# Busy indicator (XPath) ko MutationObserver se dekhta hai; indicator `debounceMs` tak gayab rahe to turant callback.
+# Indicator abhi tak dikha hi na ho to `graceMs` tak wait (prompt bhejte hi button aane me thoda time lagta hai).
+# Ek call max `segmentMs` chalti hai taaki WebDriver ka HTTP timeout na lage; Python agla segment chala deta hai.
+RESPONSE_COMPLETE_SCRIPT = """
+const [xpath, debounceMs, graceMs, segmentMs, sawBusyBefore] = arguments;
+const done = arguments[arguments.length - 1];
+const start = performance.now();
+const present = () => document.evaluate(
+    xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue !== null;
+let sawBusy = sawBusyBefore, timer = null, goneAt = null, finished = false, mutations = 0, lastScroll = 0;
+let observer = null, deadline = null;
+const finish = (status) => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(timer);
+    clearTimeout(deadline);
+    const now = performance.now();
+    done({status, saw_busy: sawBusy, mutations, elapsed_ms: now - start,
+          settle_ms: goneAt === null ? null : now - goneAt});
+};
+const check = () => {
+    const now = performance.now();
+    if (present()) {
+        sawBusy = true;
+        goneAt = null;
+        clearTimeout(timer);
+        timer = null;
+        if (now - lastScroll >= 2000) {
+            window.scrollTo(0, document.body.scrollHeight);
+            lastScroll = now;
+        }
+        return;
+    }
+    if (timer !== null) return;
+    goneAt = now;
+    const wait = sawBusy ? debounceMs : Math.max(debounceMs, graceMs - (now - start));
+    timer = setTimeout(() => {
+        timer = null;
+        if (present()) { check(); } else { finish("complete"); }
+    }, wait);
+};
+observer = new MutationObserver(() => { mutations += 1; check(); });
+observer.observe(document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ["aria-label"]});
+deadline = setTimeout(() => finish("pending"), segmentMs);
+check();
+"""
+
 
 class SystemSnackbar:
     """Lightweight top-right overlay to show automation status."""
@@ -182,6 +258,27 @@ class ChatGptAutomation:
     def __init__(self, profile_path=None, profile_name=None):
         self.prompt_cache = {}
         self.todo_csv_path = TODO_CSV_PATH
+        self.todo_db_path = TODO_DB_PATH
+        self.csv_export_every = config.TASK_CSV_EXPORT_EVERY
+        self.task_max_attempts = config.TASK_MAX_ATTEMPTS
+        self.task_retry_backoff = config.TASK_RETRY_BACKOFF
+        self.task_retry_backoff_max = config.TASK_RETRY_BACKOFF_MAX
+        self.last_page_error = ""
+        self.response_observer = config.RESPONSE_OBSERVER
+        self.response_debounce = config.RESPONSE_DEBOUNCE
+        self.response_start_grace = config.RESPONSE_START_GRACE
+        self.response_watch_segment = config.RESPONSE_WATCH_SEGMENT
+        self.last_response_wait = {}
+        self.text_input_strategies = list(config.TEXT_INPUT_STRATEGIES)
+        self.last_text_input = {}
+        self.download_verify = config.DOWNLOAD_VERIFY
+        self.download_manager = DownloadManager(
+            DOWNLOAD_RUN_DIR / datetime.now().strftime("%Y%m%d_%H%M%S"),
+            DOWNLOAD_DIR,
+            timeout=config.DOWNLOAD_TIMEOUT,
+            start_timeout=config.DOWNLOAD_START_TIMEOUT,
+        )
+        self.last_download = None
         self.legacy_todo_csv_path = LEGACY_TODO_CSV_PATH
         self.todo_seed_candidates = TODO_SEED_CANDIDATES
         self.webpage_json_candidates = WEBPAGE_JSON_CANDIDATES
@@ -190,13 +287,18 @@ class ChatGptAutomation:
         self.log_path = LOG_FILE_PATH
         self.prompt_archive_dir = PROMPT_ARCHIVE_DIR
         self.typing_delay_range = (0.08, 0.35)
-        self.short_pause_range = (1.4, 3.2)
-        self.long_pause_range = (4.5, 7.5)
+        self.waits = WaitPolicy(
+            profile=config.WAIT_PROFILE,
+            ranges=config.WAIT_PAUSE_RANGES,
+            timeout=config.WAIT_CONDITION_TIMEOUT,
+            poll_frequency=config.WAIT_POLL_FREQUENCY,
+        )
+        self.last_page_waits = {}
         self.idle_scroll_probability = 0.45
         self.llm_client = None
-        self.llm_deployment = LLM_DEPLOYMENT
+        self.llm_deployment = config.LLM_DEPLOYMENT
         self.snackbar = SystemSnackbar("Agent init in progress…")
-        self.flow_control = dict(FLOW_CONTROL)
+        self.flow_control = dict(config.FLOW_CONTROL)
 
         self._setup_logging()
         self.logger.info("Initializing GptBot....")
@@ -222,10 +324,19 @@ class ChatGptAutomation:
             "AppleWebKit/537.36 (KHTML, like Gecko)"
             "Chrome/143.0.0.0 Safari/537.36"
         )
+        chrome_options.add_experimental_option("prefs", {                                 # har run ki alag download directory, bina "Save as" prompt ke.
+            "download.default_directory": str(self.download_manager.download_dir.resolve()),
+            "download.prompt_for_download": False,
+            "download.directory_upgrade": True,
+        })
 
         self.driver = webdriver.Chrome(options=chrome_options)
+        self.command_counter = WebDriverCommandCounter(self.driver)                         # har page ke WebDriver round-trips ginne ke liye.
+        self.locator = PageLocator(self.driver)
+        self.last_page_commands = {}
         self._apply_stealth_patches()
         self.driver.maximize_window()                                                      # window size ko maximize karta hai.
+        self._set_download_directory()
         self.action = ActionChains(self.driver)
         self.wait = WebDriverWait(self.driver, 40)
 
@@ -248,17 +359,16 @@ class ChatGptAutomation:
             self.snackbar_handler = None
 
     def _init_prompt_refiner(self):
-        if not all([AZURE_API_KEY, AZURE_ENDPOINT, AZURE_API_VERSION, self.llm_deployment]):
+        if not all([config.AZURE_API_KEY, config.AZURE_ENDPOINT, config.AZURE_API_VERSION, self.llm_deployment]):
             self.logger.warning("Azure OpenAI credentials incomplete, prompt refiner skip.")
             return
 
         try:
-            self.llm_client = AzureOpenAI(
-                api_key=AZURE_API_KEY,
-                azure_endpoint=AZURE_ENDPOINT,
-                api_version=AZURE_API_VERSION,
-            )
+            self.llm_client = azure_clients.get_client()
             self.logger.info("Prompt refiner ready via Azure OpenAI deployment %s", self.llm_deployment)
+            if config.AZURE_WARM_UP:
+                # Chrome start hone tak TLS connection background me ban jati hai.
+                threading.Thread(target=azure_clients.warm_up, args=(self.llm_client,), daemon=True).start()
         except Exception as exc:
             self.llm_client = None
             self.logger.warning("Prompt refiner init fail: %s", exc)
@@ -272,23 +382,30 @@ class ChatGptAutomation:
             self.logger.debug("Flow flag invalid for %s (value=%s), default run", step_id, value)
             return True
 
-    def _human_pause(self, minimum=None, maximum=None):
-        """Har action ke beech human-like random delay add karta hai."""
-        low, high = self.short_pause_range
-        if minimum is not None:
-            low = minimum
-        if maximum is not None:
-            high = maximum
-
-        if low > high:
-            low, high = high, low
-
-        delay = random.uniform(low, high)
-        sleep(delay)
-        if random.random() < 0.4:
+    def _human_pause(self, minimum=None, maximum=None, name: str = "pause"):
+        """Har action ke beech human-like random delay add karta hai. Range `WaitPolicy` ke naam wale pause
+        (`WAIT_PAUSE_RANGES`) se aati hai aur `WAIT_PROFILE` se scale hoti hai ("none" par koi sleep nahi)."""
+        delay = self.waits.pause(name, minimum, maximum)
+        if delay and random.random() < 0.4:
             self._background_mouse_wiggle()
         return delay
 
+    def _network_idle_condition(self, quiet: float = 0.5):
+        """Page load complete ho aur `quiet` sec tak koi naya network resource na aaye to truthy."""
+        state = {"count": None, "since": time()}
+
+        def condition():
+            count = self.driver.execute_script(
+                "return document.readyState === 'complete' ? performance.getEntriesByType('resource').length : -1;"
+            )
+            now = time()
+            if count < 0 or count != state["count"]:
+                state["count"], state["since"] = count, now
+                return False
+            return now - state["since"] >= quiet
+
+        return condition
+
     def _random_typing_delay(self):
         return random.uniform(*self.typing_delay_range)
 
@@ -301,7 +418,7 @@ class ChatGptAutomation:
         try:
             scroll_distance = random.randint(180, 420) * random.choice([-1, 1])
             self.driver.execute_script("window.scrollBy(0, arguments[0]);", scroll_distance)
-            self._human_pause(0.8, 1.6)
+            self._human_pause(name="idle_scroll")
             self.driver.execute_script("window.scrollBy(0, arguments[0]);", -scroll_distance + random.randint(-60, 60))
         except Exception as exc:
             self.logger.debug("Idle interaction skip: %s", exc)
@@ -309,7 +426,7 @@ class ChatGptAutomation:
             self._background_mouse_wiggle()
 
     def _post_prompt_routine(self):
-        self._human_pause(2.2, 4.0)
+        self._human_pause(name="post_prompt")
         self._simulate_idle_user_activity()
 
     def _update_snackbar(self, message: str):
@@ -363,6 +480,11 @@ class ChatGptAutomation:
         except Exception as exc:
             self.logger.debug("Element mouse move skip: %s", exc)
 
+    def _move_mouse_to_match(self, match: Optional[dict]):
+        """`PageLocator` match me screen center pehle se hai, isliye alag rect call nahi lagti."""
+        if match and match.get("screen"):
+            self._move_mouse(match["screen"]["x"], match["screen"]["y"], jitter=22.0)
+
     def _apply_stealth_patches(self):
         scripts = [
             "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});",
@@ -385,7 +507,11 @@ class ChatGptAutomation:
         self.logger.info(f"Opning Url {url}")
         try:
             self.driver.get(url)
-            self._human_pause(5.0, 7.8)
+            if not self.waits.until("network_idle", self._network_idle_condition(), timeout=20):
+                self.logger.warning("Network idle nahi hua 20 sec me, aage badh rahe hain.")
+            if not self.waits.until("prompt_editor", lambda: self.locator.locate(PROMPT_EDITOR_XPATH)):
+                self.logger.warning("Prompt editor load nahi hua: %s", url)
+            self._human_pause(name="page_load")
             self._simulate_idle_user_activity()
             self._update_snackbar("Chat session ready")
         except Exception as e:
@@ -395,25 +521,28 @@ class ChatGptAutomation:
         """ye function more action button par click karta hai """
         self.logger.info(f"Clicking element: {locator}")
         try:
-            element = self.wait.until(Ec.presence_of_all_elements_located((locator_type, locator)))
-            lenth = len(element)
+            match = self.waits.until("more_actions", lambda: self.locator.locate((locator_type, locator)))
+            if match is None:
+                raise TimeoutError(f"{locator} not visible after {self.waits.timeout} sec")
+            lenth = match["count"]
             print(lenth)
-            last_element = element[-1]
+            last_element = match["element"]
             self.logger.info(f"Element lenth: {lenth}")
-            self._move_mouse_to_element(last_element)
+            self._move_mouse_to_match(match)
 
             last_element.send_keys(Keys.ENTER)  # Iske bina element par click nhi ho sakata hai kisi bhi tarike se kyonki element div ke niche hai.
             
         except Exception as e:
             self.logger.error(f"Click faild: {e}")
 
-    def _send_multiline_text(self, element, text: str):
+    def _send_multiline_text(self, element, text: str, submit: bool = True):
         """Textarea me text paste karte waqt newline ke liye Shift+Enter ka use karta hai."""
         actions = ActionChains(self.driver)
         actions.move_to_element(element).click().pause(self._random_typing_delay())
 
         if not text:
-            actions.send_keys(Keys.ENTER).perform()
+            if submit:
+                actions.send_keys(Keys.ENTER).perform()
             return
 
         for chunk in text.splitlines(keepends=True):
@@ -423,21 +552,87 @@ class ChatGptAutomation:
             if chunk.endswith(("\n", "\r")):
                 actions.key_down(Keys.SHIFT).send_keys(Keys.ENTER).key_up(Keys.SHIFT).pause(self._random_typing_delay())
 
-        actions.pause(self._random_typing_delay()).send_keys(Keys.ENTER).perform()
+        if submit:
+            actions.pause(self._random_typing_delay()).send_keys(Keys.ENTER)
+        actions.perform()
+
+    def _inject_text(self, element, text: str) -> bool:
+        """`text_input_strategies` ke order me text daalta hai ("script", "paste", "typing"); har strategy ke baad
+        editor ka text verify hota hai aur poora text milne par hi Enter se send hota hai. Timing `last_text_input` me."""
+        start_time = time()
+        attempts = []
+        for strategy in self.text_input_strategies:
+            strategy_start = time()
+            try:
+                if attempts:
+                    self.driver.execute_script(INJECT_TEXT_SCRIPT, element, "", "clear")
+                if strategy == "typing":
+                    self._send_multiline_text(element, text, submit=False)
+                elif strategy in ("script", "paste"):
+                    self.driver.execute_script(INJECT_TEXT_SCRIPT, element, text, strategy)
+                else:
+                    self.logger.warning("Unknown text input strategy %s, skip.", strategy)
+                    continue
+                check = self.driver.execute_script(EDITOR_TEXT_SCRIPT, element, text)
+            except Exception as exc:
+                self.logger.warning("Text input via %s failed: %s", strategy, exc)
+                attempts.append(strategy)
+                continue
+            attempts.append(strategy)
+            if check and check.get("ok"):
+                inject_ms = (time() - strategy_start) * 1000
+                ActionChains(self.driver).pause(self._random_typing_delay()).send_keys(Keys.ENTER).perform()
+                self.last_text_input = {
+                    "strategy": strategy,
+                    "inject_ms": round(inject_ms, 1),
+                    "total_ms": round((time() - start_time) * 1000, 1),
+                    "chars": len(text),
+                    "attempts": attempts,
+                }
+                self.logger.info(
+                    "Prompt injected via %s in %.0f ms (%s chars, attempts: %s)",
+                    strategy,
+                    inject_ms,
+                    len(text),
+                    ", ".join(attempts),
+                )
+                return True
+            self.logger.warning(
+                "Text input via %s incomplete: %s/%s chars in editor",
+                strategy,
+                check.get("actual_chars") if check else None,
+                check.get("expected_chars") if check else len(text),
+            )
+
+        self.last_text_input = {
+            "strategy": None,
+            "total_ms": round((time() - start_time) * 1000, 1),
+            "chars": len(text),
+            "attempts": attempts,
+        }
+        return False
 
-    def type_text(self, locator_type, locator, text: str):
-        """Ye funtion input field me text ko fill karta hai or send karta hai."""
+    def type_text(self, locator_type, locator, text: str) -> bool:
+        """Ye funtion input field me text ko fill karta hai or send karta hai. Editor me poora text verify na ho to
+        prompt send nahi hota aur False milta hai."""
         self.logger.info(f"Typing text in element {locator}")
         try:
-            element = self.wait.until(Ec.visibility_of_element_located((locator_type, locator)))  # ye function element ka tab tak wait karega jab tak ki element visibile na ho jaye ya timeout tak. until() bar bar funtion call karta hai or check karta  rahata hai.Isme arguments tuple ke form me bheje jate hai.
-            self._move_mouse_to_element(element)
+            match = self.waits.until("prompt_editor", lambda: self.locator.locate((locator_type, locator)))  # element visible hone tak ek hi script call se poll karta hai (find + visibility + rect saath me).
+            if match is None:
+                raise TimeoutError(f"{locator} not visible after {self.waits.timeout} sec")
+            element = match["element"]
+            self._move_mouse_to_match(match)
             element.click()
-            self._human_pause(*self.long_pause_range)
-            self._send_multiline_text(element, text)
-            self._human_pause()
-        
+            self._human_pause(name="before_type")
+            if not self._inject_text(element, text):
+                self.logger.error("Prompt text verify nahi hua, send skip: %s", self.last_text_input)
+                return False
+            self._human_pause(name="after_type")
+            return True
+
         except Exception as e:
             self.logger.error(f"Failed to type text in element: {locator} message:{e}")
+            return False
 
     def check_response_complete(
         self,
@@ -446,16 +641,93 @@ class ChatGptAutomation:
         poll_frequency: float = 1.0,
         confirmations_required: int = 2
     ):
-        """Busy indicator(button) HTML me tab tak rehta hai jab tak response stream ho raha hota hai."""
+        """Busy indicator(button) HTML me tab tak rehta hai jab tak response stream ho raha hota hai.
+
+        Pehle browser ke andar MutationObserver se wait hota hai (indicator gayab hote hi, debounce ke baad return);
+        observer na chal paye to purana polling path. Detection ka time `last_response_wait` me milta hai.
+        """
+        start_time = time()
+        result = None
+        if self.response_observer and send_button_locator[0] == By.XPATH:
+            result = self._observe_response_complete(send_button_locator[1], timeout)
+        else:
+            self.last_response_wait = {}
+        if result is None:
+            remaining = max(0.0, timeout - (time() - start_time))
+            polls_start = time()
+            result = self._poll_response_complete(send_button_locator, remaining, poll_frequency, confirmations_required)
+            self.last_response_wait["method"] = "polling"
+            self.last_response_wait["polling_ms"] = round((time() - polls_start) * 1000, 1)
+        self.last_response_wait["wait_ms"] = round((time() - start_time) * 1000, 1)
+        self.last_response_wait["complete"] = result
+        self.waits.record("response", time() - start_time, bool(result))
+        self.logger.info(
+            "Response wait %s: %.0f ms (settle %s ms, %s WebDriver calls)",
+            self.last_response_wait["method"],
+            self.last_response_wait["wait_ms"],
+            self.last_response_wait.get("settle_ms"),
+            self.last_response_wait.get("webdriver_calls"),
+        )
+        return result
+
+    def _observe_response_complete(self, xpath: str, timeout: float):
+        """MutationObserver wala wait; complete par True, timeout par False, observer fail ho to None (fallback)."""
+        start_time = time()
+        saw_busy = False
+        calls = 0
+        mutations = 0
+        self.last_response_wait = {"method": "observer"}
+        try:
+            self.driver.set_script_timeout(self.response_watch_segment + 15)
+        except Exception as exc:
+            self.logger.debug("Script timeout set skip: %s", exc)
+
+        while True:
+            elapsed = time() - start_time
+            remaining = timeout - elapsed
+            if remaining <= 0:
+                self.logger.warning("Response observer timeout %s sec, phir bhi aage badh rahe hain.", timeout)
+                self.last_response_wait.update({"webdriver_calls": calls, "mutations": mutations})
+                return False
+            try:
+                outcome = self.driver.execute_async_script(
+                    RESPONSE_COMPLETE_SCRIPT,
+                    xpath,
+                    int(self.response_debounce * 1000),
+                    int(max(0.0, self.response_start_grace - elapsed) * 1000),
+                    int(min(remaining, self.response_watch_segment) * 1000),
+                    saw_busy,
+                )
+            except Exception as exc:
+                self.logger.warning("Response observer fail, polling fallback: %s", exc)
+                self.last_response_wait.update({"webdriver_calls": calls, "observer_error": str(exc)[:200]})
+                return None
+            calls += 1
+            saw_busy = saw_busy or bool(outcome.get("saw_busy"))
+            mutations += outcome.get("mutations") or 0
+            if outcome.get("status") == "complete":
+                settle_ms = outcome.get("settle_ms")
+                self.last_response_wait.update({
+                    "webdriver_calls": calls,
+                    "mutations": mutations,
+                    "saw_busy": saw_busy,
+                    "settle_ms": None if settle_ms is None else round(settle_ms, 1),
+                })
+                return True
+
+    def _poll_response_complete(self, send_button_locator, timeout, poll_frequency, confirmations_required):
         self.logger.info("Stop streaming button ka wait shuru")
 
         absence_streak = 0
         start_time = time()
         last_scroll = 0.0
+        calls = self.last_response_wait.get("webdriver_calls", 0)
 
         try:
             while time() - start_time <= timeout:
                 element_present = bool(self.driver.find_elements(*send_button_locator))
+                calls += 1
+                self.last_response_wait["webdriver_calls"] = calls
                 now = time()
                 if element_present and (now - last_scroll) >= 2.0:
                     self._scroll_to_bottom()
@@ -500,86 +772,107 @@ class ChatGptAutomation:
         if isinstance(link_xpaths, str):
             link_xpaths = [link_xpaths]
 
-        for scroll_count in range(max_scrolls):
-            for xpath in link_xpaths:
-                try:
-                    link = self.driver.find_element(By.XPATH, xpath)
-                    self.logger.info("Download link found via pattern: %s", xpath)
-                    if link.is_displayed():
-                        scroll_div = self.driver.find_element(By.TAG_NAME, 'body')
-                        scroll_div.click()
-                        scroll_div.send_keys(Keys.END)
-                        return link
-                except NoSuchElementException:
-                    continue
-
-            self.logger.debug("Scrolling attempt %s", scroll_count + 1)
-            sleep(scroll_pause)
+        # Saare patterns ek call me; sirf visible link match hota hai (pehle find + is_displayed alag the).
+        match = self.waits.until(
+            "download_link",
+            lambda: self.locator.locate(link_xpaths),
+            timeout=max_scrolls * scroll_pause,
+            poll_frequency=scroll_pause,
+        )
+        if match is not None:
+            self.logger.info("Download link found via pattern: %s", match["selector"])
+            scroll_div = self.driver.find_element(By.TAG_NAME, 'body')
+            scroll_div.click()
+            scroll_div.send_keys(Keys.END)
+            return match["element"]
 
         self.logger.warning(
             "Target link not found after max scroll attempts. Continuing execution."
         )
         return None
 
-    def download_file(self, link_xpaths) -> bool:
-        """Ye function file download link par click karta hai or file download karta hai."""
+    def _set_download_directory(self):
+        """Existing profile apni download setting rakh sakta hai, isliye CDP se bhi per-run directory set karte hain."""
+        try:
+            self.driver.execute_cdp_cmd(
+                "Browser.setDownloadBehavior",
+                {"behavior": "allow", "downloadPath": str(self.download_manager.download_dir.resolve()), "eventsEnabled": True},
+            )
+        except Exception as exc:
+            self.logger.debug("CDP download behavior skip (prefs se chalega): %s", exc)
+        self.logger.info("Downloads directory: %s", self.download_manager.download_dir)
+
+    def download_file(self, link_xpaths, page_name: str = "", step: str = "") -> bool:
+        """Ye function file download link par click karta hai or file download karta hai.
+
+        `DOWNLOAD_VERIFY` on ho to click ke baad fixed sleep ki jagah file poori hone tak wait hota hai; file
+        `.Alien/C0101/Downloads/<page>/` me move hoti hai aur size + SHA-256 `last_download` me milta hai.
+        """
         if isinstance(link_xpaths, str):
             link_xpaths = [link_xpaths]
+        self.last_download = None
 
         self.logger.info("Clicking on download file element.")
 
-        def links_visible(driver):
-            for xpath in link_xpaths:
-                elements = driver.find_elements(By.XPATH, xpath)
-                if elements:
-                    return True
-            return False
-
         try:
-            self.wait.until(links_visible)
-            candidate_elements = []
-            chosen_pattern = None
-            for xpath in link_xpaths:
-                elements = self.driver.find_elements(By.XPATH, xpath)
-                if elements:
-                    candidate_elements = elements
-                    chosen_pattern = xpath
-            if not candidate_elements:
+            # Page par sabse aakhri visible link (kisi bhi pattern se) aur uska screen center ek hi call me.
+            match = self.waits.until("download_link", lambda: self.locator.locate(link_xpaths))
+            if match is None:
                 self.logger.warning("No download link found, skiping download ")
                 return False
 
-            last_element = candidate_elements[-1]
-            self.logger.info("Download link resolved with pattern: %s", chosen_pattern)
-            self._move_mouse_to_element(last_element)
-            self.logger.info("Pausing 5 seconds before download click")
-            self._human_pause(5.0, 5.0)
+            last_element = match["element"]
+            self.logger.info("Download link resolved with pattern: %s (%s matches)", match["selector"], match["count"])
+            self._move_mouse_to_match(match)
+            self.logger.info("Pausing before download click")
+            self._human_pause(name="before_download_click")
+            before = self.download_manager.snapshot() if self.download_verify else None
             self.action.move_to_element(last_element)\
                 .pause(0.3)\
                 .click()\
                 .perform()
-            self._human_pause(4.5, 6.8)
+            if not self.download_verify:
+                self._human_pause(name="after_download_click")
+                return True
+
+            download_start = time()
+            downloaded = self.download_manager.wait_for_download(before)
+            self.waits.record("download", time() - download_start, downloaded is not None)
+            wait = self.download_manager.last_wait
+            if downloaded is None:
+                self.logger.error("Download %s after %.0f ms: %s", wait.get("status"), wait.get("wait_ms", 0), wait)
+                return False
+            self.last_download = self.download_manager.store(downloaded, page_name or "unsorted", step)
+            self.logger.info(
+                "Downloaded %s (%s bytes, sha256 %s) in %.0f ms via %s",
+                self.last_download["path"],
+                self.last_download["size"],
+                self.last_download["sha256"][:12],
+                wait["wait_ms"],
+                wait["method"],
+            )
             return True
         except Exception as e:
             self.logger.error(f"Faild to download {e}")
             return False
 
-    def download_with_retry(self, link_xpaths, retry_wait: float = 10.0) -> bool:
+    def download_with_retry(self, link_xpaths, retry_wait: float = 10.0, page_name: str = "", step: str = "") -> bool:
         """Ensures download retry after prompt submission without losing scroll state."""
         self.scroll_until_link_present(link_xpaths)
-        self._human_pause(1.8, 3.4)
-        if self.download_file(link_xpaths):
+        self._human_pause(name="before_download")
+        if self.download_file(link_xpaths, page_name, step):
             return True
 
         self.logger.warning("Download attempt failed, retrying after %s seconds.", retry_wait)
-        self._human_pause(retry_wait, retry_wait)
+        self._human_pause(retry_wait, retry_wait, name="download_retry")
         try:
             self._scroll_to_bottom()
         except Exception as exc:
             self.logger.debug("Scroll to bottom failed during retry: %s", exc)
 
         self.scroll_until_link_present(link_xpaths)
-        self._human_pause(1.0, 2.0)
-        return self.download_file(link_xpaths)
+        self._human_pause(name="before_download_retry")
+        return self.download_file(link_xpaths, page_name, step)
   
     def create_new_branch_switch_driver(self):
         """Ye function new branch create karta hai or sath me driver ko main chat se brach wali chat pe switch karta hai"""
@@ -592,21 +885,36 @@ class ChatGptAutomation:
             self.old_tab = self.driver.window_handles           # Iska use driver ko branch wali tab par le jane ke liye kiya hai.
 
             self.click_more_action_button(locator_type,more_action_button_xpath)
-            self._human_pause(4.0, 6.5)
+            match = self.waits.until("menu_open", lambda: self.locator.locate((locator_type, new_branch_button_selector)))
+            if match is None:
+                raise TimeoutError(f"{new_branch_button_selector} not visible after {self.waits.timeout} sec")
+            self._human_pause(name="menu_open")
             self.logger.info(f"Clicking element {new_branch_button_selector}")
-            branch_button = self.wait.until(Ec.visibility_of_element_located((locator_type, new_branch_button_selector)))
-            self._move_mouse_to_element(branch_button)
-            branch_button.click()
+            self._move_mouse_to_match(match)
+            match["element"].click()
 
-            new_tabs = self.driver.window_handles
+            # Nayi tab turant handles me nahi aati, isliye uske khulne tak wait.
+            new_tabs = self.waits.until(
+                "tab_opened",
+                lambda: [tab for tab in self.driver.window_handles if tab not in self.old_tab],
+            )
 
-            for tab in new_tabs:
-                if tab  not in self.old_tab:
-                    self.driver.switch_to.window(tab)  # window() function se driver switch kiya hai new branch ki tab par
-                    break
+            for tab in new_tabs or []:
+                self.driver.switch_to.window(tab)  # window() function se driver switch kiya hai new branch ki tab par
+                break
+            if not new_tabs:
+                self.logger.error("Branch tab nahi khuli %s sec me", self.waits.timeout)
         except Exception as e:
             self.logger.error(f"Click Faild: {e}")
   
+    def resume_branch(self, url: str):
+        """Pichhle run ki branch chat ko nayi tab me kholta hai taaki bache hue steps usi conversation me chalein."""
+        self.old_tab1 = self.driver.current_window_handle
+        self.old_tab = self.driver.window_handles
+        self.logger.info("Resuming branch chat %s", url)
+        self.driver.switch_to.new_window("tab")
+        self.open_url(url)
+
     def _find_existing_path(self, candidates):
         for path in candidates:
             if path and Path(path).exists():
@@ -706,15 +1014,17 @@ class ChatGptAutomation:
         )
 
         try:
-            response = self.llm_client.chat.completions.create(
-                model=self.llm_deployment,
-                temperature=0.35,
-                max_tokens=min(600, max(200, int(len(prompt_text) * 1.3))),
-                messages=[
-                    {"role": "system", "content": instructions},
-                    {"role": "user", "content": user_payload},
-                ],
-            )
+            # Background kaam hai; desktop agent ki vision calls quota me pehle jati hain.
+            with rate_limiter.priority(rate_limiter.PRIORITY_BACKGROUND):
+                response = self.llm_client.chat.completions.create(
+                    model=self.llm_deployment,
+                    temperature=0.35,
+                    max_tokens=min(600, max(200, int(len(prompt_text) * 1.3))),
+                    messages=[
+                        {"role": "system", "content": instructions},
+                        {"role": "user", "content": user_payload},
+                    ],
+                )
 
             refined = (response.choices[0].message.content or "").strip()
             if refined:
@@ -920,18 +1230,30 @@ class ChatGptAutomation:
     def _write_tasks(self, csv_path: Path, rows, fieldnames=None):
         csv_path.parent.mkdir(parents=True, exist_ok=True)
         active_fields = fieldnames or TASK_FIELDNAMES
-        with open(csv_path, "w", encoding="utf-8", newline="") as file:
+        tmp_path = csv_path.with_name(f"{csv_path.name}.{os.getpid()}.tmp")  # crash par torn CSV na bane
+        with open(tmp_path, "w", encoding="utf-8", newline="") as file:
             writer = csv.DictWriter(file, fieldnames=active_fields)
             writer.writeheader()
             writer.writerows(rows)
+        os.replace(tmp_path, csv_path)
+
+    def _ensure_task_store(self) -> TaskStore:
+        """todo.csv (seed/migrate/normalize ke baad) ko SQLite task store me laata hai.
 
-    def _get_next_pending_task(self, csv_path: Path):
-        rows, fieldnames = self._read_tasks(csv_path)
-        for index, row in enumerate(rows):
-            status = row.get("complete_status") or row.get("status") or "0"
-            if status.strip() == "0":
-                return row, rows, index, fieldnames
-        return None, rows, None, fieldnames
+        CSV pichhle export ke baad bahar se edit hui ho to wahi source of truth maan kar dobara import hoti hai.
+        """
+        csv_path = self._ensure_tasks_csv()
+        store = TaskStore(self.todo_db_path)
+        if len(store) == 0 or store.csv_changed(csv_path):
+            count = store.import_csv(csv_path, self._normalize_task_row)
+            self.logger.info("Task store %s me %s tasks import kiye %s se", self.todo_db_path, count, csv_path)
+        return store
+
+    def _export_tasks(self, store: TaskStore):
+        try:
+            store.export_csv(self.todo_csv_path)
+        except Exception as exc:
+            self.logger.warning("Todo CSV export faild (%s): %s", self.todo_csv_path, exc)
 
     def _prepare_prompts(self, page_name: str):
         prompt1, prompt2, prompt3 = self.load_prompts()
@@ -946,72 +1268,127 @@ class ChatGptAutomation:
         refined = [self._refine_prompt(text, page_name, labels[idx]) for idx, text in enumerate(rendered)]
         return tuple(refined)
 
-    def _process_page(self, page_name: str, send_button_locator, download_link_xpaths) -> tuple[bool, str, dict]:
+    def _process_page(
+        self,
+        page_name: str,
+        send_button_locator,
+        download_link_xpaths,
+        task: Optional[dict] = None,
+        checkpoint=None,
+        record_download=None,
+    ) -> tuple[bool, str, dict]:
+        """Page ke steps chalata hai. `task` me jo step pehle se "1" hai wo skip hota hai (resume) aur har step
+        poora hote hi `checkpoint(planning="1")` jaise call se turant persist hota hai, taaki crash par kaam na khoye.
+        Verified download ka record (path, size, SHA-256) `record_download(record)` ko milta hai."""
+        task = task or {}
+        self.last_page_error = ""
+        self.command_counter.reset()
+        self.waits.begin_page(page_name)
+        step_status = {column: "1" if task.get(column) == "1" else "0" for column in STEP_STATUS_COLUMNS}
+        step_status["complete_status"] = "0"
+
+        def step_done(column):
+            step_status[column] = "1"
+            if checkpoint is not None:
+                checkpoint(**{column: "1"})
+
+        def download_done(column):
+            if record_download is not None and self.last_download is not None:
+                record_download(self.last_download)
+            step_done(column)
+
         try:
             prompt1, prompt2, prompt3 = self._prepare_prompts(page_name)
             self._update_snackbar(f"Ready: {page_name} plan prompt")
         except Exception as exc:
             self.logger.error("Prompt prepare faild for %s: %s", page_name, exc)
-            failure_status = {column: "0" for column in STEP_STATUS_COLUMNS}
-            failure_status["complete_status"] = "2"
-            return False, "", failure_status
+            self.last_page_error = f"prompt prepare: {exc}"
+            step_status["complete_status"] = "2"
+            self.last_page_waits = self.waits.end_page()
+            return False, "", step_status
 
         success = True
         generated_url = ""
-        step_status = {column: "0" for column in STEP_STATUS_COLUMNS}
-        step_status["complete_status"] = "0"
 
         try:
-            self.create_new_branch_switch_driver()
-            self._human_pause(2.4, 4.6)
-            if self._should_run_step("prompt1"):
+            resume_url = task.get("url")
+            if resume_url and any(step_status[column] == "1" for column in STEP_STATUS_COLUMNS):
+                self.resume_branch(resume_url)
+            else:
+                self.create_new_branch_switch_driver()
+                if len(self.driver.window_handles) > 1:
+                    self.waits.until("branch_ready", lambda: self.locator.locate(PROMPT_EDITOR_XPATH))
+                self._human_pause(name="branch_open")
+                # Branch URL turant save, taaki agle run me isi conversation se resume ho sake.
+                if checkpoint is not None and len(self.driver.window_handles) > 1:
+                    checkpoint(url=self.driver.current_url)
+            if step_status["planning"] == "1":
+                self.logger.info("Prompt1 already done for %s, resume skip.", page_name)
+            elif self._should_run_step("prompt1"):
                 self._update_snackbar(f"{page_name}: Sending plan")
-                self.type_text(By.XPATH, '//*[@id="prompt-textarea"]', prompt1)
+                if not self.type_text(By.XPATH, PROMPT_EDITOR_XPATH, prompt1):
+                    raise RuntimeError("prompt1 input failed")
                 self._post_prompt_routine()
                 self.check_response_complete(send_button_locator)
-                self._human_pause(2.0, 3.6)
-                step_status["planning"] = "1"
+                self._human_pause(name="after_response")
+                step_done("planning")
             else:
                 self.logger.info("Prompt1 bypassed for %s", page_name)
                 self._update_snackbar(f"{page_name}: Prompt1 bypassed")
 
-            if self._should_run_step("prompt2"):
+            if step_status["code_generate"] == "1":
+                self.logger.info("Prompt2 already done for %s, resume skip.", page_name)
+            elif self._should_run_step("prompt2"):
                 self._update_snackbar(f"{page_name}: Requesting build")
-                self.type_text(By.XPATH, '//*[@id="prompt-textarea"]', prompt2)
+                if not self.type_text(By.XPATH, PROMPT_EDITOR_XPATH, prompt2):
+                    raise RuntimeError("prompt2 input failed")
                 self._post_prompt_routine()
                 self.check_response_complete(send_button_locator)
-                self._human_pause(2.0, 3.6)
-                step_status["code_generate"] = "1"
+                self._human_pause(name="after_response")
+                step_done("code_generate")
             else:
                 self.logger.info("Prompt2 bypassed for %s", page_name)
                 self._update_snackbar(f"{page_name}: Prompt2 bypassed")
 
-            if self._should_run_step("download1"):
+            if step_status["code_download"] == "1":
+                self.logger.info("Download1 already done for %s, resume skip.", page_name)
+            elif self._should_run_step("download1"):
                 self._update_snackbar(f"{page_name}: Download prep")
-                download_success = self.download_with_retry(download_link_xpaths)
-                step_status["code_download"] = "1" if download_success else "0"
+                download_success = self.download_with_retry(download_link_xpaths, page_name=page_name, step="code_download")
+                if download_success:
+                    download_done("code_download")
+                else:
+                    self.last_page_error = "code download failed"
                 success = download_success and success
-                self._human_pause(2.7, 4.5)
+                self._human_pause(name="after_download")
             else:
                 self.logger.info("Download1 bypassed for %s", page_name)
                 self._update_snackbar(f"{page_name}: Download1 bypassed")
 
-            if self._should_run_step("prompt3"):
+            if step_status["docs_generate"] == "1":
+                self.logger.info("Prompt3 already done for %s, resume skip.", page_name)
+            elif self._should_run_step("prompt3"):
                 self._update_snackbar(f"{page_name}: Final doc")
-                self.type_text(By.XPATH, '//*[@id="prompt-textarea"]', prompt3)
+                if not self.type_text(By.XPATH, PROMPT_EDITOR_XPATH, prompt3):
+                    raise RuntimeError("prompt3 input failed")
                 self._post_prompt_routine()
                 self.check_response_complete(send_button_locator)
-                self._human_pause(2.0, 3.6)
-                step_status["docs_generate"] = "1"
+                self._human_pause(name="after_response")
+                step_done("docs_generate")
             else:
                 self.logger.info("Prompt3 bypassed for %s", page_name)
                 self._update_snackbar(f"{page_name}: Prompt3 bypassed")
 
-            if self._should_run_step("download2"):
-                download_success = self.download_with_retry(download_link_xpaths)
-                step_status["docs_download"] = "1" if download_success else "0"
+            if step_status["docs_download"] == "1":
+                self.logger.info("Download2 already done for %s, resume skip.", page_name)
+            elif self._should_run_step("download2"):
+                download_success = self.download_with_retry(download_link_xpaths, page_name=page_name, step="docs_download")
+                if download_success:
+                    download_done("docs_download")
+                else:
+                    self.last_page_error = "docs download failed"
                 success = download_success and success
-                self._human_pause(2.7, 4.5)
+                self._human_pause(name="after_download")
             else:
                 self.logger.info("Download2 bypassed for %s", page_name)
                 self._update_snackbar(f"{page_name}: Download2 bypassed")
@@ -1021,6 +1398,7 @@ class ChatGptAutomation:
                 generated_url = ""
         except Exception as exc:
             success = False
+            self.last_page_error = str(exc)
             self.logger.error("Processing faild for %s: %s", page_name, exc)
             self._update_snackbar(f"{page_name}: Error, see logs")
         finally:
@@ -1031,6 +1409,22 @@ class ChatGptAutomation:
             except Exception:
                 pass
 
+        self.last_page_commands = self.command_counter.as_dict()
+        self.last_page_waits = self.waits.end_page()
+        self.logger.info(
+            "Wait time for %s: conditions %.1f s, sleeps %.1f s (profile %s)",
+            page_name,
+            self.last_page_waits["condition_ms"] / 1000,
+            self.last_page_waits["sleep_ms"] / 1000,
+            self.waits.profile,
+        )
+        self.logger.info(
+            "WebDriver commands for %s: %s (%.0f ms), top: %s",
+            page_name,
+            self.last_page_commands["commands"],
+            self.last_page_commands["command_ms"],
+            self.last_page_commands["top"],
+        )
         if success:
             self._update_snackbar(f"{page_name}: Completed ✓")
         else:
@@ -1042,46 +1436,102 @@ class ChatGptAutomation:
         """Is function me baki sare funtion call kiye hai loop ke satha me yhi branch create, text type, Respose wait, Scroll or file download ka function call kiye hai or last me driver ko vapas main chat par switch kiya hai."""
         download_link_xpaths = DOWNLOAD_LINK_XPATHS
         send_button_locator = (By.XPATH, '//button[@aria-label="Stop streaming"]')
-        csv_path = self._ensure_tasks_csv()
+        store = self._ensure_task_store()
+        processed = 0
 
-        while True:
-            task, rows, index, fieldnames = self._get_next_pending_task(csv_path)
-            if task is None:
-                self.logger.info("Koi pending page nahi bacha, loop stop.")
-                break
+        try:
+            while True:
+                task = store.next_pending(self.task_max_attempts)
+                if task is None:
+                    retry_at = store.next_retry_at(self.task_max_attempts)
+                    if retry_at is None:
+                        self.logger.info("Koi pending page nahi bacha, loop stop.")
+                        break
+                    wait = max(0.0, retry_at - time())
+                    self.logger.info("Sirf failed pages bache hain, agla retry %.0f sec baad.", wait)
+                    self._update_snackbar(f"Retry wait: {wait:.0f}s")
+                    sleep(wait)
+                    continue
 
-            page_name = task.get("page_name") or task.get("name") or task.get("title")
-            if not page_name:
-                self.logger.error("Task me page name missing hai, status failed mark kar rahe hain.")
-                if index is not None:
-                    rows[index]["complete_status"] = "2"
-                    self._write_tasks(csv_path, rows, fieldnames)
-                continue
+                page_name = task.get("page_name")
+                if not page_name:
+                    self.logger.error("Task me page name missing hai, status failed mark kar rahe hain.")
+                    # Retry se kuch nahi badlega, isliye attempts seedha khatam.
+                    store.update(
+                        task["seq"],
+                        complete_status="2",
+                        attempts=self.task_max_attempts,
+                        last_error="page name missing",
+                    )
+                    continue
 
-            self.logger.info("Processing page: %s", page_name)
-            success, generated_url, step_status = self._process_page(page_name, send_button_locator, download_link_xpaths)
+                if task.get("complete_status") == "2":
+                    self.logger.info(
+                        "Retrying page %s (attempt %s/%s): %s",
+                        page_name,
+                        task["attempts"] + 1,
+                        self.task_max_attempts,
+                        task.get("last_error") or "unknown error",
+                    )
+                else:
+                    self.logger.info("Processing page: %s", page_name)
+                success, generated_url, step_status = self._process_page(
+                    page_name,
+                    send_button_locator,
+                    download_link_xpaths,
+                    task=task,
+                    checkpoint=lambda seq=task["seq"], **values: store.update(seq, **values),
+                    record_download=lambda record, seq=task["seq"]: store.record_download(seq, record),
+                )
 
-            if index is not None:
-                for column in STEP_STATUS_COLUMNS:
-                    rows[index][column] = step_status.get(column, rows[index].get(column, "0"))
-                rows[index]["complete_status"] = step_status.get("complete_status", "1" if success else "2")
-                if generated_url:
-                    rows[index]["url"] = generated_url
-                self._write_tasks(csv_path, rows, fieldnames)
-            else:
-                self.logger.warning("Index missing for task %s, CSV update skip.", page_name)
+                # Steps checkpoint ho chuke hain; yaha sirf final status aur URL (poori CSV har page par nahi likhi jati).
+                if success:
+                    values = {"complete_status": "1"}
+                    if generated_url:
+                        values["url"] = generated_url
+                    store.update(task["seq"], **values)
+                else:
+                    if generated_url:
+                        store.update(task["seq"], url=generated_url)
+                    delay = min(self.task_retry_backoff_max, self.task_retry_backoff * 2 ** task["attempts"])
+                    store.record_failure(task["seq"], self.last_page_error, retry_delay=delay * random.uniform(0.8, 1.2))
+
+                processed += 1
+                if self.csv_export_every and processed % self.csv_export_every == 0:
+                    self._export_tasks(store)
+        finally:
+            self._export_tasks(store)
+            store.close()
+            self._write_wait_report()
+
+    def _write_wait_report(self):
+        """Run ke har page ka condition-wait vs sleep time `.Alien/C0101/Logs/wait_report.json` me."""
+        report = self.waits.run_report()
+        try:
+            WAIT_REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+            WAIT_REPORT_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        except OSError as exc:
+            self.logger.warning("Wait report save nahi hua: %s", exc)
+        self.logger.info(
+            "Run wait summary (%s pages, profile %s): conditions %.1f s, sleeps %.1f s",
+            len(report["pages"]),
+            report["profile"],
+            report["condition_ms"] / 1000,
+            report["sleep_ms"] / 1000,
+        )
 
     def close(self):
         "ye function browser ko close karta hai."
         self.logger.info("Closing browser")
         self.driver.quit()   # Browser ko close karta hai
+        self.download_manager.cleanup()
         if hasattr(self, "snackbar") and self.snackbar:
             self.snackbar.close()
         if getattr(self, "snackbar_handler", None):
             logging.getLogger().removeHandler(self.snackbar_handler)
 
 if __name__ == "__main__":
-    url = CHAT_SESSION_URL
+    url = config.CHAT_SESSION_URL
     obj = ChatGptAutomation(profile_path="C:/Users/Root/AppData/Local/Google/Chrome/User Data/profile for selenium", profile_name="Profile 2")
     obj.open_url(url)
     sleep(2)
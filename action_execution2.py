@@ -1,13 +1,225 @@
-import pyautogui
+import time
+
+import numpy as np
+
+import config
+
+ACTIONS = {"click", "double_click", "type", "hotkey", "scroll", "drag"}
+
+# Sirf single click dobara chalta hai. Double click app/file kholta hai (der se khule to do baar launch hoga),
+# scroll view ko phir khiskata hai, type/drag ka asar double hota hai; inka fail hona seedha report hota hai.
+RETRYABLE_ACTIONS = {"click"}
+
+# Double click se app/file khulne me 0.4 sec se zyada lagta hai, isliye inka verify `launch_timeout` tak rukta hai.
+LAUNCH_ACTIONS = {"double_click"}
+
+# Hotkey ka asar aksar cursor ke aas-paas nahi dikhta, isliye default verify off.
+UNVERIFIED_ACTIONS = {"hotkey"}
+
+_VERIFY_POLL = 0.01
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def build_plan(element):
+    """Vision result se action plan (steps ki list) banata hai.
+
+    `element` me `steps` list ho to wahi plan hai, warna ek step jiska action `element["action"]` (default click) hai.
+    Jis step me x/y na ho wo element ke x/y use karta hai (hotkey ko chhod kar).
+    """
+    if not element:
+        return []
+    steps = element.get("steps") or [{key: value for key, value in element.items() if key != "steps"}]
+    plan = []
+    for step in steps:
+        step = dict(step)
+        step.setdefault("action", "click")
+        if step["action"] not in UNVERIFIED_ACTIONS and "x" not in step and "y" not in step and "x" in element and "y" in element:
+            step["x"], step["y"] = element["x"], element["y"]
+        plan.append(step)
+    return plan
 
 
 class ActionExecuter:
-    def __init__(self):
-        pass 
+    """Click, double click, type, hotkey, scroll aur drag ke plans chalata hai.
+
+    `screen_capture` mile to har step ke baad target ke aas-paas ka chhota ROI grab karke pehle wale se diff karta hai;
+    kuch na badle to pointer actions wahi point par local retry hote hain (naya vision call nahi).
+    `dry_run` me pyautogui load nahi hota; steps sirf `last_report` me likhe jate hain (replay/headless ke liye).
+    """
+
+    def __init__(
+        self,
+        screen_capture=None,
+        move_duration=None,
+        verify=None,
+        roi_size=None,
+        verify_timeout=None,
+        launch_timeout=None,
+        min_change=None,
+        retries=None,
+        dry_run=False,
+    ):
+        self.screen_capture = screen_capture
+        self.dry_run = dry_run
+        self.move_duration = config.ACTION_MOVE_DURATION if move_duration is None else move_duration
+        self.verify = config.ACTION_VERIFY if verify is None else verify
+        self.roi_size = int(config.ACTION_VERIFY_ROI if roi_size is None else roi_size)
+        self.verify_timeout = config.ACTION_VERIFY_TIMEOUT if verify_timeout is None else verify_timeout
+        self.launch_timeout = config.ACTION_VERIFY_LAUNCH_TIMEOUT if launch_timeout is None else launch_timeout
+        self.min_change = config.ACTION_VERIFY_CHANGE if min_change is None else min_change
+        self.retries = config.ACTION_RETRIES if retries is None else retries
+        self.pause = config.ACTION_PAUSE
+        self.last_report = []
+        self._gui = None
+
+    @property
+    def gui(self):
+        # pyautogui ka import mehenga hai, isliye pehle action par hota hai.
+        if self._gui is None:
+            import pyautogui
+
+            # pyautogui har call ke baad default 0.1 sec sota hai.
+            pyautogui.PAUSE = self.pause
+            self._gui = pyautogui
+        return self._gui
+
+    def warm_up(self):
+        return None if self.dry_run else self.gui
+
+    def _grab_roi(self, x, y):
+        if self.screen_capture is None or x is None or y is None:
+            return None
+        half = self.roi_size // 2
+        screenshot = self.screen_capture.grab_region(x - half, y - half, self.roi_size, self.roi_size)
+        if screenshot is None:
+            return None
+        width, height = screenshot.size
+        pixels = np.frombuffer(screenshot.bgra, dtype=np.uint8).reshape(height, width, 4)
+        return pixels[..., :3].astype(np.int16)
+
+    @staticmethod
+    def _changed_fraction(before, after):
+        if before is None or after is None or before.shape != after.shape:
+            return None
+        # Anti-aliasing/cursor blink jaise 1-2 level ke farq ko ignore karta hai.
+        changed = np.abs(after - before).max(axis=2) > 16
+        return float(changed.mean())
+
+    def _wait_for_change(self, before, x, y, timeout=None):
+        """ROI badalne tak (ya `timeout`, default `verify_timeout`, tak) chhote intervals me poll karta hai."""
+        deadline = time.perf_counter() + (self.verify_timeout if timeout is None else timeout)
+        change = 0.0
+        while True:
+            fraction = self._changed_fraction(before, self._grab_roi(x, y))
+            if fraction is None:
+                return None
+            change = max(change, fraction)
+            if change >= self.min_change or time.perf_counter() >= deadline:
+                return change
+            time.sleep(_VERIFY_POLL)
+
+    def _point(self, step):
+        x, y = step.get("x"), step.get("y")
+        if _is_number(x) and _is_number(y):
+            return x, y
+        x, y = self.gui.position()
+        return x, y
+
+    def _perform(self, step, x, y):
+        action = step["action"]
+        if action == "click":
+            self.gui.click(x, y, button=step.get("button", "left"))
+        elif action == "double_click":
+            self.gui.doubleClick(x, y, button=step.get("button", "left"))
+        elif action == "type":
+            self.gui.write(str(step.get("text", "")), interval=step.get("interval", 0.0))
+            if step.get("enter"):
+                self.gui.press("enter")
+        elif action == "hotkey":
+            self.gui.hotkey(*step.get("keys", ()))
+        elif action == "scroll":
+            self.gui.scroll(int(step.get("clicks", -3)), x, y)
+        elif action == "drag":
+            self.gui.dragTo(
+                step["to_x"],
+                step["to_y"],
+                duration=step.get("duration", self.move_duration),
+                button=step.get("button", "left"),
+            )
+
+    def _validate(self, step):
+        action = step.get("action")
+        if action not in ACTIONS:
+            return f"unknown action {action!r}"
+        if action in {"click", "double_click", "drag"} and not (_is_number(step.get("x")) and _is_number(step.get("y"))):
+            return "missing numeric x/y"
+        if action == "drag" and not (_is_number(step.get("to_x")) and _is_number(step.get("to_y"))):
+            return "missing numeric to_x/to_y"
+        if action == "hotkey" and not step.get("keys"):
+            return "missing keys"
+        return None
+
+    def run_step(self, step):
+        start = time.perf_counter()
+        action = step["action"]
+        report = {"action": action, "attempts": 0, "verified": None, "change": None}
+        if self.dry_run:
+            report.update({"attempts": 1, "dry_run": True, "x": step.get("x"), "y": step.get("y"), "ok": True})
+            report["ms"] = _elapsed_ms(start)
+            return report
+
+        x, y = self._point(step)
+        if _is_number(step.get("x")) and _is_number(step.get("y")):
+            self.gui.moveTo(x, y, duration=step.get("move_duration", self.move_duration))
+
+        verify = self.verify and step.get("verify", action not in UNVERIFIED_ACTIONS)
+        attempts = 1 + (self.retries if action in RETRYABLE_ACTIONS else 0)
+        ok = True
+        for attempt in range(attempts):
+            # Hover ke baad ka ROI baseline hai, taaki hover highlight ko click ka asar na samjha jaye.
+            before = self._grab_roi(x, y) if verify else None
+            self._perform(step, x, y)
+            report["attempts"] = attempt + 1
+            if before is None:
+                break
+            timeout = self.launch_timeout if action in LAUNCH_ACTIONS else self.verify_timeout
+            change = self._wait_for_change(before, x, y, timeout)
+            report["change"] = None if change is None else round(change, 4)
+            ok = change is None or change >= self.min_change
+            report["verified"] = change is not None and ok
+            if ok:
+                break
+            print(f"Action {action} at ({x}, {y}) had no visible effect, attempt {attempt + 1}/{attempts}")
+
+        report["ok"] = ok
+        report["ms"] = _elapsed_ms(start)
+        return report
+
+    def run_plan(self, plan):
+        """Plan ke steps order me chalata hai; koi step fail ho to wahin ruk kar False deta hai."""
+        self.last_report = []
+        for step in plan:
+            error = self._validate(step)
+            if error is not None:
+                print(f"Invalid action step {step}: {error}, action skip.")
+                self.last_report.append({"action": step.get("action"), "ok": False, "error": error})
+                return False
+            report = self.run_step(step)
+            self.last_report.append(report)
+            if not report["ok"]:
+                return False
+        return bool(plan)
 
     def action_execution(self, element):
-        x = element.get("x", "")
-        y = element.get("y", "")
+        if not element:
+            print("No target element found, action skip.")
+            return False
 
-        pyautogui.moveTo(x, y, duration=3)
-        pyautogui.click()
+        return self.run_plan(build_plan(element))
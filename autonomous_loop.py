@@ -1,27 +1,549 @@
-from text_input import UserTextInput
+import contextlib
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from text_input import UserTextInput, iter_commands, normalize_command
 from screen_capture2 import ScreenCapture
-from vision_analyzer2 import VisionAnalzer
+from vision_analyzer2 import VisionAnalzer, AsyncVisionAnalzer
 from action_execution2 import ActionExecuter
+from frame_hash import FrameHasher
+from vision_cache import VisionCache
+from template_index import TemplateIndex
+from element_map import ElementMapStore
+from pipeline_metrics import PipelineMetrics
+import azure_clients
+import rate_limiter
+import config
+
+SESSION_EXIT_COMMANDS = {"exit", "quit", "stop", "band karo"}
 
 class AutonomousLoop:
-    def __init__(self):
+    def __init__(self, screen_capture=None, vision_analizer=None, action_execution=None, recorder=None):
         self.user_text = UserTextInput()
-        self.screen_capture = ScreenCapture()
-        self.vision_analizer = VisionAnalzer()
-        self.action_execution = ActionExecuter()
+        self.screen_capture = screen_capture or ScreenCapture()
+        if vision_analizer is None:
+            vision_analizer = AsyncVisionAnalzer() if config.VISION_ASYNC else VisionAnalzer()
+        self.vision_analizer = vision_analizer
+        self.action_execution = action_execution or ActionExecuter(screen_capture=self.screen_capture)
+        self.recorder = recorder
+        self.metrics = PipelineMetrics(
+            json_path=config.PIPELINE_METRICS_JSON,
+            prometheus_path=config.PIPELINE_METRICS_PROM,
+        )
+        self.frame_hasher = FrameHasher(
+            block_size=config.FRAME_HASH_BLOCK,
+            stride=config.FRAME_HASH_STRIDE,
+            tolerance=config.FRAME_HASH_TOLERANCE,
+            unchanged_ratio=config.FRAME_UNCHANGED_RATIO,
+        )
+        self.vision_cache = VisionCache(
+            max_entries=config.VISION_CACHE_SIZE,
+            ttl=config.VISION_CACHE_TTL,
+            path=config.VISION_CACHE_PATH,
+        )
+        self.template_index = None
+        if config.TEMPLATE_MATCHING:
+            self.template_index = TemplateIndex(
+                directory=config.TEMPLATE_INDEX_DIR,
+                patch_size=config.TEMPLATE_PATCH_SIZE,
+                threshold=config.TEMPLATE_MATCH_THRESHOLD,
+                scales=config.TEMPLATE_SCALES,
+            )
+        self.element_maps = None
+        if config.ELEMENT_MAP:
+            self.element_maps = ElementMapStore(max_entries=config.ELEMENT_MAP_SIZE, cell_size=config.ELEMENT_MAP_CELL)
+        self.element_map_min_score = config.ELEMENT_MAP_MIN_SCORE
+        self.element_map_min_confidence = config.ELEMENT_MAP_MIN_CONFIDENCE
+        self.changed_region_mode = config.CHANGED_REGION_MODE
+        self.changed_region_max_ratio = config.CHANGED_REGION_MAX_RATIO
+        self.last_signature = None
+        self.last_monitor = None
+        self.monitor_history = {}
+        self.last_command = None
+        self.last_result = None
+        self.last_metrics = {}
+        self._located_frame = None
+        self.last_frame = None
+        self.vision_calls = []
+        self.settle_delay = config.SESSION_SETTLE_DELAY
+        self.session_stats = {}
+        self._pool = None
+        self._warmup = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="AutonomousLoop")
+        return self._pool
+
+    def _warm_clients(self):
+        start = time.perf_counter()
+        if config.AZURE_WARM_UP and hasattr(self.vision_analizer, "warm_up"):
+            self.vision_analizer.warm_up()
+        else:
+            self.vision_analizer.client
+        self.action_execution.warm_up()
+        return round((time.perf_counter() - start) * 1000, 3)
+
+    def warm_up(self):
+        """openai/pyautogui imports aur clients background me bana deta hai, jab tak user command type kar raha hai."""
+        if self._warmup is None:
+            self._warmup = self._executor().submit(self._warm_clients)
+        return self._warmup
+
+    def _wait_warm_up(self, metrics):
+        if not self._warmup:
+            return
+        try:
+            metrics["warm_up_ms"] = self._warmup.result()
+        except Exception as e:
+            print(f"An error when warming up clients {e}")
+        self._warmup = False
+
+    def _analyze(self, screenshot, command, region=None, payload=None):
+        if payload is None:
+            img = self.screen_capture.encode_frame(screenshot, region)
+            geometry = self.screen_capture.last_geometry
+        else:
+            img, geometry = payload
+            # Prefetch/background wala frame sirf tab store hota hai jab sach me model ko jaye.
+            self.screen_capture.store_payload(img)
+        if img is None:
+            return None
+
+        analyze = getattr(self.vision_analizer, "analyze_screen_sync", self.vision_analizer.analyze_screen)
+        result = analyze(
+            img,
+            command,
+            self.screen_capture.mime_type,
+            geometry,
+        )
+        self.vision_calls.append({
+            "request": getattr(self.vision_analizer, "last_request", None),
+            "response": getattr(self.vision_analizer, "last_response", None),
+            "stats": dict(getattr(self.vision_analizer, "last_stats", {})),
+            "geometry": None if geometry is None else geometry.as_dict(),
+            "result": result,
+        })
+        return result
+
+    def _map_screen(self, img, geometry):
+        if img is None:
+            return None
+        self.screen_capture.store_payload(img)
+        map_screen = getattr(self.vision_analizer, "map_screen_sync", self.vision_analizer.map_screen)
+        elements = map_screen(img, self.screen_capture.mime_type, geometry)
+        self.vision_calls.append({
+            "request": getattr(self.vision_analizer, "last_request", None),
+            "response": getattr(self.vision_analizer, "last_response", None),
+            "stats": dict(getattr(self.vision_analizer, "last_stats", {})),
+            "geometry": None if geometry is None else geometry.as_dict(),
+            "result": None if elements is None else {"elements": len(elements)},
+        })
+        return elements
+
+    def _element_map(self, key, screenshot, payload, metrics):
+        """Frame ka element map (cache se ya ek model call se) aur use hua encoded payload deta hai."""
+        encoded = {"payload": payload}
+
+        def build():
+            if encoded["payload"] is None:
+                img = self.screen_capture.encode_frame(screenshot)
+                encoded["payload"] = (img, self.screen_capture.last_geometry)
+            return self._map_screen(*encoded["payload"])
+
+        start = time.perf_counter()
+        element_map, metrics["element_map"] = self.element_maps.get_or_build(key, build)
+        metrics["element_map_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if element_map is not None:
+            metrics["element_map_size"] = len(element_map)
+        return element_map, encoded["payload"]
+
+    def _target_changed(self, region):
+        """Check karta hai ki pichhla target point badle hue region ke andar to nahi aa gaya."""
+        if region is None or self.last_result is None:
+            return False
+        monitor = self.screen_capture.monitor
+        x = self.last_result.get("x", 0) - monitor["left"]
+        y = self.last_result.get("y", 0) - monitor["top"]
+        return (
+            region["left"] <= x < region["left"] + region["width"]
+            and region["top"] <= y < region["top"] + region["height"]
+        )
+
+    def locate_target(self, command, prefetched=None):
+        """Frame hash se decide karta hai: pichhla analysis reuse, sirf changed region bhejna, ya full frame.
+
+        `prefetched` (session mode ka pehle se encode kiya frame) tabhi use hota hai jab fresh frame ka hash match kare.
+        """
+        metrics = {"decision": "full"}
+        self.last_metrics = metrics
+        self._wait_warm_up(metrics)
+        self.last_frame = None
+        self.vision_calls = []
+        normalized = normalize_command(command)
+
+        if self.screen_capture.auto_monitor:
+            self.screen_capture.select_monitor(
+                self.screen_capture.pick_monitor(command, self.monitor_history.get(normalized))
+            )
+        monitor_index = self.screen_capture.monitor_index
+        metrics["monitor"] = monitor_index
+
+        screenshot = self.screen_capture.grab()
+        if screenshot is None:
+            return None
+        self.last_frame = screenshot
+
+        signature, metrics["hash_ms"] = self.frame_hasher.timed_compute(screenshot)
+        previous = self.last_signature if self.last_monitor == monitor_index else None
+        change = self.frame_hasher.compare(previous, signature)
+        metrics["changed_fraction"] = change["changed_fraction"]
+        metrics["changed_region"] = change["region"]
+
+        same_command = normalized == self.last_command and self.last_result is not None
+
+        if same_command and change["unchanged"] and not self._target_changed(change["region"]):
+            metrics["decision"] = "reuse"
+            metrics["capture"] = dict(self.screen_capture.last_stats)
+            return self.last_result
+
+        self._located_frame = (normalized, screenshot, monitor_index)
+        if self.template_index is not None and normalized in self.template_index:
+            match = self.template_index.locate(normalized, screenshot, monitor_index)
+            metrics["template"] = dict(self.template_index.last_stats)
+            if match is not None:
+                monitor = self.screen_capture.monitor
+                match["x"] += monitor["left"]
+                match["y"] += monitor["top"]
+                metrics["decision"] = "template"
+                metrics["capture"] = dict(self.screen_capture.last_stats)
+                self._remember_result(signature, monitor_index, normalized, match)
+                return match
+
+        payload = None
+        if prefetched is not None and prefetched.get("image") and prefetched["monitor"] == monitor_index:
+            if self.frame_hasher.compare(prefetched["signature"], signature)["unchanged"]:
+                payload = (prefetched["image"], prefetched["geometry"])
+                metrics["prefetch"] = "hit"
+            else:
+                metrics["prefetch"] = "stale"
+
+        # Ek hi screen par agle commands map ke label index se local resolve hote hain.
+        element_map = None
+        if self.element_maps is not None:
+            element_map, payload = self._element_map(f"{monitor_index}:{signature.digest}", screenshot, payload, metrics)
+            match = None
+            if element_map is not None:
+                match = element_map.find(command, self.element_map_min_score, self.element_map_min_confidence)
+            if match is not None:
+                metrics["decision"] = "element_map"
+                metrics["element_match"] = {key: match[key] for key in ("label", "role", "score", "matched_by")}
+                metrics["capture"] = dict(self.screen_capture.last_stats)
+                self._remember_result(signature, monitor_index, normalized, match)
+                return match
+
+        start = time.perf_counter()
+        element_data = None
+        if (
+            self.changed_region_mode
+            and same_command
+            and change["region"] is not None
+            and change["changed_fraction"] <= self.changed_region_max_ratio
+        ):
+            metrics["decision"] = "region"
+            # Region wali request network par ho tab tak full frame background me encode ho jata hai.
+            full_encode = None
+            if payload is None:
+                full_encode = self._executor().submit(self.screen_capture.encode_payload, screenshot)
+            element_data = self._analyze(screenshot, command, change["region"])
+            if element_data is None and full_encode is not None:
+                try:
+                    img, geometry, _ = full_encode.result()
+                    payload = (img, geometry)
+                except Exception as e:
+                    print(f"An error when screen capture {e}")
+
+        if element_data is None:
+            if metrics["decision"] == "region":
+                metrics["decision"] = "region_fallback"
+            cache_key = VisionCache.make_key(f"{monitor_index}:{signature.digest}", normalized)
+            element_data, metrics["cache"] = self.vision_cache.get_or_compute(
+                cache_key,
+                lambda: self._analyze(screenshot, command, payload=payload),
+            )
+        metrics["vision_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        metrics["capture"] = dict(self.screen_capture.last_stats)
+
+        if element_data is not None:
+            self._remember_result(signature, monitor_index, normalized, element_data)
+            if element_map is not None:
+                # Model ka point jis element par pada, wahi is command ka alias ban jata hai.
+                element = element_map.element_at(element_data["x"], element_data["y"])
+                if element is not None:
+                    element_map.add_alias(normalized, element["id"])
+                    metrics["element_alias"] = element["label"]
+
+        return element_data
+
+    def _remember_result(self, signature, monitor_index, normalized, element_data):
+        self.last_signature = signature
+        self.last_monitor = monitor_index
+        self.monitor_history[normalized] = monitor_index
+        self.last_command = normalized
+        self.last_result = element_data
+
+    def _learn_target(self, element_data):
+        """Successful click ke baad remote model wale target ka patch template index me save karta hai."""
+        located, self._located_frame = self._located_frame, None
+        if self.template_index is None or located is None or element_data.get("source") == "template":
+            return
+        normalized, screenshot, monitor_index = located
+        monitor = self.screen_capture.monitors[monitor_index]
+        self.template_index.remember(
+            normalized,
+            screenshot,
+            element_data["x"] - monitor["left"],
+            element_data["y"] - monitor["top"],
+            monitor_index,
+        )
+
+    def execute_target(self, element_data, command=None):
+        """Target par action chalata hai; template wala target fail ho to entry hata kar remote vision se dobara try."""
+        if self.action_execution.action_execution(element_data):
+            self._learn_target(element_data)
+            return True
+        if element_data.get("source") != "template" or command is None or self.template_index is None:
+            return False
+
+        # Purana/galat template baar baar na jeete: index se hata kar model se naya target lete hain.
+        normalized = normalize_command(command)
+        self.template_index.forget(normalized)
+        self.last_result = None
+        template_metrics = self.last_metrics
+        retry = self.locate_target(command)
+        self.last_metrics["template_forgotten"] = {
+            "x": element_data.get("x"),
+            "y": element_data.get("y"),
+            "confidence": element_data.get("confidence"),
+            "template": template_metrics.get("template"),
+        }
+        if retry is None or retry.get("source") == "template":
+            return False
+        retry = dict(retry)
+        retry.update({key: element_data[key] for key in ("action", "steps") if key in element_data})
+        if not self.action_execution.action_execution(retry):
+            return False
+        self._learn_target(retry)
+        return True
+
+    def _observe_command(self, element_data, ok, elapsed_ms):
+        """Command ke stage timings, payload sizes aur token usage `self.metrics` histograms me daalta hai."""
+        observe = self.metrics.observe
+        metrics = self.last_metrics
+        capture = metrics.get("capture") or {}
+        for key in ("grab", "convert", "resize", "encode", "base64", "persist"):
+            observe(f"capture.{key}", capture.get(f"{key}_ms"))
+        for key in ("raw_bytes", "encoded_bytes", "base64_bytes"):
+            self.metrics.observe_size(f"capture.{key}", capture.get(key))
+        observe("hash", metrics.get("hash_ms"))
+        observe("template", (metrics.get("template") or {}).get("match_ms"))
+        observe("element_map", metrics.get("element_map_ms"))
+        observe("vision", metrics.get("vision_ms"))
+
+        for call in self.vision_calls:
+            stats = call.get("stats") or {}
+            observe("vision.network", stats.get("request_ms"))
+            observe("vision.first_token", stats.get("first_token_ms"))
+            observe("vision.parse", stats.get("parse_ms"))
+            self.metrics.observe_size("vision.request_image", (call.get("request") or {}).get("image_chars"))
+            for field in ("prompt_tokens", "completion_tokens"):
+                self.metrics.observe_tokens(field, stats.get(field))
+            if stats.get("retries"):
+                self.metrics.increment("vision.retries", stats["retries"])
+            self.metrics.increment("vision.calls")
+
+        actions = self.action_execution.last_report if element_data is not None else []
+        if actions:
+            observe("action", sum(report.get("ms", 0.0) for report in actions))
+        observe("command", elapsed_ms)
+        self.metrics.increment("commands")
+        self.metrics.increment("succeeded" if ok else "failed")
+        self.metrics.increment(f"decision.{metrics.get('decision')}")
+        if metrics.get("cache"):
+            self.metrics.increment(f"cache.{metrics['cache']}")
+        if metrics.get("element_map"):
+            self.metrics.increment(f"element_map.{metrics['element_map']}")
+
+    def _finish_command(self, command, element_data, ok, elapsed_ms):
+        self._observe_command(element_data, ok, elapsed_ms)
+        self.metrics.export()
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.record_step(
+                command=command,
+                screenshot=self.last_frame,
+                monitor_index=self.screen_capture.monitor_index,
+                vision_calls=self.vision_calls,
+                element=element_data,
+                actions=self.action_execution.last_report if element_data is not None else [],
+                ok=ok,
+                metrics=self.last_metrics,
+                monitors=self.screen_capture.monitors,
+            )
+        except Exception as e:
+            print(f"An error when recording session step {e}")
 
     def run_autonomous_agent(self):
+        self.warm_up()
         command = self.user_text.get_user_command()
         if command is None:
             return
 
-        img = self.screen_capture.capture_and_encode()
-        if img is None:
-            return 
-
-        element_data = self.vision_analizer.analyze_screen(img, command)
-        # if element_data is None:
-        #     return
-        
-        self.action_execution.action_execution(element_data)
-        
\ No newline at end of file
+        start = time.perf_counter()
+        element_data = self.locate_target(command)
+        ok = element_data is not None and self.execute_target(element_data, command)
+        self._finish_command(command, element_data, ok, (time.perf_counter() - start) * 1000)
+
+    def _prefetch_frame(self, monitor_index):
+        """Action settle hone ke baad agla frame grab + hash + encode karta hai (user input ke dauran background me)."""
+        time.sleep(self.settle_delay)
+        frame = self.screen_capture.capture_frame(monitor_index, keep_raw=True, store=False)
+        screenshot = frame.pop("screenshot", None)
+        if screenshot is None:
+            return None
+        frame["signature"] = self.frame_hasher.compute(screenshot)
+        return frame
+
+    def _session_report(self, stats, session_start):
+        wall_s = time.perf_counter() - session_start
+        commands = stats["commands"]
+        busy_s = stats["busy_ms"] / 1000
+        return {
+            "commands": commands,
+            "succeeded": stats["succeeded"],
+            "wall_s": round(wall_s, 3),
+            "commands_per_minute": round(commands * 60 / wall_s, 3) if wall_s else 0.0,
+            "commands_per_hour": round(commands * 3600 / wall_s, 1) if wall_s else 0.0,
+            "busy_commands_per_minute": round(commands * 60 / busy_s, 3) if busy_s else 0.0,
+            "avg_command_ms": round(stats["busy_ms"] / commands, 3) if commands else 0.0,
+            "connections": azure_clients.connection_stats(),
+            "rate_limits": rate_limiter.limiter_stats(),
+        }
+
+    def run_session(self):
+        """Ek hi process me commands ka loop; clients/mss warm rehte hain. Khali command ya "exit" par band hota hai."""
+        stats = {"commands": 0, "succeeded": 0, "busy_ms": 0.0}
+        self.warm_up()
+        self.screen_capture.grab()
+        session_start = time.perf_counter()
+        prefetch = None
+
+        try:
+            while True:
+                command = self.user_text.get_user_command()
+                if command is None or command.strip().lower() in SESSION_EXIT_COMMANDS:
+                    break
+
+                start = time.perf_counter()
+                prefetched = None
+                if prefetch is not None:
+                    try:
+                        prefetched = prefetch.result()
+                    except Exception as e:
+                        print(f"An error when prefetching frame {e}")
+
+                element_data = self.locate_target(command, prefetched)
+                ok = element_data is not None and self.execute_target(element_data, command)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self._finish_command(command, element_data, ok, elapsed_ms)
+                if ok:
+                    stats["succeeded"] += 1
+
+                stats["commands"] += 1
+                stats["busy_ms"] += elapsed_ms
+                print(f"[session] {command}: {self.last_metrics.get('decision')} in {elapsed_ms:.0f} ms")
+
+                prefetch = self._executor().submit(self._prefetch_frame, self.screen_capture.monitor_index)
+        finally:
+            if prefetch is not None:
+                prefetch.cancel()
+            self.session_stats = self._session_report(stats, session_start)
+            print(f"[session] {self.session_stats}")
+
+        return self.session_stats
+
+    def run_command(self, item):
+        """Ek command (batch/replay item dict) locate + execute karke result/timing dict deta hai."""
+        command = item["command"]
+        result = {key: item[key] for key in ("id", "line") if key in item}
+        result["command"] = command
+        start = time.perf_counter()
+        element_data = None
+        try:
+            element_data = self.locate_target(command)
+            if element_data is not None:
+                # JSONL line me diya action/steps vision wale target par lagta hai.
+                element_data = dict(element_data)
+                element_data.update({key: item[key] for key in ("action", "steps") if key in item})
+            result["ok"] = element_data is not None and self.execute_target(element_data, command)
+            result["target"] = None if element_data is None else {"x": element_data.get("x"), "y": element_data.get("y")}
+        except Exception as e:
+            print(f"An error when running batch command {command!r} {e}")
+            result["ok"] = False
+            result["error"] = str(e)
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        result["decision"] = self.last_metrics.get("decision")
+        result["metrics"] = self.last_metrics
+        result["actions"] = self.action_execution.last_report if element_data is not None else []
+        self._finish_command(command, element_data, result["ok"], result["elapsed_ms"])
+        return result
+
+    def run_batch(self, source, output=None, show_desktop=False):
+        """File ya stdin ("-") ke commands bina prompt ke back-to-back chalata hai.
+
+        Har command ka result/timing `output` JSONL me turant likha jata hai (None par stdout); summary return hoti hai.
+        Batch ke dauran saare diagnostics `print` stderr par jate hain, taaki stdout par sirf JSONL rahe.
+        """
+        stats = {"commands": 0, "succeeded": 0, "busy_ms": 0.0}
+        out = sys.stdout if output in (None, "-") else open(output, "w", encoding="utf-8")
+        batch_start = time.perf_counter()
+
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                self.warm_up()
+                if show_desktop:
+                    self.user_text.show_desktop()
+                self.screen_capture.grab()
+                batch_start = time.perf_counter()
+                for item in iter_commands(source):
+                    if item["command"].strip().lower() in SESSION_EXIT_COMMANDS:
+                        break
+                    result = self.run_command(item)
+                    stats["commands"] += 1
+                    stats["succeeded"] += int(result["ok"])
+                    stats["busy_ms"] += result["elapsed_ms"]
+                    out.write(json.dumps(result, default=str) + "\n")
+                    out.flush()
+                    if item.get("wait"):
+                        time.sleep(float(item["wait"]))
+        finally:
+            if out is not sys.stdout:
+                out.close()
+            self.session_stats = self._session_report(stats, batch_start)
+            print(f"[batch] {self.session_stats}", file=sys.stderr)
+
+        return self.session_stats
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self.recorder is not None:
+            self.recorder.close()
+        self.screen_capture.close()
+        if hasattr(self.vision_analizer, "close"):
+            self.vision_analizer.close()
+        azure_clients.close_clients()
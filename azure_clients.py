@@ -0,0 +1,219 @@
+import threading
+import time
+
+import config
+import rate_limiter
+
+# Process me har (endpoint, version, key, max_retries) ke liye ek hi sync aur ek hi async client.
+_CLIENTS = {}
+_LOCK = threading.Lock()
+
+
+class ConnectionStats:
+    """httpx trace events se ginta hai ki kitni requests ne nayi TCP/TLS connection kholi aur kitni ne pool reuse kiya."""
+
+    def __init__(self, name):
+        self.name = name
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.connect_ms = 0.0
+        self.tls_ms = 0.0
+        self.warm_ups = 0
+        self._lock = threading.Lock()
+
+    def _on_event(self, started, event):
+        if event.endswith("connect_tcp.started") or event.endswith("start_tls.started"):
+            started[event.rsplit(".", 1)[0]] = time.perf_counter()
+            return
+        if event.endswith("connect_tcp.complete"):
+            elapsed = (time.perf_counter() - started.pop(event.rsplit(".", 1)[0], time.perf_counter())) * 1000
+            with self._lock:
+                self.new_connections += 1
+                self.connect_ms += elapsed
+        elif event.endswith("start_tls.complete"):
+            elapsed = (time.perf_counter() - started.pop(event.rsplit(".", 1)[0], time.perf_counter())) * 1000
+            with self._lock:
+                self.tls_handshakes += 1
+                self.tls_ms += elapsed
+
+    def on_request(self, request):
+        with self._lock:
+            self.requests += 1
+        started = {}
+
+        def trace(event, info):
+            self._on_event(started, event)
+
+        request.extensions["trace"] = trace
+
+    async def on_request_async(self, request):
+        with self._lock:
+            self.requests += 1
+        started = {}
+
+        async def trace(event, info):
+            self._on_event(started, event)
+
+        request.extensions["trace"] = trace
+
+    def as_dict(self):
+        with self._lock:
+            reused = max(0, self.requests - self.new_connections)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused": reused,
+                "reuse_ratio": round(reused / self.requests, 4) if self.requests else None,
+                "tls_handshakes": self.tls_handshakes,
+                "avg_connect_ms": round(self.connect_ms / self.new_connections, 3) if self.new_connections else None,
+                "avg_tls_ms": round(self.tls_ms / self.tls_handshakes, 3) if self.tls_handshakes else None,
+                "warm_ups": self.warm_ups,
+            }
+
+
+def _http_options():
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=config.AZURE_POOL_SIZE,
+            max_keepalive_connections=config.AZURE_POOL_SIZE,
+            keepalive_expiry=config.AZURE_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(config.AZURE_READ_TIMEOUT, connect=config.AZURE_CONNECT_TIMEOUT),
+    }
+
+
+def _key(kind, max_retries):
+    return (kind, config.AZURE_ENDPOINT, config.AZURE_API_VERSION, config.AZURE_API_KEY, max_retries)
+
+
+def _stats_name(kind, max_retries):
+    return kind if max_retries is None else f"{kind}:retries={max_retries}"
+
+
+def get_client(max_retries=None):
+    """Shared `AzureOpenAI` client (pooled keep-alive httpx client ke saath); pehli call par banta hai."""
+    key = _key("sync", max_retries)
+    with _LOCK:
+        entry = _CLIENTS.get(key)
+        if entry is None:
+            from openai import AzureOpenAI, DefaultHttpxClient
+
+            stats = ConnectionStats(_stats_name("sync", max_retries))
+            http_client = DefaultHttpxClient(
+                event_hooks={
+                    "request": [rate_limiter.on_request, stats.on_request],
+                    "response": [rate_limiter.on_response],
+                },
+                **_http_options(),
+            )
+            options = {} if max_retries is None else {"max_retries": max_retries}
+            client = AzureOpenAI(
+                api_key=config.AZURE_API_KEY,
+                azure_endpoint=config.AZURE_ENDPOINT,
+                api_version=config.AZURE_API_VERSION,
+                http_client=http_client,
+                **options,
+            )
+            entry = _CLIENTS[key] = (client, http_client, stats)
+    return entry[0]
+
+
+def get_async_client(max_retries=None):
+    """Shared `AsyncAzureOpenAI` client; isko ek hi event loop (jaise AsyncVisionAnalzer ka background loop) par use karein."""
+    key = _key("async", max_retries)
+    with _LOCK:
+        entry = _CLIENTS.get(key)
+        if entry is None:
+            from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+
+            stats = ConnectionStats(_stats_name("async", max_retries))
+            http_client = DefaultAsyncHttpxClient(
+                event_hooks={
+                    "request": [rate_limiter.on_request_async, stats.on_request_async],
+                    "response": [rate_limiter.on_response_async],
+                },
+                **_http_options(),
+            )
+            options = {} if max_retries is None else {"max_retries": max_retries}
+            client = AsyncAzureOpenAI(
+                api_key=config.AZURE_API_KEY,
+                azure_endpoint=config.AZURE_ENDPOINT,
+                api_version=config.AZURE_API_VERSION,
+                http_client=http_client,
+                **options,
+            )
+            entry = _CLIENTS[key] = (client, http_client, stats)
+    return entry[0]
+
+
+def _entry_for(client):
+    with _LOCK:
+        for entry in _CLIENTS.values():
+            if entry[0] is client:
+                return entry
+    return None
+
+
+def _warm_url():
+    return config.AZURE_ENDPOINT.rstrip("/") + "/openai/models"
+
+
+def warm_up(client):
+    """DNS + TCP + TLS pehle se kar leta hai taaki pehla asli request handshake ka kharcha na de.
+
+    Response ka status maayne nahi rakhta; connection pool me keep-alive ke liye reh jati hai.
+    """
+    entry = _entry_for(client)
+    if entry is None or not config.AZURE_ENDPOINT:
+        return None
+    _, http_client, stats = entry
+    start = time.perf_counter()
+    try:
+        http_client.get(_warm_url(), params={"api-version": config.AZURE_API_VERSION}).close()
+    except Exception as e:
+        print(f"An error when warming up Azure client {e}")
+        return None
+    stats.warm_ups += 1
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+async def warm_up_async(client):
+    entry = _entry_for(client)
+    if entry is None or not config.AZURE_ENDPOINT:
+        return None
+    _, http_client, stats = entry
+    start = time.perf_counter()
+    try:
+        response = await http_client.get(_warm_url(), params={"api-version": config.AZURE_API_VERSION})
+        await response.aclose()
+    except Exception as e:
+        print(f"An error when warming up Azure client {e}")
+        return None
+    stats.warm_ups += 1
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def connection_stats():
+    with _LOCK:
+        entries = list(_CLIENTS.values())
+    return {stats.name: stats.as_dict() for _, _, stats in entries}
+
+
+def close_clients():
+    """Sync clients band karta hai; async clients `aclose_clients()` se apne event loop par band hote hain."""
+    with _LOCK:
+        keys = [key for key in _CLIENTS if key[0] == "sync"]
+        entries = [_CLIENTS.pop(key) for key in keys]
+    for client, _, _ in entries:
+        client.close()
+
+
+async def aclose_clients():
+    with _LOCK:
+        keys = [key for key in _CLIENTS if key[0] == "async"]
+        entries = [_CLIENTS.pop(key) for key in keys]
+    for client, _, _ in entries:
+        await client.close()
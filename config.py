@@ -1,5 +1,7 @@
 from pathlib import Path
 import importlib.util
+import threading
+import types
 
 
 def _load_external_agent_config():
@@ -19,14 +21,123 @@ def _load_external_agent_config():
     return module
 
 
-_ALIEN_CONFIG = _load_external_agent_config()
+_DEFAULTS = {
+    "AZURE_ENDPOINT": "",
+    "AZURE_API_KEY": "",
+    "AZURE_API_VERSION": "",
+    "LLM_DEPLOYMENT": "",
+    "DEBUGE_MODE": False,
+    "CHAT_SESSION_URL": "",
+    "CAPTURE_MONITOR": 1,
+    "CAPTURE_PARALLEL": True,
+    "CAPTURE_FORMAT": "PNG",
+    "CAPTURE_QUALITY": 85,
+    "CAPTURE_PNG_LEVEL": 6,
+    "SAVE_SCREENSHOTS": False,
+    "SCREENSHOT_DIR": "screenshots",
+    "SCREENSHOT_QUEUE_SIZE": 8,
+    "SCREENSHOT_MAX_FILES": 200,
+    "SCREENSHOT_MAX_AGE": None,
+    "SCREENSHOT_MAX_BYTES": None,
+    "SCREENSHOT_RING_SIZE": 3,
+    "VISION_MAX_LONG_EDGE": 0,
+    "FRAME_HASH_BLOCK": 32,
+    "FRAME_HASH_STRIDE": 4,
+    "FRAME_HASH_TOLERANCE": 6,
+    "FRAME_UNCHANGED_RATIO": 0.001,
+    "CHANGED_REGION_MODE": False,
+    "CHANGED_REGION_MAX_RATIO": 0.25,
+    "VISION_CACHE_SIZE": 256,
+    "VISION_CACHE_TTL": 900,
+    "VISION_CACHE_PATH": None,
+    "SESSION_SETTLE_DELAY": 0.6,
+    "VISION_STREAM": True,
+    "VISION_MAX_TOKENS": 64,
+    "TEMPLATE_MATCHING": True,
+    "TEMPLATE_INDEX_DIR": None,
+    "TEMPLATE_PATCH_SIZE": 64,
+    "TEMPLATE_MATCH_THRESHOLD": 0.9,
+    "TEMPLATE_SCALES": (1.0, 0.8, 1.25),
+    "ACTION_MOVE_DURATION": 0.15,
+    "ACTION_PAUSE": 0.02,
+    "ACTION_VERIFY": True,
+    "ACTION_VERIFY_ROI": 96,
+    "ACTION_VERIFY_TIMEOUT": 0.4,
+    "ACTION_VERIFY_LAUNCH_TIMEOUT": 3.0,
+    "ACTION_VERIFY_CHANGE": 0.01,
+    "ACTION_RETRIES": 1,
+    "PIPELINE_METRICS_JSON": None,
+    "PIPELINE_METRICS_PROM": None,
+    "AZURE_POOL_SIZE": 10,
+    "AZURE_KEEPALIVE_EXPIRY": 60.0,
+    "AZURE_CONNECT_TIMEOUT": 5.0,
+    "AZURE_READ_TIMEOUT": 60.0,
+    "AZURE_WARM_UP": True,
+    "AZURE_RPM": 0,
+    "AZURE_TPM": 0,
+    "AZURE_RATE_HEADROOM": 0.9,
+    "AZURE_RATE_MAX_WAIT": 30.0,
+    "VISION_STREAM_DRAIN": 2.0,
+    "ELEMENT_MAP": False,
+    "ELEMENT_MAP_SIZE": 8,
+    "ELEMENT_MAP_MIN_SCORE": 0.5,
+    "ELEMENT_MAP_MIN_CONFIDENCE": 0.3,
+    "ELEMENT_MAP_MAX_TOKENS": 4096,
+    "ELEMENT_MAP_DEADLINE": 30.0,
+    "ELEMENT_MAP_CELL": 64,
+    "WAIT_PROFILE": "human",
+    "WAIT_PAUSE_RANGES": {},
+    "WAIT_CONDITION_TIMEOUT": 40.0,
+    "WAIT_POLL_FREQUENCY": 0.25,
+    "TEXT_INPUT_STRATEGIES": ["script", "paste", "typing"],
+    "RESPONSE_OBSERVER": True,
+    "RESPONSE_DEBOUNCE": 1.0,
+    "RESPONSE_START_GRACE": 5.0,
+    "RESPONSE_WATCH_SEGMENT": 30.0,
+    "DOWNLOAD_VERIFY": True,
+    "DOWNLOAD_TIMEOUT": 120.0,
+    "DOWNLOAD_START_TIMEOUT": 20.0,
+    "TASK_CSV_EXPORT_EVERY": 0,
+    "TASK_MAX_ATTEMPTS": 3,
+    "TASK_RETRY_BACKOFF": 60.0,
+    "TASK_RETRY_BACKOFF_MAX": 900.0,
+    "VISION_ASYNC": True,
+    "VISION_DEADLINE": 20.0,
+    "VISION_MAX_RETRIES": 3,
+    "VISION_BACKOFF_BASE": 0.5,
+    "VISION_BACKOFF_MAX": 8.0,
+    "VISION_HEDGE_DEPLOYMENT": "",
+    "VISION_HEDGE_AFTER": 4.0,
+}
+
+_ALIEN_CONFIG = None
+_CONFIG_LOCK = threading.Lock()
+
+
+def _agent_config():
+    """`.Alien/Config/Agent.py` pehli zarurat par ek hi baar load hota hai, import time par nahi."""
+    global _ALIEN_CONFIG
+    if _ALIEN_CONFIG is None:
+        with _CONFIG_LOCK:
+            if _ALIEN_CONFIG is None:
+                _ALIEN_CONFIG = _load_external_agent_config()
+    return _ALIEN_CONFIG
+
+
+def configure(allow_missing=False, **values):
+    """Replay/tooling ke liye values override karta hai; `allow_missing` par Agent.py na ho to defaults use hote hain."""
+    global _ALIEN_CONFIG
+    with _CONFIG_LOCK:
+        if _ALIEN_CONFIG is None and allow_missing:
+            try:
+                _ALIEN_CONFIG = _load_external_agent_config()
+            except FileNotFoundError:
+                _ALIEN_CONFIG = types.SimpleNamespace()
+    for name, value in values.items():
+        if name not in _DEFAULTS and name != "FLOW_CONTROL":
+            raise AttributeError(f"Unknown config key {name!r}")
+        globals()[name] = value
 
-AZURE_ENDPOINT = getattr(_ALIEN_CONFIG, "AZURE_ENDPOINT", "")
-AZURE_API_KEY = getattr(_ALIEN_CONFIG, "AZURE_API_KEY", "")
-AZURE_API_VERSION = getattr(_ALIEN_CONFIG, "AZURE_API_VERSION", "")
-LLM_DEPLOYMENT = getattr(_ALIEN_CONFIG, "LLM_DEPLOYMENT", "")
-DEBUGE_MODE = getattr(_ALIEN_CONFIG, "DEBUGE_MODE", False)
-CHAT_SESSION_URL = getattr(_ALIEN_CONFIG, "CHAT_SESSION_URL", "")
 
 _DEFAULT_FLOW_CONTROL = {
     "prompt1": 1,
@@ -54,7 +165,7 @@ def _normalize_flag(value, default: int = 1) -> int:
 
 
 def _load_flow_control():
-    external = getattr(_ALIEN_CONFIG, "FLOW_CONTROL", None)
+    external = getattr(_agent_config(), "FLOW_CONTROL", None)
     user_map = external if isinstance(external, dict) else {}
     merged = {}
     for step, default in _DEFAULT_FLOW_CONTROL.items():
@@ -62,7 +173,20 @@ def _load_flow_control():
     return merged
 
 
-FLOW_CONTROL = _load_flow_control()
+def __getattr__(name):
+    # `config.X` pehli baar padhne par value resolve karke module globals me cache ho jati hai.
+    if name == "FLOW_CONTROL":
+        value = _load_flow_control()
+    elif name in _DEFAULTS:
+        value = getattr(_agent_config(), name, _DEFAULTS[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
 
 __all__ = [
@@ -72,5 +196,85 @@ __all__ = [
     "LLM_DEPLOYMENT",
     "DEBUGE_MODE",
     "CHAT_SESSION_URL",
+    "CAPTURE_MONITOR",
+    "CAPTURE_PARALLEL",
+    "CAPTURE_FORMAT",
+    "CAPTURE_QUALITY",
+    "CAPTURE_PNG_LEVEL",
+    "SAVE_SCREENSHOTS",
+    "SCREENSHOT_DIR",
+    "SCREENSHOT_QUEUE_SIZE",
+    "SCREENSHOT_MAX_FILES",
+    "SCREENSHOT_MAX_AGE",
+    "SCREENSHOT_MAX_BYTES",
+    "SCREENSHOT_RING_SIZE",
+    "VISION_MAX_LONG_EDGE",
+    "FRAME_HASH_BLOCK",
+    "FRAME_HASH_STRIDE",
+    "FRAME_HASH_TOLERANCE",
+    "FRAME_UNCHANGED_RATIO",
+    "CHANGED_REGION_MODE",
+    "CHANGED_REGION_MAX_RATIO",
+    "VISION_CACHE_SIZE",
+    "VISION_CACHE_TTL",
+    "VISION_CACHE_PATH",
+    "SESSION_SETTLE_DELAY",
+    "VISION_STREAM",
+    "VISION_MAX_TOKENS",
+    "TEMPLATE_MATCHING",
+    "TEMPLATE_INDEX_DIR",
+    "TEMPLATE_PATCH_SIZE",
+    "TEMPLATE_MATCH_THRESHOLD",
+    "TEMPLATE_SCALES",
+    "ACTION_MOVE_DURATION",
+    "ACTION_PAUSE",
+    "ACTION_VERIFY",
+    "ACTION_VERIFY_ROI",
+    "ACTION_VERIFY_TIMEOUT",
+    "ACTION_VERIFY_LAUNCH_TIMEOUT",
+    "ACTION_VERIFY_CHANGE",
+    "ACTION_RETRIES",
+    "PIPELINE_METRICS_JSON",
+    "PIPELINE_METRICS_PROM",
+    "AZURE_POOL_SIZE",
+    "AZURE_KEEPALIVE_EXPIRY",
+    "AZURE_CONNECT_TIMEOUT",
+    "AZURE_READ_TIMEOUT",
+    "AZURE_WARM_UP",
+    "AZURE_RPM",
+    "AZURE_TPM",
+    "AZURE_RATE_HEADROOM",
+    "AZURE_RATE_MAX_WAIT",
+    "VISION_STREAM_DRAIN",
+    "ELEMENT_MAP",
+    "ELEMENT_MAP_SIZE",
+    "ELEMENT_MAP_MIN_SCORE",
+    "ELEMENT_MAP_MIN_CONFIDENCE",
+    "ELEMENT_MAP_MAX_TOKENS",
+    "ELEMENT_MAP_DEADLINE",
+    "ELEMENT_MAP_CELL",
+    "WAIT_PROFILE",
+    "WAIT_PAUSE_RANGES",
+    "WAIT_CONDITION_TIMEOUT",
+    "WAIT_POLL_FREQUENCY",
+    "TEXT_INPUT_STRATEGIES",
+    "RESPONSE_OBSERVER",
+    "RESPONSE_DEBOUNCE",
+    "RESPONSE_START_GRACE",
+    "RESPONSE_WATCH_SEGMENT",
+    "DOWNLOAD_VERIFY",
+    "DOWNLOAD_TIMEOUT",
+    "DOWNLOAD_START_TIMEOUT",
+    "TASK_CSV_EXPORT_EVERY",
+    "TASK_MAX_ATTEMPTS",
+    "TASK_RETRY_BACKOFF",
+    "TASK_RETRY_BACKOFF_MAX",
+    "VISION_ASYNC",
+    "VISION_DEADLINE",
+    "VISION_MAX_RETRIES",
+    "VISION_BACKOFF_BASE",
+    "VISION_BACKOFF_MAX",
+    "VISION_HEDGE_DEPLOYMENT",
+    "VISION_HEDGE_AFTER",
     "FLOW_CONTROL",
 ]
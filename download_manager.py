@@ -0,0 +1,192 @@
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import re
+import select
+import shutil
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Chrome adhoori file `.crdownload` naam se likhta hai aur poori hone par rename karta hai.
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp")
+
+# inotify masks (linux/inotify.h): nayi file, rename se aayi file (download complete), write band.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+
+def safe_name(name):
+    """Page name ko folder name banata hai (Windows/Linux dono par valid)."""
+    cleaned = re.sub(r'[<>:"/\\|?*\x00-\x1f]+', "_", str(name)).strip(" .")
+    return cleaned[:120] or "page"
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _Inotify:
+    """Directory par inotify watch (sirf Linux); event aane par `wait()` jaldi lautta hai, events parse nahi hote."""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch = libc.inotify_add_watch(
+            self.fd, os.fsencode(str(directory)), _IN_CREATE | _IN_MOVED_TO | _IN_CLOSE_WRITE
+        )
+        if watch < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if not readable:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class DownloadManager:
+    """Chrome ki per-run download directory dekhta hai aur poori hui file ko page ke folder me move karta hai.
+
+    Click se pehle `snapshot()`, phir `wait_for_download(before)` nayi complete file (koi `.crdownload` baki na ho)
+    milte hi lautata hai. Linux par inotify se wake-up hota hai, baaki jagah `poll_interval` polling.
+    `start_timeout` tak koi nayi file (adhoori bhi) na dikhe to download shuru hi nahi hua maana jata hai.
+    """
+
+    def __init__(self, download_dir, pages_dir, timeout=120.0, start_timeout=20.0, poll_interval=0.25, use_inotify=True):
+        self.download_dir = Path(download_dir)
+        self.pages_dir = Path(pages_dir)
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+        self.last_wait = {}
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def is_partial(name):
+        return name.lower().endswith(PARTIAL_SUFFIXES)
+
+    def snapshot(self):
+        """Directory ki abhi ki files (name -> (size, mtime_ns)); click se pehle lena hai."""
+        entries = {}
+        try:
+            with os.scandir(self.download_dir) as iterator:
+                for entry in iterator:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        entries[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _new_entries(self, before):
+        current = self.snapshot()
+        return {name: stamp for name, stamp in current.items() if before.get(name) != stamp}
+
+    def _watcher(self):
+        if not self.use_inotify:
+            return None
+        try:
+            return _Inotify(self.download_dir)
+        except (OSError, AttributeError) as exc:
+            print(f"inotify unavailable, polling download dir: {exc}")
+            return None
+
+    def wait_for_download(self, before, timeout=None, start_timeout=None):
+        """Nayi complete file ka Path, ya None (shuru nahi hua / timeout). Details `last_wait` me."""
+        timeout = self.timeout if timeout is None else timeout
+        start_timeout = self.start_timeout if start_timeout is None else start_timeout
+        start = time.perf_counter()
+        watcher = self._watcher()
+        self.last_wait = {"method": "inotify" if watcher is not None else "polling", "wakeups": 0}
+        started_at = None
+        try:
+            while True:
+                elapsed = time.perf_counter() - start
+                new = self._new_entries(before)
+                partial = [name for name in new if self.is_partial(name)]
+                complete = [name for name in new if not self.is_partial(name)]
+                if new and started_at is None:
+                    started_at = elapsed
+                # Koi bhi `.crdownload` baki ho to Chrome abhi likh raha hai (ya rename hone wala hai).
+                if complete and not partial:
+                    name = max(complete, key=lambda item: new[item][1])
+                    self.last_wait.update({
+                        "status": "complete",
+                        "file": name,
+                        "start_ms": round(started_at * 1000, 1),
+                        "wait_ms": round(elapsed * 1000, 1),
+                    })
+                    return self.download_dir / name
+                if started_at is None and elapsed >= start_timeout:
+                    self.last_wait.update({"status": "not_started", "wait_ms": round(elapsed * 1000, 1)})
+                    return None
+                if elapsed >= timeout:
+                    self.last_wait.update({
+                        "status": "timeout",
+                        "partial": partial,
+                        "wait_ms": round(elapsed * 1000, 1),
+                    })
+                    return None
+
+                remaining = min(timeout, start_timeout if started_at is None else timeout) - elapsed
+                if watcher is not None:
+                    # Rename ka event miss na ho isliye wait ko bhi cap kiya hai; event aaye to turant rescan.
+                    watcher.wait(min(remaining, 1.0))
+                else:
+                    time.sleep(max(0.0, min(remaining, self.poll_interval)))
+                self.last_wait["wakeups"] += 1
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    def store(self, path, page_name, step=""):
+        """File ko `<pages_dir>/<page>/` me move karta hai (naam takraye to suffix) aur size + SHA-256 lautata hai."""
+        path = Path(path)
+        target_dir = self.pages_dir / safe_name(page_name)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / path.name
+        counter = 1
+        while target.exists():
+            target = target_dir / f"{path.stem}_{counter}{path.suffix}"
+            counter += 1
+        shutil.move(str(path), str(target))
+        return {
+            "step": step,
+            "file_name": target.name,
+            "path": str(target),
+            "size": target.stat().st_size,
+            "sha256": file_sha256(target),
+            "downloaded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def cleanup(self):
+        """Run khatam hone par khali per-run directory hata deta hai (adhoori files ho to rehne deta hai)."""
+        try:
+            self.download_dir.rmdir()
+        except OSError:
+            pass
@@ -0,0 +1,284 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+ELEMENT_ROLES = ("button", "icon", "link", "input", "checkbox", "menu", "tab", "text", "image", "other")
+
+# Structured outputs (strict) ke liye har property required aur additionalProperties false hona chahiye.
+ELEMENT_MAP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "elements": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "label": {"type": "string"},
+                    "role": {"type": "string", "enum": list(ELEMENT_ROLES)},
+                    "x": {"type": "integer"},
+                    "y": {"type": "integer"},
+                    "width": {"type": "integer"},
+                    "height": {"type": "integer"},
+                    "confidence": {"type": "number"},
+                },
+                "required": ["label", "role", "x", "y", "width", "height", "confidence"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["elements"],
+    "additionalProperties": False,
+}
+
+ELEMENT_MAP_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "ui_element_map", "strict": True, "schema": ELEMENT_MAP_SCHEMA},
+}
+
+_TOKEN = re.compile(r"\w+")
+
+# Command ke verbs/particles ("open karo", "icon pe click karo") kisi element ko pehchante nahi; scoring se bahar.
+COMMAND_STOPWORDS = frozenset({
+    "click", "double", "right", "press", "select", "open", "kholo", "dabao", "chalao", "start", "launch",
+    "karo", "kar", "karein", "karna", "kijiye", "pe", "par", "per", "on", "me", "mein", "ko", "ka", "ki", "ke",
+    "wala", "wali", "wale", "the", "a", "an", "icon", "button",
+})
+
+
+def _tokens(text):
+    return set(_TOKEN.findall(str(text).lower()))
+
+
+def _significant(tokens):
+    return {token for token in tokens if token not in COMMAND_STOPWORDS}
+
+
+def build_element_map_messages(base64_image, mime_type="image/png", geometry=None):
+    prompt = """Is screenshot ke saare actionable UI elements (buttons, icons, links, inputs, tabs, menu items) list karo.
+        Har element ka visible label (ya icon ka naam), role, bounding box (x, y top-left, width, height pixels me)
+        aur 0 se 1 ke beech confidence do. Decorative ya non-clickable cheezein chhod do."""
+    if geometry is not None:
+        prompt += f"\n        Image size {geometry.sent_width}x{geometry.sent_height} pixels hai, boxes isi image ke hisab se do."
+
+    return [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": prompt},
+                {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{base64_image}"}},
+            ],
+        }
+    ]
+
+
+def parse_element_map(text, geometry=None):
+    """Strict schema wale response se elements ki list banata hai; boxes ko screen pixels me map karta hai.
+
+    Response schema ke bahar ho (truncated JSON, galat type) to ValueError; fence-stripping jaisa koi tolerance nahi.
+    """
+    data = json.loads(text)
+    if not isinstance(data, dict) or not isinstance(data.get("elements"), list):
+        raise ValueError(f"Element map response does not match schema: {text[:200]!r}")
+
+    elements = []
+    for item in data["elements"]:
+        try:
+            label = str(item["label"]).strip()
+            x, y = float(item["x"]), float(item["y"])
+            width, height = float(item["width"]), float(item["height"])
+            confidence = float(item.get("confidence", 0.0))
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not label or width <= 0 or height <= 0:
+            continue
+
+        if geometry is not None:
+            left, top = geometry.to_screen(x, y)
+            right, bottom = geometry.to_screen(x + width - 1, y + height - 1)
+        else:
+            left, top, right, bottom = round(x), round(y), round(x + width - 1), round(y + height - 1)
+        elements.append({
+            "label": label,
+            "role": item.get("role") or "other",
+            "left": left,
+            "top": top,
+            "width": right - left + 1,
+            "height": bottom - top + 1,
+            "confidence": confidence,
+        })
+    return elements
+
+
+class ElementMap:
+    """Ek frame ke saare UI elements, label (token -> elements) aur spatial (grid cell -> elements) index ke saath.
+
+    `find(command)` sirf command ke tokens wale candidates score karta hai aur `element_at(x, y)` sirf
+    us point ki grid cell dekhta hai, isliye follow-up lookups bina model call ke microseconds me hote hain.
+    """
+
+    def __init__(self, elements, key=None, cell_size=64):
+        self.key = key
+        self.created = time.time()
+        self.cell_size = max(1, int(cell_size))
+        self.elements = []
+        self._labels = {}
+        self._aliases = {}
+        self._grid = {}
+        self._lock = threading.Lock()
+        for element in elements:
+            self._add(element)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def _add(self, element):
+        element = dict(element)
+        element["id"] = len(self.elements)
+        element["x"] = element["left"] + element["width"] // 2
+        element["y"] = element["top"] + element["height"] // 2
+        element["_tokens"] = _significant(_tokens(element["label"]))
+        self.elements.append(element)
+        for token in element["_tokens"]:
+            self._labels.setdefault(token, set()).add(element["id"])
+
+        size = self.cell_size
+        for cell_y in range(element["top"] // size, (element["top"] + element["height"] - 1) // size + 1):
+            for cell_x in range(element["left"] // size, (element["left"] + element["width"] - 1) // size + 1):
+                self._grid.setdefault((cell_x, cell_y), []).append(element["id"])
+
+    @staticmethod
+    def _result(element, score, matched_by):
+        result = {key: value for key, value in element.items() if not key.startswith("_")}
+        result["source"] = "element_map"
+        result["score"] = round(score, 4)
+        result["matched_by"] = matched_by
+        return result
+
+    def find(self, command, min_score=0.5, min_confidence=0.0):
+        """Command ke liye sabse achha element; verbs/particles (`COMMAND_STOPWORDS`) hata kar tokens ka Jaccard score.
+
+        Command ka har bacha token label me hona chahiye, warna wo element candidate nahi ("Notepad open karo" kabhi
+        "Open" button par resolve nahi hota). Pehle kisi pichhle command ka alias dekha jata hai. Barabar score par
+        zyada confidence aur chhota box jeet-ta hai.
+        """
+        normalized = " ".join(_TOKEN.findall(str(command).lower()))
+        with self._lock:
+            alias = self._aliases.get(normalized)
+        if alias is not None:
+            return self._result(self.elements[alias], 1.0, "alias")
+
+        tokens = _significant(normalized.split())
+        if not tokens:
+            return None
+        candidates = set()
+        for token in tokens:
+            candidates.update(self._labels.get(token, ()))
+
+        best, best_rank = None, None
+        for element_id in candidates:
+            element = self.elements[element_id]
+            if element["confidence"] < min_confidence or not tokens <= element["_tokens"]:
+                continue
+            score = len(tokens) / len(element["_tokens"] | tokens)
+            rank = (score, element["confidence"], -element["width"] * element["height"])
+            if best_rank is None or rank > best_rank:
+                best, best_rank = element, rank
+        if best is None or best_rank[0] < min_score:
+            return None
+        return self._result(best, best_rank[0], "label")
+
+    def element_at(self, x, y):
+        """Point ko ghere sabse chhota element (nested boxes me andar wala), na mile to None."""
+        size = self.cell_size
+        best = None
+        for element_id in self._grid.get((int(x) // size, int(y) // size), ()):
+            element = self.elements[element_id]
+            if not (
+                element["left"] <= x < element["left"] + element["width"]
+                and element["top"] <= y < element["top"] + element["height"]
+            ):
+                continue
+            if best is None or element["width"] * element["height"] < best["width"] * best["height"]:
+                best = element
+        return None if best is None else self._result(best, 1.0, "point")
+
+    def add_alias(self, command, element_id):
+        """Remote model ne jis element par command resolve kiya, wahi command agli baar local resolve ho."""
+        normalized = " ".join(_TOKEN.findall(str(command).lower()))
+        with self._lock:
+            self._aliases[normalized] = element_id
+
+    def as_dict(self):
+        return {
+            "key": self.key,
+            "created": self.created,
+            "elements": [self._result(element, 1.0, "map") for element in self.elements],
+        }
+
+
+class ElementMapStore:
+    """Frame key (`monitor:digest`) par LRU store; ek frame ka map sirf ek baar banta hai (single-flight)."""
+
+    def __init__(self, max_entries=8, cell_size=64):
+        self.max_entries = max(1, int(max_entries))
+        self.cell_size = cell_size
+        self.stats = {"hits": 0, "misses": 0, "failed": 0, "evictions": 0}
+        self._maps = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._maps)
+
+    def get(self, key):
+        with self._lock:
+            element_map = self._maps.get(key)
+            if element_map is not None:
+                self._maps.move_to_end(key)
+            return element_map
+
+    def put(self, key, elements):
+        element_map = ElementMap(elements, key=key, cell_size=self.cell_size)
+        with self._lock:
+            self._maps[key] = element_map
+            self._maps.move_to_end(key)
+            while len(self._maps) > self.max_entries:
+                self._maps.popitem(last=False)
+                self.stats["evictions"] += 1
+        return element_map
+
+    def get_or_build(self, key, compute):
+        """Map aur source ("hit"/"shared"/"miss"/"failed") deta hai; `compute()` elements ki list ya None lautaye."""
+        with self._lock:
+            element_map = self._maps.get(key)
+            if element_map is not None:
+                self._maps.move_to_end(key)
+                self.stats["hits"] += 1
+                return element_map, "hit"
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not leader:
+            event.wait()
+            element_map = self.get(key)
+            return element_map, "shared" if element_map is not None else "failed"
+
+        element_map = None
+        try:
+            elements = compute()
+            if elements is not None:
+                element_map = self.put(key, elements)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.stats["misses" if element_map is not None else "failed"] += 1
+            event.set()
+        return element_map, "miss" if element_map is not None else "failed"
+
+    def clear(self):
+        with self._lock:
+            self._maps.clear()
@@ -0,0 +1,81 @@
+import hashlib
+import time
+
+import numpy as np
+
+
+class FrameSignature:
+    """Ek frame ke block-mean values aur unka short digest."""
+
+    def __init__(self, blocks, block_size, width, height, digest):
+        self.blocks = blocks
+        self.block_size = block_size
+        self.width = width
+        self.height = height
+        self.digest = digest
+
+
+class FrameHasher:
+    """mss ke BGRA buffer se NumPy block hash banata hai aur do frames ka change compare karta hai.
+
+    Frame ko `stride` se subsample karke `block_size` pixel ke blocks ka mean brightness nikalta hai;
+    `tolerance` se zyada badle blocks "changed" maane jaate hain.
+    """
+
+    def __init__(self, block_size=32, stride=4, tolerance=6, unchanged_ratio=0.001):
+        self.block_size = max(1, int(block_size))
+        self.stride = max(1, min(int(stride), self.block_size))
+        self.tolerance = tolerance
+        self.unchanged_ratio = unchanged_ratio
+
+    def compute(self, screenshot):
+        width, height = screenshot.size
+        pixels = np.frombuffer(screenshot.bgra, dtype=np.uint8).reshape(height, width, 4)
+        return self.compute_array(pixels[:, :, :3], width, height)
+
+    def compute_array(self, pixels, width, height):
+        strided = pixels[:: self.stride, :: self.stride].astype(np.uint16)
+        sample = strided[..., 0] + strided[..., 1] + strided[..., 2]
+        step = max(1, self.block_size // self.stride)
+
+        rows = np.arange(0, sample.shape[0], step)
+        cols = np.arange(0, sample.shape[1], step)
+        sums = np.add.reduceat(np.add.reduceat(sample, rows, axis=0, dtype=np.uint32), cols, axis=1)
+        row_counts = np.diff(np.append(rows, sample.shape[0]))
+        col_counts = np.diff(np.append(cols, sample.shape[1]))
+        blocks = sums / (np.outer(row_counts, col_counts) * 3.0)
+
+        quantized = (blocks // max(1, self.tolerance)).astype(np.uint8)
+        digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+        digest.update(f"{width}x{height}".encode())
+        return FrameSignature(blocks, self.block_size, width, height, digest.hexdigest())
+
+    def compare(self, previous, current):
+        """Dono signatures ka changed fraction, changed region (monitor pixels) aur unchanged decision deta hai."""
+        if previous is None or previous.blocks.shape != current.blocks.shape:
+            return {"changed_fraction": 1.0, "changed_blocks": None, "region": None, "unchanged": False}
+
+        mask = np.abs(current.blocks - previous.blocks) > self.tolerance
+        changed_blocks = int(mask.sum())
+        changed_fraction = changed_blocks / mask.size
+        region = None
+        if changed_blocks:
+            rows = np.flatnonzero(mask.any(axis=1))
+            cols = np.flatnonzero(mask.any(axis=0))
+            left = int(cols[0]) * current.block_size
+            top = int(rows[0]) * current.block_size
+            right = min(current.width, (int(cols[-1]) + 1) * current.block_size)
+            bottom = min(current.height, (int(rows[-1]) + 1) * current.block_size)
+            region = {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+        return {
+            "changed_fraction": round(changed_fraction, 6),
+            "changed_blocks": changed_blocks,
+            "region": region,
+            "unchanged": changed_fraction <= self.unchanged_ratio,
+        }
+
+    def timed_compute(self, screenshot):
+        start = time.perf_counter()
+        signature = self.compute(screenshot)
+        return signature, round((time.perf_counter() - start) * 1000, 3)
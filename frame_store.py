@@ -0,0 +1,173 @@
+import hashlib
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+
+class FrameStore:
+    """Encoded frames ko memory ring buffer me rakhta hai aur (optional) background thread se disk par likhta hai.
+
+    Disk write hot path se bahar hai: queue full ho to frame drop hota hai, identical
+    frames content hash se skip hote hain aur count/age/bytes retention purani files hata deti hai.
+    `max_age` ho to writer thread idle rehte hue bhi har `prune_interval` sec par purani files hatata hai.
+    """
+
+    def __init__(
+        self,
+        directory="screenshots",
+        persist=False,
+        queue_size=8,
+        max_files=200,
+        max_age=None,
+        max_bytes=None,
+        ring_size=3,
+    ):
+        self.directory = Path(directory)
+        self.persist = bool(persist)
+        self.max_files = max_files
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        # Idle agent (koi naya frame nahi) me bhi age-based retention chale, isliye writer timer par jagta hai.
+        self.prune_interval = None if max_age is None else max(0.05, min(float(max_age), 60.0))
+        self.ring = deque(maxlen=max(0, int(ring_size or 0)))
+        self.stats = {
+            "queued": 0,
+            "dropped": 0,
+            "written": 0,
+            "deduplicated": 0,
+            "evicted": 0,
+            "write_errors": 0,
+        }
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._files = deque()  # (path, mtime, size, digest) - sabse purani file pehle
+        self._digests = {}
+        self._total_bytes = 0
+        self._thread = None
+
+        if self.persist:
+            self._start()
+
+    def add(self, encoded, extension="png"):
+        """Frame ko ring buffer me daalta hai aur persist on ho to writer queue me; blocking kabhi nahi."""
+        timestamp = time.time()
+        if self.ring.maxlen:
+            self.ring.append({"timestamp": timestamp, "extension": extension, "data": encoded})
+
+        if not self.persist:
+            return False
+
+        try:
+            self._queue.put_nowait((timestamp, extension, encoded))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+
+        self.stats["queued"] += 1
+        return True
+
+    def recent_frames(self):
+        return list(self.ring)
+
+    def dump_recent(self, directory):
+        """Debugging ke liye ring buffer ke frames ek folder me likh deta hai."""
+        target = Path(directory)
+        target.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for frame in self.recent_frames():
+            path = target / f"screenshot_{frame['timestamp']}.{frame['extension']}"
+            path.write_bytes(frame["data"])
+            paths.append(path)
+        return paths
+
+    def close(self, timeout=5.0):
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _start(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._scan_existing()
+        self._thread = threading.Thread(target=self._run, name="FrameStoreWriter", daemon=True)
+        self._thread.start()
+
+    def _scan_existing(self):
+        existing = []
+        for path in self.directory.glob("screenshot_*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            existing.append((stat.st_mtime, path, stat.st_size))
+
+        for mtime, path, size in sorted(existing):
+            self._files.append((path, mtime, size, None))
+            self._total_bytes += size
+        self._enforce_retention()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.prune_interval)
+            except queue.Empty:
+                self._enforce_retention()
+                continue
+            if item is None:
+                # close() par bhi ek aakhri baar retention, taaki agla run purani files ke saath shuru na ho.
+                self._enforce_retention()
+                break
+            try:
+                self._write(*item)
+                self._enforce_retention()
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                print(f"An error when saving screenshot {e}")
+
+    def _write(self, timestamp, extension, encoded):
+        digest = hashlib.sha256(encoded).hexdigest()
+        if digest in self._digests:
+            self.stats["deduplicated"] += 1
+            return
+
+        path = self.directory / f"screenshot_{timestamp}.{extension}"
+        with open(path, "wb") as file:
+            file.write(encoded)
+
+        size = len(encoded) if isinstance(encoded, bytes) else encoded.nbytes
+        self._files.append((path, timestamp, size, digest))
+        self._digests[digest] = path
+        self._total_bytes += size
+        self.stats["written"] += 1
+
+    def _over_limit(self, now):
+        if not self._files:
+            return False
+        if self.max_files is not None and len(self._files) > self.max_files:
+            return True
+        if self.max_bytes is not None and self._total_bytes > self.max_bytes:
+            return True
+        if self.max_age is not None and now - self._files[0][1] > self.max_age:
+            return True
+        return False
+
+    def _enforce_retention(self):
+        now = time.time()
+        while self._over_limit(now):
+            path, _, size, digest = self._files.popleft()
+            self._total_bytes -= size
+            if digest is not None:
+                self._digests.pop(digest, None)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"An error when removing screenshot {e}")
+                continue
+            self.stats["evicted"] += 1
@@ -1,11 +1,58 @@
-from autonomous_loop import AutonomousLoop
+import argparse
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="AI Autonomous desktop agent")
+    parser.add_argument(
+        "--session",
+        action="store_true",
+        help="Ek hi process me commands ka loop chalao (khali command ya 'exit' par band).",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Commands file se chalao (ek line ek command, ya JSONL); '-' par stdin se stream.",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="Batch mode ke per-command results/timings ki JSONL file (default stdout).",
+    )
+    parser.add_argument(
+        "--show-desktop",
+        action="store_true",
+        help="Batch shuru hone se pehle ek baar Win+D dabao.",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Har command ka frame, model request/response aur action DIR me record karo (session_replay.py ke liye).",
+    )
+    return parser.parse_args()
+
 
 def main():
-    agent = AutonomousLoop()
-    agent.run_autonomous_agent()
+    args = parse_args()
+    # Heavy modules `--help` ke liye load nahi hote.
+    from autonomous_loop import AutonomousLoop
+
+    recorder = None
+    if args.record:
+        from session_recorder import SessionRecorder
+
+        recorder = SessionRecorder(args.record)
+    agent = AutonomousLoop(recorder=recorder)
+    try:
+        if args.batch:
+            agent.run_batch(args.batch, args.output, args.show_desktop)
+        elif args.session:
+            agent.run_session()
+        else:
+            agent.run_autonomous_agent()
+    finally:
+        agent.close()
 
 
 if __name__ == "__main__":
     main()
 
-
@@ -0,0 +1,129 @@
+import threading
+import time
+
+# Saare selectors ek hi `execute_script` me chalte hain; document order me sabse aakhri (visible) match aur
+# uska rect/screen center ek saath lautte hain, taaki find + is_displayed + rect ke alag round-trips na lagein.
+LOCATE_SCRIPT = """
+const [selectors, onlyVisible] = arguments;
+const isVisible = (node) => {
+    const rect = node.getBoundingClientRect();
+    if (rect.width === 0 && rect.height === 0) return false;
+    const style = window.getComputedStyle(node);
+    return style.visibility !== "hidden" && style.display !== "none";
+};
+let best = null, bestIndex = -1, count = 0;
+selectors.forEach(([kind, expr], index) => {
+    let nodes;
+    if (kind === "xpath") {
+        const snapshot = document.evaluate(expr, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        nodes = [];
+        for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+    } else {
+        nodes = Array.from(document.querySelectorAll(expr));
+    }
+    for (const node of nodes) {
+        if (node.nodeType !== Node.ELEMENT_NODE || (onlyVisible && !isVisible(node))) continue;
+        count += 1;
+        if (best === null || (best.compareDocumentPosition(node) & Node.DOCUMENT_POSITION_FOLLOWING)) {
+            best = node;
+            bestIndex = index;
+        }
+    }
+});
+if (best === null) return null;
+const rect = best.getBoundingClientRect();
+const offsetX = window.screenX + (window.outerWidth - window.innerWidth);
+const offsetY = window.screenY + (window.outerHeight - window.innerHeight);
+return {
+    element: best,
+    index: bestIndex,
+    count: count,
+    rect: {x: rect.left, y: rect.top, width: rect.width, height: rect.height},
+    screen: {x: rect.left + rect.width / 2 + offsetX, y: rect.top + rect.height / 2 + offsetY},
+};
+"""
+
+# Selenium `By` ki values plain strings hain, isliye yaha selenium import ki zarurat nahi.
+_CSS_FROM_BY = {
+    "css selector": lambda value: value,
+    "id": lambda value: f"#{value}",
+    "tag name": lambda value: value,
+    "class name": lambda value: f".{value}",
+    "name": lambda value: f'[name="{value}"]',
+}
+
+
+def normalize_selector(selector):
+    """`(By.X, value)` ya plain string ko `[kind, expr]` banata hai; "/" ya "(" se shuru string XPath hai, baaki CSS."""
+    if isinstance(selector, str):
+        return ["xpath", selector] if selector.lstrip().startswith(("/", "(")) else ["css", selector]
+    by, value = selector
+    if by == "xpath":
+        return ["xpath", value]
+    if by in _CSS_FROM_BY:
+        return ["css", _CSS_FROM_BY[by](value)]
+    raise ValueError(f"Unsupported locator strategy for batched lookup: {by}")
+
+
+class WebDriverCommandCounter:
+    """`driver.execute` ko wrap karke har WebDriver command (find, click, script, actions) ginta hai.
+
+    WebElement ke calls bhi parent driver ke `execute` se jate hain, isliye yahi ek jagah sab dikh jata hai.
+    `reset()` page shuru hone par, `as_dict()` page ke ant me per-page protocol overhead ke liye.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._lock = threading.Lock()
+        self.reset()
+        self._execute = driver.execute
+        driver.execute = self._counted_execute
+
+    def _counted_execute(self, driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return self._execute(driver_command, params)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.total += 1
+                self.total_ms += elapsed
+                self.by_command[driver_command] = self.by_command.get(driver_command, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.total = 0
+            self.total_ms = 0.0
+            self.by_command = {}
+
+    def as_dict(self, top=5):
+        with self._lock:
+            ranked = sorted(self.by_command.items(), key=lambda item: item[1], reverse=True)
+            return {
+                "commands": self.total,
+                "command_ms": round(self.total_ms, 1),
+                "top": dict(ranked[:top]),
+            }
+
+
+class PageLocator:
+    """Selectors ke set ko ek `execute_script` me evaluate karta hai (XPath aur CSS mix ho sakte hain).
+
+    `locate()` ka match dict: `element` (WebElement), `selector` (jis selector se mila), `count` (kul matches),
+    `rect` (viewport me) aur `screen` (mouse move ke liye screen center).
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def locate(self, selectors, visible=True):
+        if isinstance(selectors, str) or (
+            isinstance(selectors, tuple) and len(selectors) == 2 and selectors[0] in ("xpath", *_CSS_FROM_BY)
+        ):
+            selectors = [selectors]
+        selectors = list(selectors)
+        match = self.driver.execute_script(LOCATE_SCRIPT, [normalize_selector(item) for item in selectors], visible)
+        if not match:
+            return None
+        match["selector"] = selectors[match["index"]]
+        return match
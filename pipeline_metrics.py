@@ -0,0 +1,179 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Milliseconds; 0.25 ms se 60 sec tak lagbhag 2x steps.
+LATENCY_BUCKETS_MS = (
+    0.25, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1000, 2000, 5000, 10000, 20000, 60000,
+)
+
+# Bytes; 1 KB se 32 MB tak.
+SIZE_BUCKETS_BYTES = tuple(1024 * 2 ** power for power in range(16))
+
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+PROMETHEUS_PREFIX = "alien_agent"
+
+
+class Histogram:
+    """Fixed buckets wala cumulative histogram; observe O(log buckets) hai aur memory constant rehti hai."""
+
+    __slots__ = ("buckets", "counts", "count", "total", "min", "max")
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def quantile(self, fraction):
+        """Bucket ke andar linear interpolation se approximate quantile."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    def as_dict(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3),
+            "min": round(self.min, 3),
+            "p50": round(self.quantile(0.5), 3),
+            "p90": round(self.quantile(0.9), 3),
+            "p99": round(self.quantile(0.99), 3),
+            "max": round(self.max, 3),
+        }
+
+
+class PipelineMetrics:
+    """Desktop pipeline ke stages ka in-process latency/size/token histograms aur counters.
+
+    Latency `observe("capture.encode", ms)` ya `with metrics.timer("action"):` se, payload size
+    `observe_size()` se aur model tokens `observe_tokens()` se aate hain. `summary()` JSON deta hai,
+    `export_prometheus()` node_exporter textfile collector wali file likhta hai.
+    """
+
+    def __init__(self, json_path=None, prometheus_path=None):
+        self.json_path = Path(json_path) if json_path else None
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self.started = time.time()
+        self.latency = {}
+        self.sizes = {}
+        self.tokens = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def _observe(self, table, buckets, name, value):
+        if value is None:
+            return
+        with self._lock:
+            histogram = table.get(name)
+            if histogram is None:
+                histogram = table[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def observe(self, stage, ms):
+        self._observe(self.latency, LATENCY_BUCKETS_MS, stage, ms)
+
+    def observe_size(self, name, size):
+        self._observe(self.sizes, SIZE_BUCKETS_BYTES, name, size)
+
+    def observe_tokens(self, name, tokens):
+        self._observe(self.tokens, TOKEN_BUCKETS, name, tokens)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        with self._lock:
+            return {
+                "started": self.started,
+                "uptime_s": round(time.time() - self.started, 3),
+                "latency_ms": {name: hist.as_dict() for name, hist in sorted(self.latency.items())},
+                "payload_bytes": {name: hist.as_dict() for name, hist in sorted(self.sizes.items())},
+                "tokens": {name: hist.as_dict() for name, hist in sorted(self.tokens.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def _prometheus_lines(self):
+        lines = []
+
+        def histogram_lines(metric, label, table, scale):
+            lines.append(f"# TYPE {metric} histogram")
+            for name, hist in sorted(table.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(hist.buckets, hist.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound * scale:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{label}="{name}",le="+Inf"}} {hist.count}')
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {hist.total * scale:.6f}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {hist.count}')
+
+        with self._lock:
+            histogram_lines(f"{PROMETHEUS_PREFIX}_stage_seconds", "stage", self.latency, 0.001)
+            histogram_lines(f"{PROMETHEUS_PREFIX}_payload_bytes", "payload", self.sizes, 1)
+            histogram_lines(f"{PROMETHEUS_PREFIX}_tokens", "kind", self.tokens, 1)
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_events_total counter")
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{PROMETHEUS_PREFIX}_events_total{{event="{name}"}} {value}')
+        return lines
+
+    @staticmethod
+    def _write_atomic(path, text):
+        # Collector aadhi likhi file na padhe, isliye tmp file + rename.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(tmp_path, path)
+
+    def export_json(self, path=None):
+        path = Path(path) if path else self.json_path
+        if path is not None:
+            self._write_atomic(path, json.dumps(self.summary(), indent=2))
+
+    def export_prometheus(self, path=None):
+        path = Path(path) if path else self.prometheus_path
+        if path is not None:
+            self._write_atomic(path, "\n".join(self._prometheus_lines()) + "\n")
+
+    def export(self):
+        try:
+            self.export_json()
+            self.export_prometheus()
+        except Exception as e:
+            print(f"An error when exporting pipeline metrics {e}")
@@ -0,0 +1,371 @@
+import asyncio
+import base64
+import contextvars
+import heapq
+import itertools
+import json
+import math
+import re
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+# Chhota number pehle: user jis vision call ka wait kar raha hai wo background prompt refine se aage jati hai.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 10
+
+# Image size na pata chale to 1024x1024 high detail jitna maan lete hain.
+DEFAULT_IMAGE_TOKENS = 765
+
+_DEPLOYMENT_PATH = re.compile(r"/openai/deployments/([^/]+)/")
+_PRIORITY = contextvars.ContextVar("azure_request_priority", default=PRIORITY_NORMAL)
+
+_LIMITERS = {}
+_LOCK = threading.Lock()
+
+
+def _png_size(data):
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    return None
+
+
+def _webp_size(data):
+    if data[:4] != b"RIFF" or data[8:12] != b"WEBP" or len(data) < 30:
+        return None
+    chunk = data[12:16]
+    if chunk == b"VP8X":
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    return None
+
+
+def _jpeg_size(data):
+    if data[:2] != b"\xff\xd8":
+        return None
+    pos = 2
+    while pos + 9 < len(data):
+        if data[pos] != 0xFF:
+            pos += 1
+            continue
+        marker = data[pos + 1]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            return width, height
+        pos += 2 + struct.unpack(">H", data[pos + 2:pos + 4])[0]
+    return None
+
+
+def image_size(base64_image):
+    """base64 image ke header se (width, height); poori image decode nahi hoti."""
+    head = base64_image[:88]
+    try:
+        data = base64.b64decode(head[: len(head) // 4 * 4])
+    except ValueError:
+        return None
+    size = _png_size(data) or _webp_size(data)
+    if size is None and data[:2] == b"\xff\xd8":
+        # JPEG me SOF marker EXIF/quant tables ke baad aata hai.
+        head = base64_image[:87384]
+        try:
+            size = _jpeg_size(base64.b64decode(head[: len(head) // 4 * 4]))
+        except ValueError:
+            return None
+    return size
+
+
+def estimate_image_tokens(width, height, detail="auto"):
+    """Vision image ka token cost: 2048 box me fit, chhoti side 768, phir 512px tiles (170 each) + 85 base."""
+    if detail == "low":
+        return 85
+    if max(width, height) > 2048:
+        ratio = 2048 / max(width, height)
+        width, height = width * ratio, height * ratio
+    if min(width, height) > 768:
+        ratio = 768 / min(width, height)
+        width, height = width * ratio, height * ratio
+    return 170 * math.ceil(width / 512) * math.ceil(height / 512) + 85
+
+
+def estimate_request_tokens(body):
+    """Chat completions request body ka TPM cost: prompt text (~4 chars/token) + images + `max_tokens`."""
+    text_chars = 0
+    image_tokens = 0
+    for message in body.get("messages") or []:
+        content = message.get("content")
+        if isinstance(content, str):
+            text_chars += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                text_chars += len(part.get("text", ""))
+            elif part.get("type") == "image_url":
+                image_url = part.get("image_url") or {}
+                url = image_url.get("url", "")
+                size = image_size(url.split(",", 1)[1]) if url.startswith("data:") and "," in url else None
+                if size is None:
+                    image_tokens += DEFAULT_IMAGE_TOKENS
+                else:
+                    image_tokens += estimate_image_tokens(*size, image_url.get("detail", "auto"))
+    max_tokens = body.get("max_tokens") or body.get("max_completion_tokens") or 0
+    return math.ceil(text_chars / 4) + image_tokens + max_tokens
+
+
+@contextmanager
+def priority(value):
+    """Is block ke andar ki Azure requests isi priority se queue hoti hain (threads aur asyncio tasks dono me)."""
+    token = _PRIORITY.set(value)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+class TokenBucket:
+    """`capacity` tak bharne wala bucket jo `capacity / period` per second se refill hota hai; capacity None = unlimited."""
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = capacity
+        self.rate = capacity / period if capacity else None
+        self.level = float(capacity) if capacity else None
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        if self.rate is not None:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        if self.rate is None:
+            return 0.0
+        # Bucket se bada request poora bucket bharne par chala jata hai (warna hamesha wait karta).
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+    def take(self, amount):
+        if self.rate is not None:
+            self.level -= amount
+
+    def clamp(self, remaining):
+        if self.rate is not None:
+            self.level = min(self.level, float(remaining))
+
+
+class RateLimiter:
+    """Ek deployment ka RPM + TPM token-bucket scheduler, priority queue ke saath.
+
+    Har request `acquire()`/`acquire_async()` se apna estimated token cost leti hai; sirf queue ki sabse upar wali
+    (sabse chhoti priority, phir FIFO) request aage ja sakti hai. `observe()` service ke `retry-after` par sab
+    requests rok deta hai aur `x-ratelimit-remaining-*` headers se buckets ko asli quota ke saath sync karta hai.
+    """
+
+    def __init__(self, name, rpm=None, tpm=None, headroom=0.9, max_wait=30.0):
+        self.name = name
+        self.requests = TokenBucket(int(rpm * headroom) if rpm else None)
+        self.tokens = TokenBucket(int(tpm * headroom) if tpm else None)
+        self.max_wait = max_wait
+        self.paused_until = 0.0
+        self.stats = {
+            "requests": 0,
+            "waited": 0,
+            "wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "overruns": 0,
+            "throttled": 0,
+            "estimated_tokens": 0,
+        }
+        self._queue = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _wait_time(self, ticket, tokens):
+        """Ticket ko kitna aur rukna hai; lock ke andar call hota hai."""
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        if self._queue[0] != ticket:
+            return None
+        return max(self.paused_until - now, self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    def _grant(self, ticket, tokens, waited_s, overrun=False):
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        waited_ms = waited_s * 1000
+        self.stats["requests"] += 1
+        self.stats["estimated_tokens"] += tokens
+        if waited_ms >= 1:
+            self.stats["waited"] += 1
+            self.stats["wait_ms"] += waited_ms
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], waited_ms)
+        if overrun:
+            self.stats["overruns"] += 1
+        self._cond.notify_all()
+        return round(waited_ms, 3)
+
+    def _enqueue(self, priority_value):
+        ticket = (priority_value, next(self._sequence))
+        heapq.heappush(self._queue, ticket)
+        return ticket
+
+    def _cancel(self, ticket):
+        with self._cond:
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+    def acquire(self, tokens, priority_value=None):
+        """Quota milne tak block karta hai aur wait (ms) lautata hai; `max_wait` ke baad request bina quota ke chali jati hai."""
+        priority_value = _PRIORITY.get() if priority_value is None else priority_value
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority_value)
+            try:
+                while True:
+                    wait = self._wait_time(ticket, tokens)
+                    waited = time.monotonic() - start
+                    if wait is not None and (wait <= 0 or waited + wait > self.max_wait):
+                        return self._grant(ticket, tokens, waited, overrun=wait > 0)
+                    self._cond.wait(timeout=0.05 if wait is None else min(wait, self.max_wait - waited))
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    async def acquire_async(self, tokens, priority_value=None):
+        """`acquire()` jaisa, lekin event loop ko block kiye bina; task cancel ho to queue se hat jata hai."""
+        priority_value = _PRIORITY.get() if priority_value is None else priority_value
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(priority_value)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._wait_time(ticket, tokens)
+                    waited = time.monotonic() - start
+                    if wait is not None and (wait <= 0 or waited + wait > self.max_wait):
+                        return self._grant(ticket, tokens, waited, overrun=wait > 0)
+                await asyncio.sleep(0.01 if wait is None else min(wait, 0.05))
+        except BaseException:
+            self._cancel(ticket)
+            raise
+
+    def observe(self, status_code, headers):
+        """Response headers se quota sync: remaining values par buckets clamp, 429/503 par `retry-after` tak pause."""
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            for header, bucket in (
+                ("x-ratelimit-remaining-requests", self.requests),
+                ("x-ratelimit-remaining-tokens", self.tokens),
+            ):
+                value = headers.get(header)
+                if value is not None:
+                    try:
+                        bucket.clamp(float(value))
+                    except ValueError:
+                        pass
+
+            if status_code in (429, 503):
+                self.stats["throttled"] += 1
+                delay = None
+                for header, factor in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+                    value = headers.get(header)
+                    if value:
+                        try:
+                            delay = float(value) * factor
+                            break
+                        except ValueError:
+                            pass
+                if delay is None:
+                    # Header na ho to ek second rukte hain aur request bucket khali maante hain.
+                    delay = 1.0
+                    self.requests.clamp(0)
+                self.paused_until = max(self.paused_until, now + delay)
+            self._cond.notify_all()
+
+    def as_dict(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats["wait_ms"] = round(stats["wait_ms"], 3)
+            stats["max_wait_ms"] = round(stats["max_wait_ms"], 3)
+            stats["rpm"] = self.requests.capacity
+            stats["tpm"] = self.tokens.capacity
+            stats["queued"] = len(self._queue)
+            return stats
+
+
+def get_limiter(deployment):
+    """Deployment ka shared limiter (Azure quota per deployment hota hai); `AZURE_RPM`/`AZURE_TPM` config se."""
+    with _LOCK:
+        limiter = _LIMITERS.get(deployment)
+        if limiter is None:
+            limiter = _LIMITERS[deployment] = RateLimiter(
+                deployment,
+                rpm=config.AZURE_RPM,
+                tpm=config.AZURE_TPM,
+                headroom=config.AZURE_RATE_HEADROOM,
+                max_wait=config.AZURE_RATE_MAX_WAIT,
+            )
+    return limiter
+
+
+def _request_cost(request):
+    match = _DEPLOYMENT_PATH.search(request.url.path)
+    if match is None or request.method != "POST":
+        return None, 0
+    try:
+        body = json.loads(request.content or b"{}")
+    except ValueError:
+        body = {}
+    return get_limiter(match.group(1)), estimate_request_tokens(body)
+
+
+def _response_limiter(response):
+    match = _DEPLOYMENT_PATH.search(response.request.url.path)
+    return None if match is None else get_limiter(match.group(1))
+
+
+def on_request(request):
+    """httpx request hook: deployment quota milne tak rukta hai."""
+    limiter, tokens = _request_cost(request)
+    if limiter is not None:
+        request.extensions["rate_limit_wait_ms"] = limiter.acquire(tokens)
+
+
+async def on_request_async(request):
+    limiter, tokens = _request_cost(request)
+    if limiter is not None:
+        request.extensions["rate_limit_wait_ms"] = await limiter.acquire_async(tokens)
+
+
+def on_response(response):
+    limiter = _response_limiter(response)
+    if limiter is not None:
+        limiter.observe(response.status_code, response.headers)
+
+
+async def on_response_async(response):
+    on_response(response)
+
+
+def limiter_stats():
+    with _LOCK:
+        limiters = list(_LIMITERS.values())
+    return {limiter.name: limiter.as_dict() for limiter in limiters}
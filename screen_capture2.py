@@ -1,35 +1,440 @@
-import mss 
 import io
-from PIL import Image
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import base64
 import time
 
+import config
+from frame_store import FrameStore
+
+MIME_TYPES = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+FILE_EXTENSIONS = {
+    "PNG": "png",
+    "JPEG": "jpg",
+    "WEBP": "webp",
+}
+MONITOR_ORDINALS = {
+    "first": 1,
+    "primary": 1,
+    "main": 1,
+    "pehla": 1,
+    "pehle": 1,
+    "second": 2,
+    "dusra": 2,
+    "dusre": 2,
+    "doosre": 2,
+    "third": 3,
+    "teesra": 3,
+    "teesre": 3,
+}
+_MONITOR_WORDS = r"(?:monitor|screen|display)"
+
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+class FrameGeometry:
+    """Model ko bheje gaye frame aur physical screen pixels ke beech ka mapping."""
+
+    def __init__(self, left, top, width, height, sent_width=None, sent_height=None, monitor_index=None):
+        self.monitor_index = monitor_index
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.sent_width = sent_width or width
+        self.sent_height = sent_height or height
+        self.scale_x = self.sent_width / self.width
+        self.scale_y = self.sent_height / self.height
+
+    @classmethod
+    def fit_long_edge(cls, monitor, width, height, max_long_edge=None, monitor_index=None):
+        """Aspect ratio same rakhte hue long edge ko `max_long_edge` tak chhota karta hai (upscale kabhi nahi)."""
+        sent_width, sent_height = width, height
+        long_edge = max(width, height)
+        if max_long_edge and long_edge > max_long_edge:
+            ratio = max_long_edge / long_edge
+            sent_width = max(1, round(width * ratio))
+            sent_height = max(1, round(height * ratio))
+        return cls(monitor["left"], monitor["top"], width, height, sent_width, sent_height, monitor_index)
+
+    @property
+    def is_scaled(self):
+        return (self.sent_width, self.sent_height) != (self.width, self.height)
+
+    def to_screen(self, x, y):
+        """Sent-frame pixel ko us pixel ke center ke hisab se physical screen pixel par map karta hai."""
+        screen_x = (float(x) + 0.5) / self.scale_x - 0.5
+        screen_y = (float(y) + 0.5) / self.scale_y - 0.5
+        screen_x = min(max(round(screen_x), 0), self.width - 1)
+        screen_y = min(max(round(screen_y), 0), self.height - 1)
+        return self.left + screen_x, self.top + screen_y
+
+    def map_result(self, element):
+        """Vision result ke x/y ko screen coordinates me badalta hai, model wale raw values audit ke liye rakhta hai."""
+        mapped = dict(element)
+        mapped["model_x"] = element["x"]
+        mapped["model_y"] = element["y"]
+        mapped["x"], mapped["y"] = self.to_screen(element["x"], element["y"])
+        mapped["scale"] = self.as_dict()
+        return mapped
+
+    def as_dict(self):
+        return {
+            "monitor": self.monitor_index,
+            "left": self.left,
+            "top": self.top,
+            "width": self.width,
+            "height": self.height,
+            "sent_width": self.sent_width,
+            "sent_height": self.sent_height,
+            "scale_x": self.scale_x,
+            "scale_y": self.scale_y,
+        }
+
+
 class ScreenCapture:
-    def __init__(self):
-        self.sct = mss.mss()
-        self.monitor = self.sct.monitors[1]
+    """mss se ek monitor, virtual desktop ya sabhi monitors capture karke vision payload banata hai.
+
+    `monitor` me mss index (1 = primary, 0 = virtual desktop), "virtual" ya "auto" de sakte hain;
+    "auto" me loop har command ke liye `pick_monitor()` se monitor chunta hai.
+    """
+
+    def __init__(
+        self,
+        image_format=None,
+        quality=None,
+        png_level=None,
+        save_screenshots=None,
+        max_long_edge=None,
+        monitor=None,
+        parallel=None,
+    ):
+        self._local = threading.local()
+        self._instances = []
+        self._instances_lock = threading.Lock()
+        self._pool = None
+        self.monitors = self.sct.monitors
+
+        monitor = config.CAPTURE_MONITOR if monitor is None else monitor
+        self.auto_monitor = str(monitor).lower() == "auto"
+        if self.auto_monitor:
+            monitor = 1
+        elif str(monitor).lower() == "virtual":
+            monitor = 0
+        self.parallel = config.CAPTURE_PARALLEL if parallel is None else parallel
+        self.select_monitor(int(monitor))
+
+        image_format = (image_format or config.CAPTURE_FORMAT or "PNG").upper()
+        if image_format == "JPG":
+            image_format = "JPEG"
+        if image_format not in MIME_TYPES:
+            raise ValueError(f"Unsupported capture format: {image_format}")
+        self.image_format = image_format
+        self.quality = int(quality if quality is not None else config.CAPTURE_QUALITY)
+        self.png_level = int(png_level if png_level is not None else config.CAPTURE_PNG_LEVEL)
+        self.save_screenshots = config.SAVE_SCREENSHOTS if save_screenshots is None else save_screenshots
+        self.max_long_edge = config.VISION_MAX_LONG_EDGE if max_long_edge is None else max_long_edge
+        self.frame_store = FrameStore(
+            directory=config.SCREENSHOT_DIR,
+            persist=self.save_screenshots,
+            queue_size=config.SCREENSHOT_QUEUE_SIZE,
+            max_files=config.SCREENSHOT_MAX_FILES,
+            max_age=config.SCREENSHOT_MAX_AGE,
+            max_bytes=config.SCREENSHOT_MAX_BYTES,
+            ring_size=config.SCREENSHOT_RING_SIZE,
+        )
+        self.last_stats = {}
+        self.last_geometry = None
+        self._last_stored = None
+
+    @property
+    def sct(self):
+        # mss handles thread-bound hote hain, isliye har thread ka apna instance.
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            import mss
+
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._instances_lock:
+                self._instances.append(sct)
+        return sct
+
+    @property
+    def mime_type(self):
+        return MIME_TYPES[self.image_format]
+
+    def select_monitor(self, index):
+        if index < 0 or index >= len(self.monitors):
+            raise ValueError(f"Monitor {index} not found, available: 0-{len(self.monitors) - 1}")
+        self.monitor_index = index
+        self.monitor = self.monitors[index]
+
+    def monitor_for_point(self, x, y):
+        for index, monitor in enumerate(self.monitors[1:], start=1):
+            if (
+                monitor["left"] <= x < monitor["left"] + monitor["width"]
+                and monitor["top"] <= y < monitor["top"] + monitor["height"]
+            ):
+                return index
+        return None
+
+    def _monitor_from_command(self, command):
+        text = (command or "").lower()
+        count = len(self.monitors) - 1
+
+        match = re.search(_MONITOR_WORDS + r"\s*(?:no\.?|number|#)?\s*(\d+)", text)
+        if match is None:
+            match = re.search(r"(\d+)\s*(?:st|nd|rd|th)?\s*" + _MONITOR_WORDS, text)
+        if match is not None and 1 <= int(match.group(1)) <= count:
+            return int(match.group(1))
+
+        for word, index in MONITOR_ORDINALS.items():
+            if re.search(rf"\b{word}\s+" + _MONITOR_WORDS, text) and index <= count:
+                return index
+
+        physical = list(enumerate(self.monitors[1:], start=1))
+        if re.search(r"\b(?:left|baayen|baye)\s+" + _MONITOR_WORDS, text):
+            return min(physical, key=lambda item: item[1]["left"])[0]
+        if re.search(r"\b(?:right|daayen|daye)\s+" + _MONITOR_WORDS, text):
+            return max(physical, key=lambda item: item[1]["left"])[0]
+        return None
+
+    def _cursor_monitor(self):
+        try:
+            import pyautogui
+
+            x, y = pyautogui.position()
+        except Exception:
+            return None
+        return self.monitor_for_point(x, y)
+
+    def pick_monitor(self, command, remembered=None):
+        """Command me likha monitor, pichhli baar jahan target mila tha, ya cursor wala monitor chunta hai."""
+        if len(self.monitors) <= 2:
+            return 1
+
+        explicit = self._monitor_from_command(command)
+        if explicit is not None:
+            return explicit
+        if remembered is not None and 1 <= remembered < len(self.monitors):
+            return remembered
+        return self._cursor_monitor() or 1
+
+    def _to_image(self, screenshot):
+        from PIL import Image
+
+        # mss ka BGRA buffer seedha decode hota hai, .rgb wali extra copy nahi banti.
+        return Image.frombuffer("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX", 0, 1)
+
+    def _resize(self, img, geometry):
+        if not geometry.is_scaled:
+            return img
+        from PIL import Image
+
+        return img.resize((geometry.sent_width, geometry.sent_height), Image.BILINEAR, reducing_gap=2.0)
+
+    def _encode(self, img):
+        buffer = io.BytesIO()
+        if self.image_format == "PNG":
+            img.save(buffer, format="PNG", compress_level=self.png_level)
+        else:
+            img.save(buffer, format=self.image_format, quality=self.quality)
+        return buffer.getbuffer()
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=max(1, len(self.monitors) - 1),
+                thread_name_prefix="ScreenCapture",
+            )
+        return self._pool
+
+    def _map(self, func, items):
+        items = list(items)
+        if self.parallel and len(items) > 1:
+            return list(self._executor().map(func, items))
+        return [func(item) for item in items]
 
     def screen_capture(self):
         try:
             screenshot = self.sct.grab(self.monitor)
-            img = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
-            filename = f"screenshots/screenshot_{time.time()}.png"
-            img.save(filename)
-            return img
+            return self._to_image(screenshot)
         except Exception as e:
-            print(f"An error when screen capture {e}")    
+            print(f"An error when screen capture {e}")
             return None
 
-    def capture_and_encode(self):
-        img = self.screen_capture()
-
-        if img is None:
+    def grab(self):
+        """Sirf raw mss frame leta hai (encode nahi); grab time `last_stats` me reset hota hai."""
+        start = time.perf_counter()
+        try:
+            screenshot = self.sct.grab(self.monitor)
+        except Exception as e:
+            print(f"An error when screen capture {e}")
+            self.last_stats = {"format": self.image_format, "monitor": self.monitor_index}
+            self.last_geometry = None
             return None
+        self.last_stats = {
+            "format": self.image_format,
+            "monitor": self.monitor_index,
+            "grab_ms": _elapsed_ms(start),
+            "raw_bytes": len(screenshot.bgra),
+            "width": screenshot.size[0],
+            "height": screenshot.size[1],
+        }
+        return screenshot
+
+    def _encode_screenshot(self, screenshot, monitor, monitor_index, stats, region=None, store=True):
+        start = time.perf_counter()
+        img = self._to_image(screenshot)
+        origin = monitor
+        width, height = screenshot.size
+        if region is not None:
+            img = img.crop((
+                region["left"],
+                region["top"],
+                region["left"] + region["width"],
+                region["top"] + region["height"],
+            ))
+            origin = {
+                "left": monitor["left"] + region["left"],
+                "top": monitor["top"] + region["top"],
+            }
+            width, height = region["width"], region["height"]
+            stats["region"] = dict(region)
+        stats["convert_ms"] = _elapsed_ms(start)
+
+        geometry = FrameGeometry.fit_long_edge(origin, width, height, self.max_long_edge, monitor_index)
+        if geometry.is_scaled:
+            start = time.perf_counter()
+            img = self._resize(img, geometry)
+            stats["resize_ms"] = _elapsed_ms(start)
+        stats["sent_width"], stats["sent_height"] = geometry.sent_width, geometry.sent_height
+        stats["scale"] = round(geometry.scale_x, 6)
+
+        start = time.perf_counter()
+        encoded = self._encode(img)
+        stats["encode_ms"] = _elapsed_ms(start)
+        stats["encoded_bytes"] = encoded.nbytes
+
+        start = time.perf_counter()
+        img_str = base64.b64encode(encoded).decode("ascii")
+        stats["base64_ms"] = _elapsed_ms(start)
+        stats["base64_bytes"] = len(img_str)
 
-        bufferd = io.BytesIO()
-        img.save(bufferd, format="PNG")
+        if store:
+            start = time.perf_counter()
+            self.frame_store.add(encoded, FILE_EXTENSIONS[self.image_format])
+            self._last_stored = img_str
+            stats["persist_ms"] = _elapsed_ms(start)
+        return img_str, geometry
 
-        img_str = base64.b64encode(bufferd.getvalue()).decode()
+    def store_payload(self, img_str):
+        """`store=False` se encode hua frame model ko bhejne se pehle ring buffer/disk me daalta hai (ek frame ek baar)."""
+        if not img_str or img_str is self._last_stored:
+            return False
+        self._last_stored = img_str
+        start = time.perf_counter()
+        self.frame_store.add(base64.b64decode(img_str), FILE_EXTENSIONS[self.image_format])
+        self.last_stats["persist_ms"] = _elapsed_ms(start)
+        return True
+
+    def encode_frame(self, screenshot, region=None):
+        """Grab kiya frame ek hi baar encode karke base64 deta hai; `region` (monitor pixels) ho to sirf wahi hissa.
+
+        `max_long_edge` set ho to frame chhota karke bheja jata hai; mapping `last_geometry` me milti hai.
+        """
+        stats = self.last_stats
+        total_start = time.perf_counter()
+        try:
+            img_str, geometry = self._encode_screenshot(
+                screenshot, self.monitor, self.monitor_index, stats, region
+            )
+        except Exception as e:
+            print(f"An error when screen capture {e}")
+            self.last_geometry = None
+            return None
+
+        stats["total_ms"] = round(stats.get("grab_ms", 0.0) + _elapsed_ms(total_start), 3)
+        self.last_geometry = geometry
 
         return img_str
 
+    def capture_and_encode(self):
+        """Monitor grab karke ek hi baar encode karta hai aur har stage ka bytes/ms `last_stats` me rakhta hai."""
+        screenshot = self.grab()
+        if screenshot is None:
+            return None
+        return self.encode_frame(screenshot)
+
+    def encode_payload(self, screenshot, region=None, monitor_index=None, store=False):
+        """`encode_frame` jaisa, lekin shared `last_*` state chhue bina `(image, geometry, stats)` deta hai.
+
+        Background/speculative encode ke liye hai, isliye default `store=False`; bheja jaye to `store_payload()`.
+        """
+        index = self.monitor_index if monitor_index is None else monitor_index
+        stats = {"format": self.image_format, "monitor": index}
+        img_str, geometry = self._encode_screenshot(screenshot, self.monitors[index], index, stats, region, store)
+        return img_str, geometry, stats
+
+    def capture_frame(self, index=None, keep_raw=False, store=True):
+        """Kisi bhi thread se ek monitor grab + encode karta hai; `keep_raw` par raw mss frame bhi lautata hai.
+
+        Prefetch jaise frames jo shayad use na hon `store=False` se ring buffer/disk me nahi jate.
+        """
+        index = self.monitor_index if index is None else index
+        stats = {"format": self.image_format, "monitor": index}
+        total_start = time.perf_counter()
+        try:
+            monitor = self.monitors[index]
+            start = time.perf_counter()
+            screenshot = self.sct.grab(monitor)
+            stats["grab_ms"] = _elapsed_ms(start)
+            img_str, geometry = self._encode_screenshot(screenshot, monitor, index, stats, store=store)
+        except Exception as e:
+            print(f"An error when screen capture (monitor {index}) {e}")
+            return {"monitor": index, "image": None, "geometry": None, "stats": stats}
+        stats["total_ms"] = _elapsed_ms(total_start)
+        frame = {"monitor": index, "image": img_str, "geometry": geometry, "stats": stats}
+        if keep_raw:
+            frame["screenshot"] = screenshot
+        return frame
+
+    def grab_region(self, left, top, width, height):
+        """Virtual desktop ka chhota rectangle (screen pixels) grab karta hai; bahar wala hissa clamp ho jata hai."""
+        desktop = self.monitors[0]
+        x0 = max(desktop["left"], int(left))
+        y0 = max(desktop["top"], int(top))
+        x1 = min(desktop["left"] + desktop["width"], int(left + width))
+        y1 = min(desktop["top"] + desktop["height"], int(top + height))
+        if x1 <= x0 or y1 <= y0:
+            return None
+        try:
+            return self.sct.grab({"left": x0, "top": y0, "width": x1 - x0, "height": y1 - y0})
+        except Exception as e:
+            print(f"An error when screen capture {e}")
+            return None
+
+    def capture_all(self):
+        """Har physical monitor ko alag frame ke roop me capture/encode karta hai (parallel on ho to threads me)."""
+        return self._map(self.capture_frame, range(1, len(self.monitors)))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        self.frame_store.close()
+        with self._instances_lock:
+            instances, self._instances = self._instances, []
+        for sct in instances:
+            try:
+                sct.close()
+            except Exception:
+                pass
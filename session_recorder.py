@@ -0,0 +1,91 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+RECORDING_FORMAT = 1
+STEPS_FILE = "session.jsonl"
+
+
+class SessionRecorder:
+    """AutonomousLoop ke har command ka frame, model request/response aur executed action disk par likhta hai.
+
+    Directory me `session.jsonl` (pehli line meta, phir har step) aur `frames/*.png` bante hain; same frame
+    dobara aaye to wahi PNG reuse hota hai. `session_replay.py` isi recording ko headless chala sakta hai.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.frames_dir = self.directory / "frames"
+        self.frames_dir.mkdir(parents=True, exist_ok=True)
+        self.steps = 0
+        self._frames = set()
+        self._lock = threading.Lock()
+        self._file = open(self.directory / STEPS_FILE, "w", encoding="utf-8")
+        self._meta_written = False
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def _save_frame(self, screenshot):
+        if screenshot is None:
+            return None
+        from PIL import Image
+
+        digest = hashlib.sha256(screenshot.bgra).hexdigest()[:16]
+        name = f"frames/{digest}.png"
+        if digest not in self._frames:
+            img = Image.frombuffer("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX", 0, 1)
+            img.save(self.directory / name, format="PNG", compress_level=1)
+            self._frames.add(digest)
+        return name
+
+    def record_step(self, command, screenshot, monitor_index, vision_calls, element, actions, ok, metrics, monitors=None):
+        with self._lock:
+            if not self._meta_written:
+                self._write({
+                    "type": "meta",
+                    "format": RECORDING_FORMAT,
+                    "created": time.time(),
+                    "monitors": monitors,
+                })
+                self._meta_written = True
+
+            self.steps += 1
+            self._write({
+                "type": "step",
+                "index": self.steps,
+                "time": time.time(),
+                "command": command,
+                "frame": self._save_frame(screenshot),
+                "frame_size": list(screenshot.size) if screenshot is not None else None,
+                "monitor_index": monitor_index,
+                "vision": vision_calls,
+                "element": element,
+                "actions": actions,
+                "ok": ok,
+                "metrics": metrics,
+            })
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def load_recording(directory):
+    """Recording directory se `(meta, steps)` padhta hai."""
+    meta = {}
+    steps = []
+    with open(Path(directory) / STEPS_FILE, "r", encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type") == "meta":
+                meta = record
+            elif record.get("type") == "step":
+                steps.append(record)
+    return meta, steps
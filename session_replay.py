@@ -0,0 +1,240 @@
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+import config
+from action_execution2 import ActionExecuter
+from autonomous_loop import AutonomousLoop
+from screen_capture2 import ScreenCapture
+from session_recorder import load_recording
+from vision_stub import VisionStubServer
+
+REPLAY_API_VERSION = "2024-06-01"
+
+
+class _ReplayShot:
+    """mss screenshot jaisa object (`size`, `bgra`)."""
+
+    def __init__(self, width, height, bgra):
+        self.size = (width, height)
+        self.bgra = bgra
+
+
+class _ReplaySct:
+    """mss ki jagah recorded frame lautata hai; `grab()` ko monitor ya chhota region dono mil sakte hain."""
+
+    def __init__(self, monitors):
+        self.monitors = monitors
+        self.frame = None
+        self.origin = (0, 0)
+
+    def grab(self, rect):
+        width, height = rect["width"], rect["height"]
+        if self.frame is None:
+            return _ReplayShot(width, height, bytes(width * height * 4))
+        left = rect["left"] - self.origin[0]
+        top = rect["top"] - self.origin[1]
+        canvas = np.zeros((height, width, 4), dtype=np.uint8)
+        frame_h, frame_w = self.frame.shape[:2]
+        x0, y0 = max(0, left), max(0, top)
+        x1, y1 = min(frame_w, left + width), min(frame_h, top + height)
+        if x1 > x0 and y1 > y0:
+            canvas[y0 - top:y1 - top, x0 - left:x1 - left] = self.frame[y0:y1, x0:x1]
+        return _ReplayShot(width, height, canvas.tobytes())
+
+    def close(self):
+        pass
+
+
+class ReplayScreenCapture(ScreenCapture):
+    """Live desktop ke bina recorded PNG frames ko ScreenCapture pipeline (hash, encode, geometry) se guzarta hai."""
+
+    def __init__(self, monitors, **kwargs):
+        self._replay_sct = _ReplaySct(monitors)
+        super().__init__(save_screenshots=False, **kwargs)
+
+    @property
+    def sct(self):
+        return self._replay_sct
+
+    def _cursor_monitor(self):
+        return None
+
+    def load_frame(self, path, monitor_index):
+        from PIL import Image
+
+        with Image.open(path) as img:
+            rgb = np.asarray(img.convert("RGB"))
+        bgra = np.empty((*rgb.shape[:2], 4), dtype=np.uint8)
+        bgra[..., :3] = rgb[..., ::-1]
+        bgra[..., 3] = 255
+        monitor = self.monitors[monitor_index]
+        self._replay_sct.frame = bgra
+        self._replay_sct.origin = (monitor["left"], monitor["top"])
+        if not self.auto_monitor:
+            self.select_monitor(monitor_index)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return round(ordered[index], 3)
+
+
+def _recorded_responses(steps):
+    responses = {}
+    for step in steps:
+        for call in step.get("vision") or []:
+            request = call.get("request") or {}
+            if request.get("prompt") and call.get("response") is not None:
+                responses[request["prompt"]] = call["response"]
+    return responses
+
+
+def _recorded_deployment(steps):
+    for step in steps:
+        for call in step.get("vision") or []:
+            deployment = (call.get("request") or {}).get("deployment")
+            if deployment:
+                return deployment
+    return "replay"
+
+
+def _distance(expected, actual):
+    if expected is None or actual is None:
+        return None
+    try:
+        return math.hypot(float(actual["x"]) - float(expected["x"]), float(actual["y"]) - float(expected["y"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def replay(
+    directory,
+    latency=0.0,
+    jitter=0.0,
+    error_rate=0.0,
+    error_status=429,
+    retry_after=None,
+    tolerance=12.0,
+    seed=0,
+    output=None,
+):
+    """Recording ko local vision stub aur dry-run actions ke saath chalata hai; per-step results aur summary deta hai.
+
+    Expected target recording ka element hota hai, isliye parsing/mapping/cache logic me badlav accuracy me dikh jata hai.
+    """
+    meta, steps = load_recording(directory)
+    monitors = meta.get("monitors") or [{"left": 0, "top": 0, "width": 1920, "height": 1080}] * 2
+
+    stub = VisionStubServer(
+        responses=_recorded_responses(steps),
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        error_status=error_status,
+        retry_after=retry_after,
+        seed=seed,
+    ).start()
+    config.configure(
+        allow_missing=True,
+        AZURE_ENDPOINT=stub.url,
+        AZURE_API_KEY="replay",
+        AZURE_API_VERSION=REPLAY_API_VERSION,
+        LLM_DEPLOYMENT=_recorded_deployment(steps),
+        VISION_HEDGE_DEPLOYMENT="",
+        VISION_CACHE_PATH=None,
+        TEMPLATE_INDEX_DIR=None,
+    )
+
+    capture = ReplayScreenCapture(monitors)
+    loop = AutonomousLoop(screen_capture=capture, action_execution=ActionExecuter(dry_run=True))
+    # openai import/client setup pehle step ki latency me na gine.
+    loop.warm_up().result()
+    out = open(output, "w", encoding="utf-8") if output else None
+    results = []
+    start = time.perf_counter()
+    try:
+        for step in steps:
+            if not step.get("frame"):
+                continue
+            capture.load_frame(f"{directory}/{step['frame']}", step["monitor_index"])
+            result = loop.run_command({"command": step["command"], "id": step["index"]})
+            expected = step.get("element")
+            distance = _distance(expected, result.get("target"))
+            result["expected"] = None if expected is None else {"x": expected.get("x"), "y": expected.get("y")}
+            result["distance_px"] = None if distance is None else round(distance, 3)
+            if expected is None:
+                result["hit"] = result.get("target") is None
+            else:
+                result["hit"] = distance is not None and distance <= tolerance
+            results.append(result)
+            if out is not None:
+                out.write(json.dumps(result, default=str) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+        loop.close()
+        stub.stop()
+
+    latencies = [result["elapsed_ms"] for result in results]
+    hits = sum(1 for result in results if result["hit"])
+    return {
+        "steps": len(results),
+        "hits": hits,
+        "accuracy": round(hits / len(results), 4) if results else None,
+        "succeeded": sum(1 for result in results if result["ok"]),
+        "latency_ms": {
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "max": round(max(latencies), 3) if latencies else None,
+        },
+        "decisions": {
+            decision: sum(1 for result in results if str(result["decision"]) == decision)
+            for decision in sorted({str(result["decision"]) for result in results})
+        },
+        "stub": dict(stub.stats),
+        "pipeline": loop.metrics.summary()["latency_ms"],
+        "wall_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recorded desktop session ko headless replay karo.")
+    parser.add_argument("recording", help="`main.py --record` wali directory.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub ki har request par latency (sec).")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency me 0..jitter sec random extra.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Kitne fraction requests par error lautana hai.")
+    parser.add_argument("--error-status", type=int, default=429, help="Injected error ka HTTP status.")
+    parser.add_argument("--retry-after", type=float, default=None, help="Error ke saath Retry-After header (sec).")
+    parser.add_argument("--tolerance", type=float, default=12.0, help="Target kitne px tak sahi maana jaye.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", metavar="FILE", help="Per-step results ki JSONL file.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    summary = replay(
+        args.recording,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        tolerance=args.tolerance,
+        seed=args.seed,
+        output=args.output,
+    )
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["steps"] == summary["hits"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
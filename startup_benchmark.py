@@ -0,0 +1,128 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Desktop agent ke modules, dependency order me.
+AGENT_MODULES = [
+    "config",
+    "rate_limiter",
+    "azure_clients",
+    "vision_parser",
+    "vision_cache",
+    "frame_store",
+    "frame_hash",
+    "template_index",
+    "element_map",
+    "pipeline_metrics",
+    "text_input",
+    "screen_capture2",
+    "action_execution2",
+    "vision_analyzer2",
+    "autonomous_loop",
+    "session_recorder",
+    "vision_stub",
+    "session_replay",
+    "main",
+]
+
+# Ye imports lazy hone chahiye; cold start me dikhe to regression hai.
+HEAVY_MODULES = ["openai", "httpx", "numpy", "pyautogui", "mss", "PIL", "selenium"]
+
+_IMPORT_TIME = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module):
+    """Naye interpreter me `-X importtime` ke saath module import karke cost aur pull hue heavy modules deta hai."""
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    cumulative_us = None
+    heavy = {}
+    for line in process.stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match is None:
+            continue
+        name = match.group(4)
+        if name == module:
+            cumulative_us = int(match.group(2))
+        top = name.split(".")[0]
+        if name == top and top in HEAVY_MODULES:
+            heavy[top] = round(int(match.group(2)) / 1000, 3)
+
+    result = {
+        "module": module,
+        "ok": process.returncode == 0,
+        "import_ms": None if cumulative_us is None else round(cumulative_us / 1000, 3),
+        "process_ms": round(wall_ms, 3),
+        "heavy": heavy,
+    }
+    if process.returncode != 0:
+        result["error"] = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else "import failed"
+    return result
+
+
+def measure_help():
+    """`python main.py --help` ka poora wall time (interpreter startup samet)."""
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "main.py", "--help"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    return {"ok": process.returncode == 0, "process_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Desktop agent ke har module ki import cost naapo.")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="`main` import + `--help` ka max cold start.")
+    parser.add_argument("--repeat", type=int, default=3, help="Har module kitni baar naapna hai (minimum liya jata hai).")
+    parser.add_argument("--json", action="store_true", help="Report JSON me print karo.")
+    parser.add_argument("modules", nargs="*", help="Sirf ye modules naapo (default: sabhi agent modules).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    for module in args.modules or AGENT_MODULES:
+        runs = [measure_import(module) for _ in range(max(1, args.repeat))]
+        results.append(min(runs, key=lambda run: run["process_ms"]))
+    cold_start = min((measure_help() for _ in range(max(1, args.repeat))), key=lambda run: run["process_ms"])
+
+    over_budget = cold_start["process_ms"] > args.budget_ms
+    report = {
+        "budget_ms": args.budget_ms,
+        "cold_start": cold_start,
+        "over_budget": over_budget,
+        "modules": results,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'module':<20}{'import ms':>12}{'process ms':>12}  heavy imports")
+        for result in results:
+            import_ms = "error" if not result["ok"] else f"{result['import_ms']:.1f}"
+            heavy = ", ".join(f"{name} {ms:.0f}ms" for name, ms in result["heavy"].items())
+            print(f"{result['module']:<20}{import_ms:>12}{result['process_ms']:>12.1f}  {heavy or result.get('error', '')}")
+        status = "OVER BUDGET" if over_budget else "ok"
+        print(f"\nmain.py --help: {cold_start['process_ms']:.1f} ms (budget {args.budget_ms:.0f} ms) {status}")
+
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+TASK_FIELDNAMES = [
+    "id",
+    "page_name",
+    "planning",
+    "code_generate",
+    "code_download",
+    "docs_generate",
+    "docs_download",
+    "complete_status",
+    "url",
+]
+STEP_STATUS_COLUMNS = [
+    "planning",
+    "code_generate",
+    "code_download",
+    "docs_generate",
+    "docs_download",
+]
+
+# Retry bookkeeping sirf database me rehti hai; CSV schema (`TASK_FIELDNAMES`) wahi rehta hai.
+RETRY_COLUMNS = {
+    "attempts": "INTEGER NOT NULL DEFAULT 0",
+    "next_attempt_at": "REAL NOT NULL DEFAULT 0",
+    "last_error": "TEXT NOT NULL DEFAULT ''",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    page_name TEXT NOT NULL DEFAULT '',
+    planning TEXT NOT NULL DEFAULT '0',
+    code_generate TEXT NOT NULL DEFAULT '0',
+    code_download TEXT NOT NULL DEFAULT '0',
+    docs_generate TEXT NOT NULL DEFAULT '0',
+    docs_download TEXT NOT NULL DEFAULT '0',
+    complete_status TEXT NOT NULL DEFAULT '0',
+    url TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (complete_status, seq);
+CREATE TABLE IF NOT EXISTS downloads (
+    id INTEGER PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    step TEXT NOT NULL DEFAULT '',
+    file_name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    downloaded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_downloads_seq ON downloads (seq);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class TaskStore:
+    """`todo.csv` ki jagah SQLite (WAL) task store: agla pending task index se, har update ek row ki transaction.
+
+    `seq` CSV ki row order rakhta hai. CSV tooling ke liye `import_csv()`/`export_csv()` wahi `TASK_FIELDNAMES`
+    schema use karte hain; export tmp file + rename se hota hai, isliye crash par CSV aadhi nahi likhi jati.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL ke saath NORMAL durable hai (sirf power loss par aakhri commit ja sakta hai) aur har commit par fsync nahi.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        for column, definition in RETRY_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {definition}")
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    @staticmethod
+    def _as_dict(row):
+        return None if row is None else {key: row[key] for key in row.keys()}
+
+    def next_pending(self, max_attempts=None, now=None):
+        """Pehla `complete_status = '0'` wala task (`seq` ke saath), `idx_tasks_status` se bina full scan.
+
+        Koi pending na ho aur `max_attempts` diya ho to failed (`'2'`) task jiska backoff poora ho chuka aur
+        attempts bache hain, wo lautata hai.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM tasks WHERE complete_status = '0' ORDER BY seq LIMIT 1"
+            ).fetchone()
+            if row is None and max_attempts:
+                row = self._conn.execute(
+                    "SELECT * FROM tasks WHERE complete_status = '2' AND attempts < ? AND next_attempt_at <= ? "
+                    "ORDER BY next_attempt_at, seq LIMIT 1",
+                    (max_attempts, time.time() if now is None else now),
+                ).fetchone()
+        return self._as_dict(row)
+
+    def next_retry_at(self, max_attempts):
+        """Agla failed task kab retry ho sakta hai (epoch sec); koi retry bacha na ho to None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM tasks WHERE complete_status = '2' AND attempts < ?",
+                (max_attempts,),
+            ).fetchone()
+        return row[0]
+
+    def get(self, seq):
+        with self._lock:
+            return self._as_dict(self._conn.execute("SELECT * FROM tasks WHERE seq = ?", (seq,)).fetchone())
+
+    def rows(self):
+        with self._lock:
+            return [self._as_dict(row) for row in self._conn.execute("SELECT * FROM tasks ORDER BY seq")]
+
+    @staticmethod
+    def _value(column, value):
+        if column in RETRY_COLUMNS:
+            return value
+        return str(value if value is not None else "")
+
+    def update(self, seq, **values):
+        """Ek task ke diye gaye columns ek atomic UPDATE me likhta hai."""
+        unknown = set(values) - set(TASK_FIELDNAMES) - set(RETRY_COLUMNS)
+        if unknown:
+            raise KeyError(f"Unknown task columns: {sorted(unknown)}")
+        if not values:
+            return
+        columns = list(values)
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE seq = ?",
+                [self._value(column, values[column]) for column in columns] + [seq],
+            )
+
+    def record_failure(self, seq, error="", retry_delay=0.0):
+        """Task failed mark karta hai, attempts badhata hai aur agla retry `retry_delay` sec baad rakhta hai."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE tasks SET complete_status = '2', attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                "WHERE seq = ?",
+                (time.time() + retry_delay, str(error or "")[:500], seq),
+            )
+
+    def record_download(self, seq, record):
+        """Task ki downloaded file (`DownloadManager.store()` ka record: path, size, SHA-256) save karta hai."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO downloads (seq, step, file_name, path, size, sha256, downloaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    seq,
+                    record.get("step") or "",
+                    record["file_name"],
+                    record["path"],
+                    record["size"],
+                    record["sha256"],
+                    record["downloaded_at"],
+                ),
+            )
+
+    def downloads(self, seq=None):
+        with self._lock:
+            if seq is None:
+                rows = self._conn.execute("SELECT * FROM downloads ORDER BY id")
+            else:
+                rows = self._conn.execute("SELECT * FROM downloads WHERE seq = ? ORDER BY id", (seq,))
+            return [self._as_dict(row) for row in rows]
+
+    def status_counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT complete_status, COUNT(*) FROM tasks GROUP BY complete_status")
+            return {status: count for status, count in rows}
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value)),
+            )
+
+    def replace_all(self, rows):
+        """Saare tasks ek transaction me badalta hai (CSV import); rows pehle se normalized hone chahiye."""
+        records = [[str(row.get(column) or "") for column in TASK_FIELDNAMES] for row in rows]
+        placeholders = ", ".join("?" for _ in TASK_FIELDNAMES)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.executemany(
+                f"INSERT INTO tasks ({', '.join(TASK_FIELDNAMES)}) VALUES ({placeholders})",
+                records,
+            )
+
+    @staticmethod
+    def _file_stamp(csv_path):
+        stat = Path(csv_path).stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def csv_changed(self, csv_path):
+        """CSV pichhle import/export ke baad bahar se badli gayi hai ya nahi."""
+        csv_path = Path(csv_path)
+        if not csv_path.exists():
+            return False
+        return self.get_meta("csv_stamp") != self._file_stamp(csv_path)
+
+    def import_csv(self, csv_path, normalize=None):
+        """`TASK_FIELDNAMES` wali CSV se tasks load karta hai; `normalize(row, index)` legacy rows theek kar sakta hai."""
+        with open(csv_path, "r", encoding="utf-8", newline="") as file:
+            raw_rows = list(csv.DictReader(file))
+        rows = [normalize(raw, index) if normalize else raw for index, raw in enumerate(raw_rows, start=1)]
+        self.replace_all(rows)
+        self.set_meta("csv_stamp", self._file_stamp(csv_path))
+        return len(rows)
+
+    def export_csv(self, csv_path):
+        csv_path = Path(csv_path)
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = csv_path.with_name(f"{csv_path.name}.{os.getpid()}.tmp")
+        rows = self.rows()
+        with open(tmp_path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=TASK_FIELDNAMES, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, csv_path)
+        self.set_meta("csv_stamp", self._file_stamp(csv_path))
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ChatGPT automation ka SQLite task store (todo.csv ke saath sync).")
+    parser.add_argument("database", help="Task store ki SQLite file (jaise .Alien/C0101/ToDo/todo.sqlite3).")
+    parser.add_argument("action", choices=["status", "import", "export"])
+    parser.add_argument("csv", nargs="?", help="import/export ke liye CSV file.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    store = TaskStore(args.database)
+    try:
+        if args.action == "status":
+            print(json.dumps({
+                "tasks": len(store),
+                "by_status": store.status_counts(),
+                "downloads": len(store.downloads()),
+            }, indent=2))
+        elif not args.csv:
+            print("CSV path required for import/export", file=sys.stderr)
+            return 2
+        elif args.action == "import":
+            print(f"Imported {store.import_csv(args.csv)} tasks")
+        else:
+            print(f"Exported {store.export_csv(args.csv)} tasks")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+_GRAY_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)  # BGRA order
+
+
+def _gray(pixels):
+    return pixels[..., :3].astype(np.float32) @ _GRAY_WEIGHTS
+
+
+def _block_mean(gray, factor):
+    if factor <= 1:
+        return gray
+    height = gray.shape[0] // factor * factor
+    width = gray.shape[1] // factor * factor
+    trimmed = gray[:height, :width]
+    return trimmed.reshape(height // factor, factor, width // factor, factor).mean(axis=(1, 3))
+
+
+def _resize(gray, scale):
+    if scale == 1.0:
+        return gray
+    from PIL import Image
+
+    height = max(4, round(gray.shape[0] * scale))
+    width = max(4, round(gray.shape[1] * scale))
+    return np.asarray(Image.fromarray(gray).resize((width, height), Image.BILINEAR), dtype=np.float32)
+
+
+def _fast_length(size):
+    """FFT ke liye `size` se bada ya barabar sabse chhota 2/3/5-smooth number."""
+    best = 1 << (size - 1).bit_length()
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            candidate = power35
+            while candidate < size:
+                candidate *= 2
+            best = min(best, candidate)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def match_template(image, template, cache=None):
+    """FFT cross-correlation + integral images se poore image par normalized cross-correlation nikalta hai.
+
+    Result ka shape (H - h + 1, W - w + 1) hota hai; har value template ke top-left ke us position par NCC (-1..1) hai.
+    Ek hi image par kai templates/scales match karne ho to same `cache` dict pass karein.
+    """
+    cache = {} if cache is None else cache
+    image = cache.setdefault("image", np.asarray(image, dtype=np.float64))
+    template = np.asarray(template, dtype=np.float64)
+    ih, iw = image.shape
+    th, tw = template.shape
+    if th > ih or tw > iw:
+        return None
+
+    centered = template - template.mean()
+    template_norm = np.sqrt((centered ** 2).sum())
+    if template_norm == 0:
+        return None
+
+    shape = (_fast_length(ih + th - 1), _fast_length(iw + tw - 1))
+    image_spectrum = cache.get(shape)
+    if image_spectrum is None:
+        image_spectrum = cache[shape] = np.fft.rfft2(image, shape)
+    spectrum = image_spectrum * np.fft.rfft2(centered[::-1, ::-1], shape)
+    correlation = np.fft.irfft2(spectrum, shape)[th - 1:ih, tw - 1:iw]
+
+    if "integral" not in cache:
+        cache["integral"] = np.pad(image.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+        cache["integral_sq"] = np.pad((image ** 2).cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+
+    def window_sum(table):
+        return table[th:, tw:] - table[:-th, tw:] - table[th:, :-tw] + table[:-th, :-tw]
+
+    count = th * tw
+    sums = window_sum(cache["integral"])
+    variance = np.maximum(window_sum(cache["integral_sq"]) - sums ** 2 / count, 0.0)
+    denominator = np.sqrt(variance) * template_norm
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(denominator > 1e-6, correlation / denominator, 0.0)
+    return scores
+
+
+class TemplateIndex:
+    """Successful clicks ke aas-paas ka chhota image patch command ke naam se yaad rakhta hai.
+
+    Agli baar wahi command aaye to naya frame NumPy NCC se search hota hai: pehle purani jagah ke aas-paas
+    full resolution par, phir poore frame me coarse multi-scale search + local refine. Confidence
+    `threshold` se kam ho to miss maana jata hai aur remote model call hota hai.
+    """
+
+    def __init__(
+        self,
+        directory=None,
+        patch_size=64,
+        threshold=0.9,
+        scales=(1.0,),
+        coarse_factor=4,
+        search_margin=2,
+        min_contrast=6.0,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.patch_size = int(patch_size)
+        self.threshold = threshold
+        self.scales = tuple(scales) or (1.0,)
+        self.coarse_factor = max(1, int(coarse_factor))
+        self.search_margin = search_margin
+        self.min_contrast = min_contrast
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "rejected": 0}
+        self.last_stats = {}
+        self._entries = {}
+
+        if self.directory is not None:
+            self._load()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def remember(self, key, screenshot, x, y, monitor_index=None):
+        """`x`/`y` (monitor-relative pixels) ke aas-paas ka patch `key` ke naam se store karta hai."""
+        width, height = screenshot.size
+        pixels = np.frombuffer(screenshot.bgra, dtype=np.uint8).reshape(height, width, 4)
+        half = self.patch_size // 2
+        x, y = int(round(x)), int(round(y))
+        left, top = max(0, x - half), max(0, y - half)
+        right, bottom = min(width, x + half), min(height, y + half)
+        if right - left < 8 or bottom - top < 8:
+            self.stats["rejected"] += 1
+            return False
+
+        patch = _gray(pixels[top:bottom, left:right])
+        if patch.std() < self.min_contrast:
+            # Plain background ka patch kahin bhi match ho jayega.
+            self.stats["rejected"] += 1
+            return False
+
+        self._entries[key] = {
+            "patch": patch,
+            "offset": (x - left, y - top),
+            "last": (left, top),
+            "monitor": monitor_index,
+        }
+        self.stats["stored"] += 1
+        if self.directory is not None:
+            self._save(key)
+        return True
+
+    def forget(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None and self.directory is not None:
+            (self.directory / f"{self._file_id(key)}.npy").unlink(missing_ok=True)
+            self._write_index()
+
+    def _best(self, image, template, cache=None):
+        scores = match_template(image, template, cache)
+        if scores is None or scores.size == 0:
+            return None
+        flat = int(np.argmax(scores))
+        row, col = divmod(flat, scores.shape[1])
+        return float(scores[row, col]), col, row
+
+    def _search_window(self, pixels, template, left, top, margin):
+        height, width = pixels.shape[:2]
+        th, tw = template.shape
+        x0, y0 = max(0, left - margin), max(0, top - margin)
+        x1, y1 = min(width, left + tw + margin), min(height, top + th + margin)
+        found = self._best(_gray(pixels[y0:y1, x0:x1]), template)
+        if found is None:
+            return None
+        score, col, row = found
+        return score, x0 + col, y0 + row
+
+    def locate(self, key, screenshot, monitor_index=None):
+        """Naye frame me `key` ka patch dhoondhta hai; mile to monitor-relative x/y aur confidence deta hai."""
+        start = time.perf_counter()
+        self.last_stats = {"searched": False}
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        width, height = screenshot.size
+        pixels = np.frombuffer(screenshot.bgra, dtype=np.uint8).reshape(height, width, 4)
+        best = None
+
+        if entry["monitor"] == monitor_index:
+            for scale in self.scales:
+                template = _resize(entry["patch"], scale)
+                margin = int(self.search_margin * max(template.shape))
+                found = self._search_window(pixels, template, *entry["last"], margin)
+                if found is not None and (best is None or found[0] > best[0]):
+                    best = (*found, scale, "local")
+                if best is not None and best[0] >= self.threshold:
+                    break
+            if best is not None and best[0] < self.threshold:
+                best = None
+
+        if best is None:
+            stride = max(1, self.coarse_factor // 2)
+            block = max(1, self.coarse_factor // stride)
+            factor = stride * block
+            coarse = _block_mean(_gray(pixels[::stride, ::stride]), block)
+            coarse_cache = {}
+            for scale in self.scales:
+                if best is not None and best[0] >= self.threshold:
+                    break
+                template = _resize(entry["patch"], scale)
+                small = _resize(template, 1.0 / factor)
+                found = self._best(coarse, small, coarse_cache)
+                if found is None:
+                    continue
+                _, col, row = found
+                refined = self._search_window(pixels, template, col * factor, row * factor, factor * 2)
+                if refined is not None and (best is None or refined[0] > best[0]):
+                    best = (*refined, scale, "global")
+
+        self.last_stats = {"searched": True, "match_ms": round((time.perf_counter() - start) * 1000, 3)}
+        if best is None or best[0] < self.threshold:
+            self.stats["misses"] += 1
+            self.last_stats["confidence"] = round(best[0], 4) if best else None
+            return None
+
+        score, left, top, scale, search = best
+        entry["last"] = (left, top)
+        entry["monitor"] = monitor_index
+        offset_x, offset_y = entry["offset"]
+        self.stats["hits"] += 1
+        self.last_stats.update({"confidence": round(score, 4), "scale": scale, "search": search})
+        return {
+            "x": left + round(offset_x * scale),
+            "y": top + round(offset_y * scale),
+            "confidence": round(score, 4),
+            # "scale" FrameGeometry ka audit dict hai (`map_result`); template ka patch scale alag key me.
+            "template_scale": scale,
+            "source": "template",
+        }
+
+    @staticmethod
+    def _file_id(key):
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _write_index(self):
+        index = {
+            key: {
+                "file": f"{self._file_id(key)}.npy",
+                "offset": entry["offset"],
+                "last": entry["last"],
+                "monitor": entry["monitor"],
+            }
+            for key, entry in self._entries.items()
+        }
+        with open(self.directory / "index.json", "w", encoding="utf-8") as file:
+            json.dump(index, file, indent=2)
+
+    def _save(self, key):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            np.save(self.directory / f"{self._file_id(key)}.npy", self._entries[key]["patch"])
+            self._write_index()
+        except Exception as e:
+            print(f"An error when saving template index {e}")
+
+    def _load(self):
+        index_path = self.directory / "index.json"
+        if not index_path.exists():
+            return
+        try:
+            with open(index_path, "r", encoding="utf-8") as file:
+                index = json.load(file)
+            for key, meta in index.items():
+                self._entries[key] = {
+                    "patch": np.load(self.directory / meta["file"]),
+                    "offset": tuple(meta["offset"]),
+                    "last": tuple(meta["last"]),
+                    "monitor": meta.get("monitor"),
+                }
+        except Exception as e:
+            print(f"An error when loading template index {e}")
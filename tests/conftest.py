@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import config  # noqa: E402
+
+# Tests `.Alien/Config/Agent.py` ke bina chalte hain; sirf `_DEFAULTS` use hote hain.
+config.configure(allow_missing=True)
+
+
+@pytest.fixture
+def fake_pyautogui(monkeypatch):
+    """`sys.modules` me stub pyautogui jo har call record karta hai (asli mouse/keyboard nahi chalta)."""
+    import types
+
+    calls = []
+    module = types.ModuleType("pyautogui")
+    module.PAUSE = 0.1
+
+    def recorder(name):
+        def call(*args, **kwargs):
+            calls.append((name, args, kwargs))
+        return call
+
+    for name in ("click", "doubleClick", "write", "press", "hotkey", "scroll", "dragTo", "moveTo"):
+        setattr(module, name, recorder(name))
+    module.position = lambda: (5, 7)
+    module.calls = calls
+    monkeypatch.setitem(sys.modules, "pyautogui", module)
+    return module
+
+
+class FakeScreenshot:
+    """mss screenshot jaisa object (`size`, `bgra`) NumPy BGRA array se."""
+
+    def __init__(self, pixels):
+        self.pixels = pixels
+        self.size = (pixels.shape[1], pixels.shape[0])
+        self.bgra = pixels.tobytes()
+
+
+@pytest.fixture
+def make_screenshot():
+    return FakeScreenshot
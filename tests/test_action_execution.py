@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+
+from action_execution2 import ActionExecuter, build_plan
+
+
+def test_gui_imports_pyautogui_and_sets_pause(fake_pyautogui):
+    executer = ActionExecuter(dry_run=False, verify=False)
+    executer.pause = 0.0
+
+    assert executer.gui is fake_pyautogui
+    assert fake_pyautogui.PAUSE == 0.0
+    assert executer.warm_up() is fake_pyautogui
+
+
+def test_run_plan_clicks_with_real_backend(fake_pyautogui):
+    executer = ActionExecuter(dry_run=False, verify=False, retries=0, move_duration=0)
+
+    assert executer.action_execution({"x": 10, "y": 20})
+    names = [name for name, _, _ in fake_pyautogui.calls]
+    assert names == ["moveTo", "click"]
+    assert fake_pyautogui.calls[1][1] == (10, 20)
+    assert executer.last_report[0]["ok"] is True
+
+
+def test_type_step_without_point_uses_cursor(fake_pyautogui):
+    executer = ActionExecuter(dry_run=False, verify=False)
+
+    assert executer.run_plan([{"action": "type", "text": "hello", "enter": True}])
+    assert [name for name, _, _ in fake_pyautogui.calls] == ["write", "press"]
+
+
+def test_invalid_step_is_rejected_before_gui(fake_pyautogui):
+    executer = ActionExecuter(dry_run=False, verify=False)
+
+    assert not executer.run_plan([{"action": "click"}])
+    assert executer.last_report[0]["error"] == "missing numeric x/y"
+    assert fake_pyautogui.calls == []
+
+
+def test_dry_run_never_loads_pyautogui(fake_pyautogui):
+    executer = ActionExecuter(dry_run=True)
+
+    assert executer.warm_up() is None
+    assert executer.run_plan([{"action": "click", "x": 1, "y": 2}])
+    assert executer._gui is None
+
+
+def test_build_plan_copies_point_into_steps():
+    plan = build_plan({"x": 3, "y": 4, "steps": [{"action": "double_click"}, {"action": "hotkey", "keys": ["ctrl", "s"]}]})
+
+    assert plan[0] == {"action": "double_click", "x": 3, "y": 4}
+    assert "x" not in plan[1]
+
+
+class StaticRegions:
+    """`grab_region` jo hamesha same ROI deta hai; `change_after` sec baad ROI badal jata hai."""
+
+    def __init__(self, make_screenshot, change_after=None):
+        self.make_screenshot = make_screenshot
+        self.changed_at = None if change_after is None else time.perf_counter() + change_after
+
+    def grab_region(self, left, top, width, height):
+        value = 255 if self.changed_at is not None and time.perf_counter() >= self.changed_at else 0
+        return self.make_screenshot(np.full((height, width, 4), value, dtype=np.uint8))
+
+
+def test_only_single_click_is_retried(fake_pyautogui, make_screenshot):
+    executer = ActionExecuter(
+        screen_capture=StaticRegions(make_screenshot), move_duration=0, verify=True, verify_timeout=0,
+        launch_timeout=0, retries=2, dry_run=False,
+    )
+
+    for action, gui_name, attempts in (("click", "click", 3), ("double_click", "doubleClick", 1), ("scroll", "scroll", 1)):
+        fake_pyautogui.calls.clear()
+        assert not executer.run_plan([{"action": action, "x": 10, "y": 20}])
+        assert [name for name, _, _ in fake_pyautogui.calls].count(gui_name) == attempts
+        assert executer.last_report[0]["attempts"] == attempts
+
+
+def test_double_click_waits_for_slow_launch(fake_pyautogui, make_screenshot):
+    executer = ActionExecuter(
+        screen_capture=StaticRegions(make_screenshot, change_after=0.05), move_duration=0, verify=True,
+        verify_timeout=0, launch_timeout=2.0, dry_run=False,
+    )
+
+    assert executer.run_plan([{"action": "double_click", "x": 10, "y": 20}])
+    assert executer.last_report[0]["verified"] is True
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+from autonomous_loop import AutonomousLoop
+
+
+class FakeScreenCapture:
+    def grab(self):
+        print("grab diagnostics")
+
+    def close(self):
+        pass
+
+
+class FakeVision:
+    client = None
+
+
+class FakeActions:
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.targets = []
+        self.last_report = []
+
+    def warm_up(self):
+        pass
+
+    def action_execution(self, element):
+        self.targets.append(element)
+        return self.results.pop(0) if self.results else True
+
+
+@pytest.fixture
+def loop():
+    loop = AutonomousLoop(screen_capture=FakeScreenCapture(), vision_analizer=FakeVision(), action_execution=FakeActions())
+    yield loop
+    loop.close()
+
+
+def test_batch_keeps_stdout_for_jsonl(loop, tmp_path, monkeypatch, capsys):
+    commands = tmp_path / "commands.txt"
+    commands.write_text("Chrome icon pe click karo\nTo Do open karo\nexit\nNotepad open karo\n", encoding="utf-8")
+
+    def run_command(item):
+        print(f"Vision retry 1/3 for {item['command']}")
+        return {"command": item["command"], "ok": True, "elapsed_ms": 1.0}
+
+    monkeypatch.setattr(loop, "run_command", run_command)
+    stats = loop.run_batch(str(commands))
+
+    captured = capsys.readouterr()
+    results = [json.loads(line) for line in captured.out.splitlines()]
+    assert [result["command"] for result in results] == ["Chrome icon pe click karo", "To Do open karo"]
+    assert "Vision retry" in captured.err and "grab diagnostics" in captured.err
+    assert "[batch]" in captured.err
+    assert stats["commands"] == 2
+
+
+def test_failed_template_target_is_forgotten_and_resolved_remotely(loop, monkeypatch, make_screenshot):
+    pixels = np.random.default_rng(3).integers(0, 255, (200, 300, 4), dtype=np.uint8)
+    assert loop.template_index.remember("chrome icon pe click karo", make_screenshot(pixels), 100, 80, 1)
+    loop.action_execution = FakeActions(results=[False, True])
+    monkeypatch.setattr(loop, "locate_target", lambda command: {"x": 40, "y": 50, "source": "vision"})
+
+    stale = {"x": 100, "y": 80, "source": "template", "confidence": 0.95, "action": "double_click"}
+    assert loop.execute_target(stale, "Chrome icon pe click karo")
+
+    assert "chrome icon pe click karo" not in loop.template_index
+    assert loop.action_execution.targets[1] == {"x": 40, "y": 50, "source": "vision", "action": "double_click"}
+    assert loop.last_metrics["template_forgotten"]["x"] == 100
+
+
+def test_failed_remote_target_is_not_retried(loop, monkeypatch):
+    loop.action_execution = FakeActions(results=[False])
+    monkeypatch.setattr(loop, "locate_target", lambda command: pytest.fail("should not re-locate"))
+
+    assert not loop.execute_target({"x": 1, "y": 2, "source": "vision"}, "To Do open karo")
+    assert len(loop.action_execution.targets) == 1
@@ -0,0 +1,81 @@
+import hashlib
+import sys
+import threading
+import time
+
+import pytest
+
+from download_manager import DownloadManager, safe_name
+
+
+def _finish_download(directory, name, delay=0.1):
+    """Chrome jaisa: pehle `.crdownload` likho, phir rename karo."""
+
+    def run():
+        time.sleep(delay)
+        partial = directory / f"{name}.crdownload"
+        partial.write_bytes(b"<html></html>")
+        time.sleep(delay)
+        partial.rename(directory / name)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_safe_name():
+    assert safe_name('About: "Team"/Jobs?') == "About_ _Team_Jobs_"
+    assert safe_name(" .. ") == "page"
+    assert len(safe_name("x" * 500)) == 120
+
+
+@pytest.mark.parametrize("use_inotify", [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")),
+])
+def test_wait_for_download_returns_completed_file(tmp_path, use_inotify):
+    manager = DownloadManager(tmp_path / "downloads", tmp_path / "pages", poll_interval=0.02, use_inotify=use_inotify)
+    (manager.download_dir / "old.html").write_text("old")
+    before = manager.snapshot()
+
+    thread = _finish_download(manager.download_dir, "about.html")
+    path = manager.wait_for_download(before, timeout=5, start_timeout=5)
+    thread.join()
+
+    assert path == manager.download_dir / "about.html"
+    assert manager.last_wait["status"] == "complete"
+    assert manager.last_wait["file"] == "about.html"
+    assert manager.last_wait["start_ms"] <= manager.last_wait["wait_ms"]
+    if not use_inotify:
+        assert manager.last_wait["method"] == "polling"
+
+
+def test_wait_for_download_not_started_and_timeout(tmp_path):
+    manager = DownloadManager(tmp_path / "downloads", tmp_path / "pages", poll_interval=0.01, use_inotify=False)
+    before = manager.snapshot()
+
+    assert manager.wait_for_download(before, timeout=1, start_timeout=0.05) is None
+    assert manager.last_wait["status"] == "not_started"
+
+    (manager.download_dir / "about.html.crdownload").write_text("partial")
+    assert manager.wait_for_download(before, timeout=0.05, start_timeout=0.05) is None
+    assert manager.last_wait["status"] == "timeout"
+    assert manager.last_wait["partial"] == ["about.html.crdownload"]
+
+
+def test_store_moves_file_with_suffix_and_hash(tmp_path):
+    manager = DownloadManager(tmp_path / "downloads", tmp_path / "pages")
+    records = []
+    for content in (b"first", b"second"):
+        source = manager.download_dir / "about.html"
+        source.write_bytes(content)
+        records.append(manager.store(source, "About/Us", step="code"))
+
+    assert [record["file_name"] for record in records] == ["about.html", "about_1.html"]
+    assert records[1]["path"] == str(tmp_path / "pages" / "About_Us" / "about_1.html")
+    assert records[1]["size"] == 6
+    assert records[1]["sha256"] == hashlib.sha256(b"second").hexdigest()
+    assert records[0]["step"] == "code"
+
+    manager.cleanup()
+    assert not manager.download_dir.exists()
@@ -0,0 +1,50 @@
+import pytest
+
+from element_map import ElementMap
+
+
+def _element(label, left, top, width=40, height=40, confidence=0.9):
+    return {"label": label, "role": "button", "left": left, "top": top, "width": width, "height": height,
+            "confidence": confidence}
+
+
+@pytest.fixture
+def screen():
+    return ElementMap([
+        _element("Open", 10, 10, width=80, height=30),
+        _element("Google Chrome", 100, 700),
+        _element("To Do", 160, 700),
+        _element("Chrome Settings", 220, 700),
+    ])
+
+
+@pytest.mark.parametrize("command, label", [
+    ("Chrome icon pe click karo", "Google Chrome"),
+    ("To Do open karo", "To Do"),
+    ("Chrome settings kholo", "Chrome Settings"),
+])
+def test_readme_commands_resolve_to_named_element(screen, command, label):
+    match = screen.find(command)
+
+    assert match["label"] == label
+    assert match["matched_by"] == "label"
+
+
+@pytest.mark.parametrize("command", ["Notepad open karo", "open karo", "Open button pe click karo"])
+def test_verbs_alone_never_match(screen, command):
+    assert screen.find(command) is None
+
+
+def test_score_is_symmetric(screen):
+    assert screen.find("Chrome icon pe click karo")["score"] == 0.5
+    assert screen.find("Google Chrome open karo")["score"] == 1.0
+    assert screen.find("Google Chrome", min_score=0.6)["label"] == "Google Chrome"
+    assert screen.find("Chrome", min_score=0.6) is None
+
+
+def test_alias_and_element_at(screen):
+    element = screen.element_at(120, 720)
+    assert element["label"] == "Google Chrome"
+
+    screen.add_alias("browser kholo", element["id"])
+    assert screen.find("Browser  kholo!")["matched_by"] == "alias"
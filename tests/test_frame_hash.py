@@ -0,0 +1,50 @@
+import numpy as np
+
+from frame_hash import FrameHasher
+
+
+def _frame(value=40, height=64, width=96):
+    pixels = np.full((height, width, 4), value, dtype=np.uint8)
+    pixels[..., 3] = 255
+    return pixels
+
+
+def test_identical_frames_are_unchanged(make_screenshot):
+    hasher = FrameHasher(block_size=16, stride=2)
+    first = hasher.compute(make_screenshot(_frame()))
+    second = hasher.compute(make_screenshot(_frame()))
+
+    assert first.digest == second.digest
+    result = hasher.compare(first, second)
+    assert result["unchanged"] and result["region"] is None
+
+
+def test_changed_block_reports_region(make_screenshot):
+    hasher = FrameHasher(block_size=16, stride=2)
+    pixels = _frame()
+    before = hasher.compute(make_screenshot(pixels.copy()))
+    pixels[20:28, 36:46, :3] = 250
+    after = hasher.compute(make_screenshot(pixels))
+
+    result = hasher.compare(before, after)
+    assert not result["unchanged"]
+    assert result["changed_blocks"] == 1
+    assert result["region"] == {"left": 32, "top": 16, "width": 16, "height": 16}
+
+
+def test_small_noise_stays_within_tolerance(make_screenshot):
+    hasher = FrameHasher(block_size=16, stride=2, tolerance=6)
+    pixels = _frame()
+    before = hasher.compute(make_screenshot(pixels.copy()))
+    pixels[0, 0, :3] += 3
+
+    assert hasher.compare(before, hasher.compute(make_screenshot(pixels)))["unchanged"]
+
+
+def test_shape_mismatch_counts_as_full_change(make_screenshot):
+    hasher = FrameHasher(block_size=16)
+    small = hasher.compute(make_screenshot(_frame(height=32)))
+    large = hasher.compute(make_screenshot(_frame()))
+
+    assert hasher.compare(small, large)["changed_fraction"] == 1.0
+    assert hasher.compare(None, large)["unchanged"] is False
@@ -0,0 +1,47 @@
+import os
+import time
+
+from frame_store import FrameStore
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_old_files_are_pruned_on_start(tmp_path):
+    old = tmp_path / "screenshot_1.png"
+    old.write_bytes(b"old")
+    os.utime(old, (time.time() - 3600, time.time() - 3600))
+
+    store = FrameStore(tmp_path, persist=True, max_age=60)
+    try:
+        assert not old.exists()
+        assert store.stats["evicted"] == 1
+    finally:
+        store.close()
+
+
+def test_idle_writer_expires_frames_by_age(tmp_path):
+    store = FrameStore(tmp_path, persist=True, max_age=0.1)
+    try:
+        store.add(b"frame")
+        assert _wait_until(lambda: store.stats["written"] == 1)
+        # Koi naya frame nahi aata; timer wala writer phir bhi file hata deta hai.
+        assert _wait_until(lambda: not list(tmp_path.glob("screenshot_*")))
+        assert store.stats["evicted"] == 1
+    finally:
+        store.close()
+
+
+def test_close_prunes_and_dedup_and_ring(tmp_path):
+    store = FrameStore(tmp_path, persist=True, max_files=1, ring_size=2)
+    for data in (b"a", b"a", b"b", b"c"):
+        store.add(data)
+    store.close()
+
+    assert [frame["data"] for frame in store.recent_frames()] == [b"b", b"c"]
+    assert store.stats["deduplicated"] == 1
+    assert [path.read_bytes() for path in tmp_path.glob("screenshot_*")] == [b"c"]
@@ -0,0 +1,120 @@
+import base64
+import io
+
+from PIL import Image
+
+import rate_limiter
+from rate_limiter import (
+    DEFAULT_IMAGE_TOKENS,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    RateLimiter,
+    TokenBucket,
+    estimate_image_tokens,
+    estimate_request_tokens,
+    image_size,
+)
+
+
+def _encoded(size, fmt):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (10, 20, 30)).save(buffer, format=fmt)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def test_image_size_reads_png_and_jpeg_headers():
+    assert image_size(_encoded((320, 200), "PNG")) == (320, 200)
+    assert image_size(_encoded((64, 48), "JPEG")) == (64, 48)
+    assert image_size("bm90IGFuIGltYWdl") is None
+
+
+def test_estimate_image_tokens():
+    assert estimate_image_tokens(1920, 1080, "low") == 85
+    assert estimate_image_tokens(1920, 1080) == 1105
+    assert estimate_image_tokens(512, 512) == 255
+
+
+def test_estimate_request_tokens_counts_text_images_and_max_tokens():
+    body = {
+        "max_tokens": 100,
+        "messages": [
+            {"role": "system", "content": "x" * 40},
+            {"role": "user", "content": [
+                {"type": "text", "text": "y" * 8},
+                {"type": "image_url", "image_url": {"url": "data:image/png;base64," + _encoded((512, 512), "PNG")}},
+                {"type": "image_url", "image_url": {"url": "https://example.com/a.png"}},
+            ]},
+        ],
+    }
+
+    assert estimate_request_tokens(body) == 12 + 255 + DEFAULT_IMAGE_TOKENS + 100
+
+
+def test_token_bucket_refill_wait_and_clamp():
+    bucket = TokenBucket(60, period=60.0)
+    bucket.updated = 0.0
+    bucket.take(60)
+    assert bucket.wait_time(1) == 1.0
+    # Capacity se bada request bhi sirf poora bucket bharne tak rukta hai.
+    assert bucket.wait_time(500) == 60.0
+
+    bucket.refill(30.0)
+    assert bucket.level == 30.0
+    bucket.clamp(5)
+    assert bucket.level == 5.0
+
+    unlimited = TokenBucket(None)
+    unlimited.take(10**6)
+    assert unlimited.wait_time(10**6) == 0.0
+
+
+def test_queue_head_goes_by_priority_then_fifo():
+    limiter = RateLimiter("test", rpm=60)
+    background = limiter._enqueue(PRIORITY_BACKGROUND)
+    first = limiter._enqueue(PRIORITY_INTERACTIVE)
+    second = limiter._enqueue(PRIORITY_INTERACTIVE)
+
+    assert limiter._wait_time(background, 1) is None
+    assert limiter._wait_time(second, 1) is None
+    assert limiter._wait_time(first, 1) == 0.0
+
+
+def test_acquire_overruns_after_max_wait():
+    limiter = RateLimiter("test", tpm=100, headroom=1.0, max_wait=0.0)
+
+    assert limiter.acquire(100) < 1000
+    assert limiter.acquire(50) < 1000
+
+    stats = limiter.as_dict()
+    assert stats["requests"] == 2
+    assert stats["overruns"] == 1
+    assert stats["estimated_tokens"] == 150
+    assert stats["queued"] == 0
+
+
+def test_observe_clamps_remaining_and_pauses_on_429(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("rate_limiter.time.monotonic", lambda: now[0])
+    limiter = RateLimiter("test", rpm=100, tpm=1000, headroom=1.0)
+
+    limiter.observe(200, {"x-ratelimit-remaining-tokens": "10", "x-ratelimit-remaining-requests": "bad"})
+    assert limiter.tokens.level == 10.0
+    assert limiter.requests.level == 100.0
+
+    limiter.observe(429, {"retry-after-ms": "1500"})
+    assert limiter.paused_until == 101.5
+    assert limiter.stats["throttled"] == 1
+
+    # Header na ho to 1 second pause aur request bucket khali.
+    limiter.observe(503, {})
+    assert limiter.paused_until == 101.5
+    assert limiter.requests.level == 0.0
+
+
+def test_get_limiter_is_shared_per_deployment(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_LIMITERS", {})
+    first = rate_limiter.get_limiter("gpt-4o")
+
+    assert rate_limiter.get_limiter("gpt-4o") is first
+    assert rate_limiter.get_limiter("gpt-4o-mini") is not first
+    assert set(rate_limiter.limiter_stats()) == {"gpt-4o", "gpt-4o-mini"}
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from session_replay import ReplayScreenCapture
+
+MONITORS = [
+    {"left": 0, "top": 0, "width": 64, "height": 48},
+    {"left": 0, "top": 0, "width": 64, "height": 48},
+]
+
+
+@pytest.fixture
+def capture():
+    capture = ReplayScreenCapture(MONITORS)
+    capture._replay_sct.frame = np.zeros((48, 64, 4), dtype=np.uint8)
+    capture._replay_sct.origin = (0, 0)
+    yield capture
+    capture.close()
+
+
+def test_speculative_encodes_are_not_stored(capture):
+    frame = capture.capture_frame(1, store=False)
+    capture.encode_payload(capture.grab())
+
+    assert frame["image"]
+    assert capture.frame_store.recent_frames() == []
+
+
+def test_store_payload_stores_submitted_frame_once(capture):
+    frame = capture.capture_frame(1, store=False)
+
+    assert capture.store_payload(frame["image"])
+    assert not capture.store_payload(frame["image"])
+    assert len(capture.frame_store.recent_frames()) == 1
+
+
+def test_encode_frame_stores_immediately(capture):
+    img = capture.encode_frame(capture.grab())
+
+    assert len(capture.frame_store.recent_frames()) == 1
+    assert not capture.store_payload(img)
@@ -0,0 +1,112 @@
+import sqlite3
+
+import pytest
+
+from task_store import RETRY_COLUMNS, TASK_FIELDNAMES, TaskStore
+
+
+def _task(task_id, page, status="0"):
+    row = {column: "0" for column in TASK_FIELDNAMES}
+    row.update(id=task_id, page_name=page, complete_status=status, url="")
+    return row
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TaskStore(tmp_path / "todo.sqlite3")
+    store.replace_all([_task("1", "Home", "1"), _task("2", "About"), _task("3", "Contact")])
+    yield store
+    store.close()
+
+
+def test_next_pending_follows_csv_order(store):
+    assert store.next_pending()["page_name"] == "About"
+    store.update(2, complete_status="1", url="https://chatgpt.com/c/abc")
+
+    assert store.next_pending()["page_name"] == "Contact"
+    assert store.get(2)["url"] == "https://chatgpt.com/c/abc"
+    assert store.status_counts() == {"0": 1, "1": 2}
+
+
+def test_update_rejects_unknown_columns(store):
+    with pytest.raises(KeyError):
+        store.update(1, color="red")
+
+
+def test_failed_tasks_retry_after_backoff_until_attempts_run_out(store):
+    store.update(3, complete_status="1")
+    store.record_failure(2, "download missing", retry_delay=60)
+    failed = store.get(2)
+    assert failed["attempts"] == 1
+    assert failed["last_error"] == "download missing"
+
+    assert store.next_pending() is None
+    assert store.next_pending(max_attempts=3, now=failed["next_attempt_at"] - 1) is None
+    assert store.next_pending(max_attempts=3, now=failed["next_attempt_at"])["seq"] == 2
+    assert store.next_retry_at(3) == failed["next_attempt_at"]
+
+    store.record_failure(2, retry_delay=0)
+    assert store.next_pending(max_attempts=2) is None
+    assert store.next_retry_at(2) is None
+
+
+def test_old_database_gets_retry_columns(tmp_path):
+    path = tmp_path / "old.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE tasks (seq INTEGER PRIMARY KEY, id TEXT NOT NULL, complete_status TEXT NOT NULL)")
+    conn.execute("INSERT INTO tasks (id, complete_status) VALUES ('1', '2')")
+    conn.commit()
+    conn.close()
+
+    store = TaskStore(path)
+    try:
+        row = store.get(1)
+        assert {column: row[column] for column in RETRY_COLUMNS} == {
+            "attempts": 0,
+            "next_attempt_at": 0,
+            "last_error": "",
+        }
+        assert store.next_pending(max_attempts=1, now=0)["seq"] == 1
+    finally:
+        store.close()
+
+
+def test_csv_round_trip_and_change_detection(store, tmp_path):
+    csv_path = tmp_path / "todo.csv"
+    assert store.export_csv(csv_path) == 3
+    assert not store.csv_changed(csv_path)
+    assert not list(tmp_path.glob("*.tmp"))
+
+    lines = csv_path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ",".join(TASK_FIELDNAMES)
+    csv_path.write_text("\n".join(lines + ["4,Blog,0,0,0,0,0,0,"]) + "\n", encoding="utf-8")
+    assert store.csv_changed(csv_path)
+
+    def normalize(row, index):
+        return dict(row, page_name=row["page_name"].upper())
+
+    assert store.import_csv(csv_path, normalize) == 4
+    assert [row["page_name"] for row in store.rows()] == ["HOME", "ABOUT", "CONTACT", "BLOG"]
+    assert not store.csv_changed(csv_path)
+
+
+def test_meta_and_downloads(store):
+    assert store.get_meta("missing", {}) == {}
+    store.set_meta("run", {"pages": 2})
+    store.set_meta("run", {"pages": 3})
+    assert store.get_meta("run") == {"pages": 3}
+
+    record = {
+        "step": "code",
+        "file_name": "about.html",
+        "path": "/tmp/About/about.html",
+        "size": 12,
+        "sha256": "ab" * 32,
+        "downloaded_at": "2024-01-01T00:00:00",
+    }
+    store.record_download(2, record)
+    store.record_download(3, dict(record, step="docs"))
+
+    assert [row["step"] for row in store.downloads()] == ["code", "docs"]
+    assert store.downloads(2)[0]["file_name"] == "about.html"
+    assert store.downloads(1) == []
@@ -0,0 +1,69 @@
+import numpy as np
+
+from template_index import TemplateIndex, _fast_length, match_template
+
+
+def _scene(offset=(0, 0), size=(120, 160)):
+    rng = np.random.default_rng(7)
+    pixels = np.zeros((*size, 4), dtype=np.uint8)
+    pixels[..., 3] = 255
+    patch = rng.integers(0, 255, size=(24, 24, 3), dtype=np.uint8)
+    top, left = 40 + offset[1], 60 + offset[0]
+    pixels[top:top + 24, left:left + 24, :3] = patch
+    return pixels
+
+
+def test_fast_length_is_smooth_and_large_enough():
+    for size in (1, 7, 97, 1000, 1921):
+        length = _fast_length(size)
+        assert length >= size
+        remaining = length
+        for prime in (2, 3, 5):
+            while remaining % prime == 0:
+                remaining //= prime
+        assert remaining == 1
+
+
+def test_match_template_finds_exact_position():
+    rng = np.random.default_rng(1)
+    image = rng.random((50, 70))
+    template = image[10:20, 30:45]
+
+    scores = match_template(image, template)
+    row, col = np.unravel_index(np.argmax(scores), scores.shape)
+    assert (row, col) == (10, 30)
+    assert scores[row, col] > 0.999
+
+
+def test_match_template_rejects_flat_or_oversized_template():
+    image = np.ones((10, 10))
+    assert match_template(image, np.ones((3, 3))) is None
+    assert match_template(image, np.ones((11, 3))) is None
+
+
+def test_remember_and_locate_after_move(make_screenshot):
+    index = TemplateIndex(patch_size=24, threshold=0.9)
+    assert index.remember("open file", make_screenshot(_scene()), 72, 52, monitor_index=1)
+
+    moved = index.locate("open file", make_screenshot(_scene(offset=(30, 20))), monitor_index=1)
+    assert moved is not None
+    assert (moved["x"], moved["y"]) == (102, 72)
+    assert moved["source"] == "template"
+    assert moved["template_scale"] == 1.0 and "scale" not in moved
+
+
+def test_plain_patch_is_rejected(make_screenshot):
+    index = TemplateIndex(patch_size=24)
+    flat = np.zeros((60, 60, 4), dtype=np.uint8)
+
+    assert not index.remember("blank", make_screenshot(flat), 30, 30)
+    assert "blank" not in index
+    assert index.stats["rejected"] == 1
+
+
+def test_persisted_index_reloads(tmp_path, make_screenshot):
+    TemplateIndex(directory=tmp_path, patch_size=24).remember("save", make_screenshot(_scene()), 72, 52, 1)
+
+    reloaded = TemplateIndex(directory=tmp_path, patch_size=24)
+    assert "save" in reloaded
+    assert reloaded.locate("save", make_screenshot(_scene()), 1)["x"] == 72
@@ -0,0 +1,86 @@
+import asyncio
+import types
+
+from vision_analyzer2 import AsyncVisionAnalzer
+
+
+def _chunk(text, usage=None):
+    delta = types.SimpleNamespace(content=text)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=usage)
+
+
+class FakeStream:
+    def __init__(self, chunks, stall=None):
+        self.chunks = list(chunks)
+        self.stall = stall
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.chunks:
+            if self.stall:
+                await asyncio.sleep(self.stall)
+            raise StopAsyncIteration
+        return self.chunks.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    """`chat.completions.create(stream=True)` jo deployment ke hisab se tayyar stream lautata hai."""
+
+    def __init__(self, streams):
+        self.streams = streams
+        self.chat = types.SimpleNamespace(completions=self)
+
+    async def create(self, model, **kwargs):
+        return self.streams[model]
+
+
+def _analyzer(streams, **kwargs):
+    analyzer = AsyncVisionAnalzer(deadline=5, **kwargs)
+    analyzer.deployment = "primary"
+    analyzer.stream = True
+    analyzer._client = FakeClient(streams)
+    return analyzer
+
+
+def test_hedge_winner_stats_are_adopted():
+    usage = types.SimpleNamespace(prompt_tokens=999, completion_tokens=1, total_tokens=1000)
+    streams = {
+        "primary": FakeStream([_chunk('{"x": 1,', usage)], stall=5),
+        "hedge": FakeStream([_chunk('{"x": 3, "y": 4}')]),
+    }
+    analyzer = _analyzer(streams, hedge_deployment="hedge", hedge_after=0.02)
+    analyzer.drain_timeout = 0
+
+    result = asyncio.run(analyzer.analyze_screen("aW1hZ2U=", "Chrome"))
+
+    assert result == {"x": 3, "y": 4}
+    assert analyzer.last_stats["hedged"] is True
+    assert analyzer.last_stats["deployment"] == "hedge"
+    assert "prompt_tokens" not in analyzer.last_stats
+    assert analyzer.last_response == '{"x": 3, "y": 4}'
+
+
+def test_early_exit_drain_task_is_held_until_done():
+    stream = FakeStream([_chunk('{"x": 5, "y": 6}'), _chunk(" rest"), _chunk(" of answer")])
+    analyzer = _analyzer({"primary": stream})
+    analyzer.drain_timeout = 1.0
+
+    async def run():
+        result = await analyzer.analyze_screen("aW1hZ2U=", "Chrome")
+        pending = len(analyzer._drains)
+        await asyncio.sleep(0.05)
+        return result, pending
+
+    result, pending = asyncio.run(run())
+
+    assert result == {"x": 5, "y": 6}
+    assert analyzer.last_stats["early_exit"] is True
+    assert pending == 1
+    assert analyzer._drains == set()
+    assert stream.closed and stream.chunks == []
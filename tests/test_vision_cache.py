@@ -0,0 +1,71 @@
+import threading
+import time
+
+from vision_cache import VisionCache
+
+
+def test_lru_eviction_and_stats():
+    cache = VisionCache(max_entries=2, ttl=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("vision_cache.time.time", lambda: now[0])
+    cache = VisionCache(ttl=10)
+    cache.put("k", {"x": 1})
+
+    now[0] += 9
+    assert cache.get("k") == {"x": 1}
+    now[0] += 2
+    assert cache.get("k") is None
+    assert cache.stats["expired"] == 1
+
+
+def test_none_results_are_not_cached():
+    cache = VisionCache()
+    cache.put("k", None)
+
+    assert len(cache) == 0
+    assert cache.get_or_compute("k", lambda: None) == (None, "miss")
+    assert cache.get_or_compute("k", lambda: 5) == (5, "miss")
+    assert cache.get_or_compute("k", lambda: 6) == (5, "hit")
+
+
+def test_single_flight_collapses_parallel_lookups():
+    cache = VisionCache()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return {"x": 1, "y": 2}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert len(calls) == 1
+    assert sorted(source for _, source in results) == ["miss", "shared"]
+    assert cache.stats["collapsed"] == 1
+
+
+def test_persistence_round_trip(tmp_path):
+    path = tmp_path / "cache.json"
+    VisionCache(ttl=60, path=path).put("k", {"x": 3})
+
+    assert VisionCache(ttl=60, path=path).get("k") == {"x": 3}
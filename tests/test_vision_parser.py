@@ -0,0 +1,34 @@
+from vision_parser import CoordinateStreamParser, coordinates_from_object, extract_coordinates
+
+
+def test_stream_parser_returns_first_object_with_coordinates():
+    parser = CoordinateStreamParser()
+
+    assert parser.feed('```json\n{"x": 12') is None
+    assert parser.feed(', "y": 34, "label": "ok"}\n```') == {"x": 12, "y": 34, "label": "ok"}
+    assert parser.feed('{"x": 1, "y": 2}') == {"x": 12, "y": 34, "label": "ok"}
+
+
+def test_stream_parser_ignores_braces_inside_strings_and_objects_without_point():
+    parser = CoordinateStreamParser()
+
+    assert parser.feed('{"note": "use {x} here"} ') is None
+    assert parser.feed('{"x": "5", "y": 6.5}') == {"x": 5, "y": 6.5}
+
+
+def test_stream_parser_finish_accepts_loose_text():
+    parser = CoordinateStreamParser()
+    parser.feed("x: 10, y: 20")
+
+    assert parser.finish() == {"x": 10, "y": 20}
+
+
+def test_coordinates_from_object_rejects_non_numeric_values():
+    assert coordinates_from_object('{"x": true, "y": 2}') is None
+    assert coordinates_from_object("{x:125, y:340}") == {"x": 125, "y": 340}
+
+
+def test_extract_coordinates_handles_empty_and_missing():
+    assert extract_coordinates("") is None
+    assert extract_coordinates("no target visible") is None
+    assert extract_coordinates('Target: {"X": 7, "Y": 8}') == {"X": 7, "Y": 8, "x": 7, "y": 8}
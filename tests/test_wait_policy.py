@@ -0,0 +1,76 @@
+import pytest
+
+from wait_policy import PAUSE_RANGES, WaitPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("wait_policy.time.monotonic", clock.monotonic)
+    return clock
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        WaitPolicy(profile="slow")
+
+
+def test_none_profile_never_sleeps(clock):
+    policy = WaitPolicy(profile="none", sleep=clock.sleep)
+
+    assert policy.pause("page_load") == 0.0
+    assert clock.sleeps == []
+
+
+def test_pause_uses_named_range_and_overrides(clock):
+    policy = WaitPolicy(profile="fast", ranges={"page_load": [1.0, 1.0]}, sleep=clock.sleep)
+
+    assert policy.pause("page_load") == pytest.approx(0.3)
+    assert policy.pause_range("unknown") == pytest.approx(tuple(value * 0.3 for value in PAUSE_RANGES["pause"]))
+    assert policy.pause("pause", 2.0, 2.0) == pytest.approx(0.6)
+
+
+def test_until_polls_with_injected_sleep(clock):
+    policy = WaitPolicy(sleep=clock.sleep, poll_frequency=0.5)
+    values = iter([None, 0, "ready"])
+
+    assert policy.until("editor", lambda: next(values)) == "ready"
+    assert clock.sleeps == [0.5, 0.5]
+    assert policy.current["conditions"]["editor"] == {"count": 1, "timeouts": 0, "ms": 1000.0}
+
+
+def test_until_times_out_and_swallows_errors(clock):
+    policy = WaitPolicy(sleep=clock.sleep, poll_frequency=1.0)
+
+    assert policy.until("link", lambda: 1 / 0, timeout=3.0) is None
+    assert policy.current["conditions"]["link"]["timeouts"] == 1
+    assert len(clock.sleeps) == 3
+
+
+def test_page_and_run_reports_split_conditions_and_sleeps(clock):
+    policy = WaitPolicy(ranges={"after_type": [2.0, 2.0]}, sleep=clock.sleep)
+    policy.begin_page("home")
+    policy.pause("after_type")
+    policy.record("response", 4.0)
+
+    page = policy.end_page()
+    assert page["page"] == "home"
+    assert page["sleep_ms"] == 2000.0
+    assert page["condition_ms"] == 4000.0
+    report = policy.run_report()
+    assert report["pages"] == [page]
+    assert report["condition_ms"] == 4000.0
+    assert policy.current["page"] == ""
@@ -1,6 +1,57 @@
-import pyautogui
+import json
+import re
+import sys
+
+
+def normalize_command(command):
+    """Cache/compare ke liye command ko lowercase, bina punctuation aur single-space bana deta hai."""
+    if not command:
+        return ""
+    cleaned = re.sub(r"[^\w\s]", " ", command.lower())
+    return " ".join(cleaned.split())
+
+
+def parse_command_line(line):
+    """Batch file ki ek line ko command dict banata hai: plain text ya JSONL (`{"command": ..., ...}`).
+
+    Khali lines aur `#` wale comments ke liye None.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if not line.startswith("{"):
+        return {"command": line}
+
+    item = json.loads(line)
+    if not isinstance(item, dict) or not str(item.get("command") or "").strip():
+        raise ValueError(f"JSONL command line needs a non-empty \"command\": {line!r}")
+    return item
+
+
+def iter_commands(source):
+    """File path (ya "-" par stdin) se commands ek-ek karke padhta hai; stdin ko stream karta hai, poora nahi padhta."""
+    file = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        for number, line in enumerate(file, start=1):
+            try:
+                item = parse_command_line(line)
+            except ValueError as e:
+                print(f"Skipping invalid command line {number}: {e}")
+                continue
+            if item is not None:
+                item.setdefault("line", number)
+                yield item
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
 
 class UserTextInput:
+    def show_desktop(self):
+        import pyautogui
+
+        pyautogui.hotkey("win", "d")
+
     def get_user_command(self):
         print("\n", "="*50)
         print("AI Autonomouse Agent - Command Input")
@@ -11,7 +62,7 @@ class UserTextInput:
 
         command = input("Enter your command:")
 
-        pyautogui.hotkey("win", "d")
+        self.show_desktop()
         if not command:
             return None
 
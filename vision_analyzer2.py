@@ -1,69 +1,546 @@
-from openai import AzureOpenAI
-from config import AZURE_API_KEY, AZURE_ENDPOINT, AZURE_API_VERSION, LLM_DEPLOYMENT
-import json
+import config
+import azure_clients
+import rate_limiter
+from vision_parser import CoordinateStreamParser, extract_coordinates
+from element_map import ELEMENT_MAP_RESPONSE_FORMAT, build_element_map_messages, parse_element_map
+import asyncio
+import random
+import threading
+import time
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+def build_vision_messages(base64_image, command, mime_type="image/png", geometry=None):
+    prompt = f"""Is screenshot mein {command} icon dhoondho aur uska center point ka X,Y coordinates json format me do
+        Return ONLY valid JSON.
+        Example: {{"x":125,"y":340}}
+        Sirf numbers aur comma, kuch aur mat likhna."""
+    if geometry is not None:
+        prompt += f"\n        Image size {geometry.sent_width}x{geometry.sent_height} pixels hai, coordinates isi image ke hisab se do."
+
+    return [
+        {
+            "role": "user",
+            "content": [
+                {"type":"text","text":prompt},
+                {
+                    "type":"image_url",
+                    "image_url":{
+                        "url":f"data:{mime_type};base64,{base64_image}"
+                    }
+                }
+            ]
+        }
+    ]
+
+
+def parse_vision_result(analysis_result, geometry=None):
+    """Model ke text se (```json fences/extra text ke saath bhi) x/y nikalta hai aur geometry ho to screen par map karta hai."""
+    vision_data = extract_coordinates(analysis_result)
+    if vision_data is None:
+        raise ValueError(f"No coordinates in vision response: {analysis_result!r}")
+
+    if geometry is not None:
+        vision_data = geometry.map_result(vision_data)
+
+    return vision_data
+
+
+def describe_request(deployment, messages, mime_type, base64_image, max_tokens, stream):
+    """Recording/debug ke liye request ka summary (image ke bina, sirf uska size)."""
+    return {
+        "deployment": deployment,
+        "prompt": messages[0]["content"][0]["text"],
+        "mime_type": mime_type,
+        "image_chars": len(base64_image),
+        "max_tokens": max_tokens,
+        "stream": stream,
+    }
+
+
+def _record_usage(stats, usage):
+    # Streaming me usage sirf aakhri chunk me aata hai, early exit par aksar milta hi nahi.
+    if usage is None:
+        return
+    for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = getattr(usage, field, None)
+        if value is not None:
+            stats[field] = value
+
+
+def _chunk_text(chunk):
+    # Azure pehla chunk prompt filter results ke saath bina choices ke bhejta hai.
+    if not chunk.choices:
+        return ""
+    return chunk.choices[0].delta.content or ""
+
+
+def _elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 3)
 
 
 class VisionAnalzer:
     def __init__(self):
-        self.client = AzureOpenAI(
-            api_key=AZURE_API_KEY,
-            azure_endpoint=AZURE_ENDPOINT,
-            api_version=AZURE_API_VERSION
+        self._client = None
+        self.deployment = config.LLM_DEPLOYMENT
+        self.stream = config.VISION_STREAM
+        self.max_tokens = config.VISION_MAX_TOKENS
+        self.map_max_tokens = config.ELEMENT_MAP_MAX_TOKENS
+        self.last_stats = {}
+        self.last_request = None
+        self.last_response = None
+
+    @property
+    def client(self):
+        # openai import aur client setup pehli request par hota hai, startup par nahi.
+        if self._client is None:
+            self._client = azure_clients.get_client()
+        return self._client
+
+    def warm_up(self):
+        return azure_clients.warm_up(self.client)
+
+    def _analyze_stream(self, messages, geometry):
+        """Completion stream karta hai aur pehla valid coordinate object milte hi stream band kar deta hai."""
+        start = time.perf_counter()
+        parser = CoordinateStreamParser()
+        stream = self.client.chat.completions.create(
+            model=self.deployment,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=0.1,
+            stream=True,
         )
-        self.deployment = LLM_DEPLOYMENT
+        parse_s = 0.0
+        try:
+            for chunk in stream:
+                _record_usage(self.last_stats, getattr(chunk, "usage", None))
+                text = _chunk_text(chunk)
+                if text and "first_token_ms" not in self.last_stats:
+                    self.last_stats["first_token_ms"] = _elapsed_ms(start)
+                parse_start = time.perf_counter()
+                found = parser.feed(text)
+                parse_s += time.perf_counter() - parse_start
+                if found is not None:
+                    self.last_stats["early_exit"] = True
+                    break
+        finally:
+            stream.close()
+
+        self.last_stats["parsed_ms"] = self.last_stats["request_ms"] = _elapsed_ms(start)
+        self.last_stats["parse_ms"] = round(parse_s * 1000, 3)
+        self.last_response = parser.buffer
+        print(parser.buffer)
+        if parser.finish() is None:
+            raise ValueError(f"No coordinates in vision response: {parser.buffer!r}")
+        return geometry.map_result(parser.result) if geometry is not None else parser.result
 
-    def analyze_screen(self, base64_image, command):
+    def analyze_screen(self, base64_image, command, mime_type="image/png", geometry=None):
+        """`geometry` (FrameGeometry) mile to model ke x/y ko physical screen pixels me map karke return karta hai."""
         if not base64_image:
             return None
-        
-        prompt = f"""Is screenshot mein {command} icon dhoondho aur uska center point ka X,Y coordinates json format me do
-        Return ONLY valid JSON.
-        Example: {{"x":125,"y":340}}
-        Sirf numbers aur comma, kuch aur mat likhna."""
 
+        self.last_stats = {"stream": self.stream}
+        messages = build_vision_messages(base64_image, command, mime_type, geometry)
+        self.last_request = describe_request(
+            self.deployment, messages, mime_type, base64_image, self.max_tokens, self.stream
+        )
+        self.last_response = None
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type":"text","text":prompt},
-                            {
-                                "type":"image_url",
-                                "image_url":{
-                                    "url":f"data:image/png;base64,{base64_image}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=2000,
-                temperature=0.1
-            )
+            if self.stream:
+                with rate_limiter.priority(rate_limiter.PRIORITY_INTERACTIVE):
+                    vision_data = self._analyze_stream(messages, geometry)
+                print(vision_data)
+                return vision_data
+
+            start = time.perf_counter()
+            with rate_limiter.priority(rate_limiter.PRIORITY_INTERACTIVE):
+                response = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=messages,
+                    max_tokens=self.max_tokens,
+                    temperature=0.1
+                )
+            self.last_stats["request_ms"] = _elapsed_ms(start)
+            _record_usage(self.last_stats, response.usage)
 
             analysis_result = response.choices[0].message.content
+            self.last_response = analysis_result
             print(analysis_result)
-            print(type(analysis_result))
 
-            cleaned_result = analysis_result.strip()
+            start = time.perf_counter()
+            vision_data = parse_vision_result(analysis_result, geometry)
+            self.last_stats["parse_ms"] = _elapsed_ms(start)
+            print(vision_data)
+
+            return vision_data
+        except Exception as e:
+            print(f"Error when vision analysis {e}")
+            return None
 
-            if cleaned_result.startswith("```json"):
-                cleaned_result = cleaned_result[7:]
+    def map_screen(self, base64_image, mime_type="image/png", geometry=None):
+        """Ek strict JSON schema call me screen ke saare actionable elements (label, box, confidence) deta hai."""
+        if not base64_image:
+            return None
 
-            if cleaned_result.endswith("```"):
-                cleaned_result = cleaned_result[:-3]
+        self.last_stats = {"element_map": True}
+        messages = build_element_map_messages(base64_image, mime_type, geometry)
+        self.last_request = describe_request(
+            self.deployment, messages, mime_type, base64_image, self.map_max_tokens, False
+        )
+        self.last_response = None
+        try:
+            start = time.perf_counter()
+            with rate_limiter.priority(rate_limiter.PRIORITY_INTERACTIVE):
+                response = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=messages,
+                    max_tokens=self.map_max_tokens,
+                    temperature=0,
+                    response_format=ELEMENT_MAP_RESPONSE_FORMAT,
+                )
+            self.last_stats["request_ms"] = _elapsed_ms(start)
+            _record_usage(self.last_stats, response.usage)
+            self.last_response = response.choices[0].message.content
 
-            cleaned_result = cleaned_result.strip()
-            print(cleaned_result)
+            start = time.perf_counter()
+            elements = parse_element_map(self.last_response, geometry)
+            self.last_stats["parse_ms"] = _elapsed_ms(start)
+            self.last_stats["elements"] = len(elements)
+            return elements
+        except Exception as e:
+            print(f"Error when element map analysis {e}")
+            return None
 
-            vision_data = json.loads(cleaned_result)
-            print(vision_data)
-            print(type(vision_data))
 
-           
+class AsyncVisionAnalzer:
+    """asyncio wala vision analyzer: per-command deadline, 429/5xx par jittered backoff retries,
+    aur `hedge_after` sec tak jawab na aaye to dusre deployment par hedged request.
 
-            return vision_data
+    Sync code (AutonomousLoop) `analyze_screen_sync()` use karta hai, jo ek background event loop
+    par chalta hai taaki async client ke connections commands ke beech warm rahein.
+    """
+
+    def __init__(
+        self,
+        deadline=None,
+        max_retries=None,
+        backoff_base=None,
+        backoff_max=None,
+        hedge_deployment=None,
+        hedge_after=None,
+    ):
+        self._client = None
+        self.deployment = config.LLM_DEPLOYMENT
+        self.deadline = config.VISION_DEADLINE if deadline is None else deadline
+        self.max_retries = config.VISION_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = config.VISION_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = config.VISION_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.hedge_deployment = config.VISION_HEDGE_DEPLOYMENT if hedge_deployment is None else hedge_deployment
+        self.hedge_after = config.VISION_HEDGE_AFTER if hedge_after is None else hedge_after
+        self.stream = config.VISION_STREAM
+        self.max_tokens = config.VISION_MAX_TOKENS
+        self.drain_timeout = config.VISION_STREAM_DRAIN
+        self.map_max_tokens = config.ELEMENT_MAP_MAX_TOKENS
+        self.map_deadline = config.ELEMENT_MAP_DEADLINE
+        self.last_stats = {}
+        self.last_request = None
+        self.last_response = None
+        self._drains = set()
+        self._loop = None
+        self._thread = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Retries yahin (deadline ke hisab se) hote hain, SDK ke andar nahi.
+            self._client = azure_clients.get_async_client(max_retries=0)
+        return self._client
+
+    def warm_up(self):
+        """Shared async client ki connection background loop par pehle se khol deta hai."""
+        return asyncio.run_coroutine_threadsafe(
+            azure_clients.warm_up_async(self.client),
+            self._ensure_loop(),
+        ).result()
+
+    @staticmethod
+    def _is_retryable(exc):
+        status = getattr(exc, "status_code", None)
+        if status is None:
+            # Timeout/connection errors ka status code nahi hota.
+            return type(exc).__name__ in {"APITimeoutError", "APIConnectionError"}
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+
+    def _retry_delay(self, exc, attempt):
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        for header, factor in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            value = headers.get(header)
+            if value:
+                try:
+                    return min(float(value) * factor, self.backoff_max)
+                except ValueError:
+                    pass
+        # Full jitter: 0 se exponential cap ke beech random delay.
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _request_point(self, deployment, messages, geometry, timeout, record):
+        if self.stream:
+            return await self._request_stream(deployment, messages, geometry, timeout, record)
+        stats = record["stats"]
+        start = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model=deployment,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=0.1,
+            timeout=timeout,
+        )
+        stats["request_ms"] = _elapsed_ms(start)
+        _record_usage(stats, response.usage)
+        record["response"] = response.choices[0].message.content
+        start = time.perf_counter()
+        result = parse_vision_result(record["response"], geometry)
+        stats["parse_ms"] = _elapsed_ms(start)
+        return result
+
+    async def _request_map(self, deployment, messages, geometry, timeout, record):
+        stats = record["stats"]
+        start = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model=deployment,
+            messages=messages,
+            max_tokens=self.map_max_tokens,
+            temperature=0,
+            timeout=timeout,
+            response_format=ELEMENT_MAP_RESPONSE_FORMAT,
+        )
+        stats["request_ms"] = _elapsed_ms(start)
+        _record_usage(stats, response.usage)
+        record["response"] = response.choices[0].message.content
+        start = time.perf_counter()
+        elements = parse_element_map(record["response"], geometry)
+        stats["parse_ms"] = _elapsed_ms(start)
+        stats["elements"] = len(elements)
+        return elements
+
+    async def _request(self, deployment, messages, geometry, expires_at, send=None, record=None):
+        """Ek deployment par request + retries; stats/response sirf `record` me likhe jate hain."""
+        send = send or self._request_point
+        record = {"stats": {}, "response": None} if record is None else record
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            remaining = expires_at - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            try:
+                result = await send(deployment, messages, geometry, remaining, record)
+                record["stats"]["deployment"] = deployment
+                return result
+            except Exception as exc:
+                if attempt >= self.max_retries or not self._is_retryable(exc):
+                    raise
+                delay = self._retry_delay(exc, attempt)
+                if loop.time() + delay >= expires_at:
+                    raise
+                attempt += 1
+                record["stats"]["retries"] = record["stats"].get("retries", 0) + 1
+                print(f"Vision retry {attempt}/{self.max_retries} on {deployment} after {delay:.2f}s: {exc}")
+                await asyncio.sleep(delay)
+
+    async def _drain(self, stream):
+        # Early exit ke baad bache hue chunks padh lene se HTTP/1.1 connection pool me wapas jati hai;
+        # beech me close karne par agli request ko nayi TCP+TLS connection kholni padti.
+        try:
+            await asyncio.wait_for(self._consume(stream), timeout=self.drain_timeout)
+        except Exception:
+            pass
+        finally:
+            await stream.close()
+
+    @staticmethod
+    async def _consume(stream):
+        async for _ in stream:
+            pass
+
+    async def _request_stream(self, deployment, messages, geometry, timeout, record):
+        stats = record["stats"]
+        start = time.perf_counter()
+        parser = CoordinateStreamParser()
+        stream = await self.client.chat.completions.create(
+            model=deployment,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=0.1,
+            timeout=timeout,
+            stream=True,
+        )
+        parse_s = 0.0
+        drain = False
+        try:
+            async for chunk in stream:
+                _record_usage(stats, getattr(chunk, "usage", None))
+                text = _chunk_text(chunk)
+                if text and "first_token_ms" not in stats:
+                    stats["first_token_ms"] = _elapsed_ms(start)
+                parse_start = time.perf_counter()
+                found = parser.feed(text)
+                parse_s += time.perf_counter() - parse_start
+                if found is not None:
+                    stats["early_exit"] = True
+                    drain = self.drain_timeout > 0
+                    break
+        finally:
+            if drain:
+                # Event loop tasks ka sirf weak reference rakhta hai; set me rakhe bina drain beech me GC ho sakta hai.
+                task = asyncio.get_running_loop().create_task(self._drain(stream))
+                self._drains.add(task)
+                task.add_done_callback(self._drains.discard)
+            else:
+                await stream.close()
+
+        stats["parsed_ms"] = stats["request_ms"] = _elapsed_ms(start)
+        stats["parse_ms"] = round(parse_s * 1000, 3)
+        record["response"] = parser.buffer
+        if parser.finish() is None:
+            raise ValueError(f"No coordinates in vision response: {parser.buffer!r}")
+        return geometry.map_result(parser.result) if geometry is not None else parser.result
+
+    async def _hedged(self, messages, geometry, expires_at, send=None):
+        """Primary (aur zarurat par hedge) request; har ek apne `record` me likhti hai aur sirf jeetne wali ke
+        stats/response `last_stats`/`last_response` me aate hain (sab fail hon to aakhri fail hui ke)."""
+        records = {}
+
+        def start(deployment):
+            record = {"stats": {}, "response": None}
+            task = asyncio.create_task(self._request(deployment, messages, geometry, expires_at, send, record))
+            records[task] = record
+            return task
+
+        primary = start(self.deployment)
+        tasks = {primary}
+        adopted = primary
+        try:
+            if self.hedge_deployment and self.hedge_after is not None:
+                done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+                if not done:
+                    self.last_stats["hedged"] = True
+                    tasks.add(start(self.hedge_deployment))
+
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    adopted = task
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.last_stats.update(records[adopted]["stats"])
+            self.last_response = records[adopted]["response"]
+
+    async def analyze_screen(self, base64_image, command, mime_type="image/png", geometry=None, deadline=None):
+        if not base64_image:
+            return None
+
+        deadline = self.deadline if deadline is None else deadline
+        self.last_stats = {"retries": 0, "hedged": False, "stream": self.stream}
+        loop = asyncio.get_running_loop()
+        messages = build_vision_messages(base64_image, command, mime_type, geometry)
+        self.last_request = describe_request(
+            self.deployment, messages, mime_type, base64_image, self.max_tokens, self.stream
+        )
+        self.last_response = None
+        try:
+            with rate_limiter.priority(rate_limiter.PRIORITY_INTERACTIVE):
+                return await asyncio.wait_for(
+                    self._hedged(messages, geometry, loop.time() + deadline),
+                    timeout=deadline,
+                )
+        except asyncio.TimeoutError:
+            self.last_stats["timed_out"] = True
+            print(f"Vision analysis deadline {deadline}s exceeded")
         except Exception as e:
-            print("Error when vision analysis ") 
+            print(f"Error when vision analysis {e}")
+        return None
+
+    async def map_screen(self, base64_image, mime_type="image/png", geometry=None, deadline=None):
+        """Element map wali call; retries/hedging wahi hain, deadline `ELEMENT_MAP_DEADLINE` (badi response ke liye)."""
+        if not base64_image:
             return None
+
+        deadline = self.map_deadline if deadline is None else deadline
+        self.last_stats = {"retries": 0, "hedged": False, "element_map": True}
+        loop = asyncio.get_running_loop()
+        messages = build_element_map_messages(base64_image, mime_type, geometry)
+        self.last_request = describe_request(
+            self.deployment, messages, mime_type, base64_image, self.map_max_tokens, False
+        )
+        self.last_response = None
+        try:
+            with rate_limiter.priority(rate_limiter.PRIORITY_INTERACTIVE):
+                return await asyncio.wait_for(
+                    self._hedged(messages, geometry, loop.time() + deadline, self._request_map),
+                    timeout=deadline,
+                )
+        except asyncio.TimeoutError:
+            self.last_stats["timed_out"] = True
+            print(f"Element map deadline {deadline}s exceeded")
+        except Exception as e:
+            print(f"Error when element map analysis {e}")
+        return None
+
+    def _ensure_loop(self):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="AsyncVisionAnalzer",
+                    daemon=True,
+                )
+                self._thread.start()
+        return self._loop
+
+    def analyze_screen_sync(self, base64_image, command, mime_type="image/png", geometry=None, deadline=None):
+        future = asyncio.run_coroutine_threadsafe(
+            self.analyze_screen(base64_image, command, mime_type, geometry, deadline),
+            self._ensure_loop(),
+        )
+        return future.result()
+
+    def map_screen_sync(self, base64_image, mime_type="image/png", geometry=None, deadline=None):
+        future = asyncio.run_coroutine_threadsafe(
+            self.map_screen(base64_image, mime_type, geometry, deadline),
+            self._ensure_loop(),
+        )
+        return future.result()
+
+    async def _shutdown(self):
+        # Background stream drains pehle khatam hon, phir clients band hon.
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*pending, return_exceptions=True)
+        if self._client is not None:
+            await azure_clients.aclose_clients()
+            self._client = None
+        await asyncio.get_running_loop().shutdown_asyncgens()
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=self.drain_timeout + 5)
+        except Exception as e:
+            print(f"An error when closing vision analyzer {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+        self._thread = None
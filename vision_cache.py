@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class _Flight:
+    """Ek key ke liye chal rahi vision request; baaki callers isi ka result share karte hain."""
+
+    __slots__ = ("event", "value")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+class VisionCache:
+    """Screen fingerprint + normalized command par keyed LRU/TTL cache, optional JSON persistence ke saath.
+
+    Ek hi key ke parallel lookups single-flight hote hain: sirf pehla caller model ko call karta hai,
+    baaki uske result ka wait karte hain.
+    """
+
+    def __init__(self, max_entries=256, ttl=900, path=None):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "collapsed": 0,
+        }
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        if self.path is not None:
+            self._load()
+
+    @staticmethod
+    def make_key(frame_digest, normalized_command):
+        return f"{frame_digest}:{normalized_command}"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key, value):
+        if value is None:
+            return
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            snapshot = dict(self._entries) if self.path is not None else None
+        if snapshot is not None:
+            self._save(snapshot)
+
+    def get_or_compute(self, key, compute):
+        """Cached value ya `compute()` ka result deta hai; source "hit", "shared" ya "miss" hota hai."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                return value, "hit"
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+            else:
+                self.stats["collapsed"] += 1
+
+        if not leader:
+            flight.event.wait()
+            return flight.value, "shared"
+
+        value = None
+        try:
+            value = compute()
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.value = value
+            flight.event.set()
+
+        self.put(key, value)
+        return value, "miss"
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path is not None:
+            self._save({})
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return value
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except Exception as e:
+            print(f"An error when loading vision cache {e}")
+            return
+
+        now = time.time()
+        for key, (expires_at, value) in data.items():
+            if expires_at is not None and expires_at <= now:
+                continue
+            self._entries[key] = (expires_at, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self, snapshot):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({key: list(entry) for key, entry in snapshot.items()}, file)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"An error when saving vision cache {e}")
@@ -0,0 +1,112 @@
+import json
+import re
+
+_NUMBER = r"(-?\d+(?:\.\d+)?)"
+_LOOSE_X = re.compile(r"""["']?\bx["']?\s*[:=]\s*""" + _NUMBER, re.IGNORECASE)
+_LOOSE_Y = re.compile(r"""["']?\by["']?\s*[:=]\s*""" + _NUMBER, re.IGNORECASE)
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            number = float(value.strip())
+        except ValueError:
+            return None
+        return int(number) if number.is_integer() else number
+    return None
+
+
+def coordinates_from_object(candidate):
+    """JSON object/text se numeric x/y wala dict banata hai; na mile to None."""
+    data = None
+    try:
+        data = json.loads(candidate)
+    except ValueError:
+        pass
+
+    if isinstance(data, dict):
+        x = _as_number(data.get("x", data.get("X")))
+        y = _as_number(data.get("y", data.get("Y")))
+        if x is not None and y is not None:
+            result = dict(data)
+            result["x"], result["y"] = x, y
+            return result
+        return None
+
+    # Model kabhi {x:125, y:340} ya single quotes bhej deta hai.
+    x_match = _LOOSE_X.search(candidate)
+    y_match = _LOOSE_Y.search(candidate)
+    if x_match and y_match:
+        return {"x": _as_number(x_match.group(1)), "y": _as_number(y_match.group(1))}
+    return None
+
+
+class CoordinateStreamParser:
+    """Streamed completion ke chunks padhta hai aur pehla poora `{...}` object jisme x/y ho, turant lauta deta hai.
+
+    Markdown fences (```json) aur object ke bahar ka text ignore hota hai, strings ke andar ke braces count nahi hote.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.result = None
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        if self.result is not None or not chunk:
+            return self.result
+
+        self.buffer += chunk
+        text = self.buffer
+        while self._pos < len(text):
+            char = text[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"' and self._depth:
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = self._pos - 1
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    parsed = coordinates_from_object(text[self._start:self._pos])
+                    if parsed is not None:
+                        self.result = parsed
+                        return parsed
+        return None
+
+    def finish(self):
+        """Stream khatam hone par bina braces wala jawab (jaise `x: 10, y: 20`) bhi try karta hai."""
+        if self.result is None:
+            self.result = extract_coordinates(self.buffer)
+        return self.result
+
+
+def extract_coordinates(text):
+    """Poore response text se coordinates nikalta hai (fences/extra text tolerant)."""
+    if not text:
+        return None
+    parser = CoordinateStreamParser()
+    result = parser.feed(text)
+    if result is not None:
+        return result
+    return coordinates_from_object(text.replace("```json", "").replace("```", "").strip())
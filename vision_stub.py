@@ -0,0 +1,211 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSE = '{"x": 0, "y": 0}'
+
+
+def _prompt_text(body):
+    """Request ke pehle user message ka text part (command wala prompt)."""
+    for message in body.get("messages") or []:
+        content = message.get("content")
+        if isinstance(content, str):
+            return content
+        for part in content or []:
+            if part.get("type") == "text":
+                return part.get("text", "")
+    return ""
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, text, model):
+        stub = self.server.stub
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        # Chunked encoding se connection keep-alive rehti hai, jaise Azure par.
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        # Azure pehla chunk bina choices ke (sirf prompt filter results) bhejta hai.
+        chunks = [{"id": "", "object": "", "created": 0, "model": "", "choices": [], "prompt_filter_results": []}]
+        size = max(1, stub.chunk_size)
+        for start in range(0, len(text), size):
+            chunks.append({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": text[start:start + size]}, "finish_reason": None}],
+            })
+        chunks.append({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        })
+        try:
+            for index, chunk in enumerate(chunks):
+                if index > 1 and stub.chunk_delay:
+                    time.sleep(stub.chunk_delay)
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client ne early exit par stream band kar diya.
+            stub._count("cancelled")
+            self.close_connection = True
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        # Client warm-up (`/openai/models`) ke liye; connection keep-alive rehti hai.
+        self.server.stub._count("warm_ups")
+        self._send_json(200, {"object": "list", "data": []})
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"code": "400", "message": "Invalid JSON body"}})
+            return
+
+        if not self.path.split("?")[0].endswith("/chat/completions"):
+            self._send_json(404, {"error": {"code": "404", "message": f"Unknown path {self.path}"}})
+            return
+
+        prompt = _prompt_text(body)
+        stub._count("requests")
+        stub.requests.append({"path": self.path, "prompt": prompt, "stream": bool(body.get("stream"))})
+
+        delay, error = stub._plan_response()
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            stub._count("errors")
+            headers = {"Retry-After": str(stub.retry_after)} if stub.retry_after is not None else None
+            self._send_json(error, {"error": {"code": str(error), "message": "Injected error"}}, headers)
+            return
+
+        text = stub.response_for(prompt)
+        model = body.get("model") or self.path.split("/deployments/")[-1].split("/")[0]
+        if body.get("stream"):
+            self._send_stream(text, model)
+            return
+
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4, "total_tokens": 0},
+        })
+
+
+class VisionStubServer:
+    """Local HTTP server jo Azure chat-completions API (stream aur non-stream) ki tarah jawab deta hai.
+
+    `responses` prompt text -> model ka text map hai (recording se aata hai); match na ho to `default_response`.
+    `latency` + `jitter` (sec) har request par wait, `error_rate` ke hisab se `error_status` wale errors
+    (seeded random, isliye har run deterministic). `/openai/deployments/<name>/chat/completions` par
+    `AzureOpenAI(azure_endpoint=server.url)` seedha chal jata hai.
+    """
+
+    def __init__(
+        self,
+        responses=None,
+        default_response=DEFAULT_RESPONSE,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        error_status=429,
+        retry_after=None,
+        chunk_size=8,
+        chunk_delay=0.0,
+        seed=0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.responses = dict(responses or {})
+        self.default_response = default_response
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.requests = []
+        self.stats = {"requests": 0, "errors": 0, "cancelled": 0, "warm_ups": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _plan_response(self):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            error = self.error_status if self.error_rate and self._random.random() < self.error_rate else None
+        return delay, error
+
+    def response_for(self, prompt):
+        return self.responses.get(prompt, self.default_response)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="VisionStubServer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,130 @@
+import random
+import time
+
+# ChatGPT pipeline ke har naam wale pause ki default range (sec); "human" profile me yahi chalti hai.
+PAUSE_RANGES = {
+    "pause": (1.4, 3.2),
+    "idle_scroll": (0.8, 1.6),
+    "post_prompt": (2.2, 4.0),
+    "page_load": (5.0, 7.8),
+    "before_type": (4.5, 7.5),
+    "after_type": (1.4, 3.2),
+    "before_download": (1.8, 3.4),
+    "before_download_click": (5.0, 5.0),
+    "after_download_click": (4.5, 6.8),
+    "download_retry": (10.0, 10.0),
+    "before_download_retry": (1.0, 2.0),
+    "menu_open": (4.0, 6.5),
+    "branch_open": (2.4, 4.6),
+    "after_response": (2.0, 3.6),
+    "after_download": (2.7, 4.5),
+}
+
+# Profile = saare pause ranges ka scale; "none" me koi sleep nahi, sirf conditions par wait.
+WAIT_PROFILES = {
+    "human": 1.0,
+    "fast": 0.3,
+    "none": 0.0,
+}
+
+
+class WaitPolicy:
+    """Naam wale pauses aur condition waits ek jagah; har page ka condition time vs sleep time alag ginta hai.
+
+    `until(name, condition, timeout)` condition truthy hone tak poll karta hai (value ya timeout par None).
+    `pause(name)` profile ke hisab se random sleep karta hai; `ranges` se kisi bhi pause ki range badli ja sakti hai.
+    """
+
+    def __init__(self, profile="human", ranges=None, timeout=40.0, poll_frequency=0.25, sleep=time.sleep):
+        if profile not in WAIT_PROFILES:
+            raise ValueError(f"Unknown wait profile {profile!r}, expected one of {sorted(WAIT_PROFILES)}")
+        self.profile = profile
+        self.scale = WAIT_PROFILES[profile]
+        self.ranges = dict(PAUSE_RANGES)
+        self.ranges.update({name: tuple(value) for name, value in (ranges or {}).items()})
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self._sleep = sleep
+        self.pages = []
+        self.begin_page("")
+
+    def begin_page(self, page_name):
+        self.current = {
+            "page": page_name,
+            "condition_ms": 0.0,
+            "sleep_ms": 0.0,
+            "conditions": {},
+            "sleeps": {},
+        }
+        return self.current
+
+    def end_page(self):
+        report = self.page_report()
+        self.pages.append(report)
+        self.begin_page("")
+        return report
+
+    def page_report(self):
+        report = dict(self.current)
+        report["condition_ms"] = round(report["condition_ms"], 1)
+        report["sleep_ms"] = round(report["sleep_ms"], 1)
+        report["conditions"] = {
+            name: dict(stats, ms=round(stats["ms"], 1)) for name, stats in self.current["conditions"].items()
+        }
+        report["sleeps"] = {name: round(ms, 1) for name, ms in self.current["sleeps"].items()}
+        return report
+
+    def run_report(self):
+        return {
+            "profile": self.profile,
+            "pages": list(self.pages),
+            "condition_ms": round(sum(page["condition_ms"] for page in self.pages), 1),
+            "sleep_ms": round(sum(page["sleep_ms"] for page in self.pages), 1),
+        }
+
+    def pause_range(self, name, minimum=None, maximum=None):
+        low, high = self.ranges.get(name, self.ranges["pause"])
+        if minimum is not None:
+            low = minimum
+        if maximum is not None:
+            high = maximum
+        if low > high:
+            low, high = high, low
+        return low * self.scale, high * self.scale
+
+    def pause(self, name="pause", minimum=None, maximum=None):
+        """Naam wala pause; `minimum`/`maximum` us call ke liye range override karte hain (profile scale phir bhi lagta hai)."""
+        low, high = self.pause_range(name, minimum, maximum)
+        delay = random.uniform(low, high) if high > 0 else 0.0
+        if delay > 0:
+            self._sleep(delay)
+        self.current["sleep_ms"] += delay * 1000
+        self.current["sleeps"][name] = self.current["sleeps"].get(name, 0.0) + delay * 1000
+        return delay
+
+    def record(self, name, seconds, satisfied=True):
+        """Kahin aur (jaise response observer ya download watcher) hua condition wait bhi page report me jodta hai."""
+        stats = self.current["conditions"].setdefault(name, {"count": 0, "timeouts": 0, "ms": 0.0})
+        stats["count"] += 1
+        stats["ms"] += seconds * 1000
+        if not satisfied:
+            stats["timeouts"] += 1
+        self.current["condition_ms"] += seconds * 1000
+
+    def until(self, name, condition, timeout=None, poll_frequency=None):
+        """`condition()` truthy hone tak poll; exceptions ko "abhi nahi" maana jata hai. Timeout par None."""
+        timeout = self.timeout if timeout is None else timeout
+        poll_frequency = self.poll_frequency if poll_frequency is None else poll_frequency
+        start = time.monotonic()
+        value = None
+        try:
+            while True:
+                try:
+                    value = condition()
+                except Exception:
+                    value = None
+                if value or time.monotonic() - start >= timeout:
+                    return value or None
+                self._sleep(poll_frequency)
+        finally:
+            self.record(name, time.monotonic() - start, bool(value))